@@ -0,0 +1,7 @@
+-- Ring of the last transactions of each client, kept next to the balance.
+-- Required by TRANSACTION_RING_SIZE > 0. Transaction remains the append-only
+-- history; fill the ring of existing clients with the seed tool, using the
+-- same size as TRANSACTION_RING_SIZE:
+--   python -m rinha2024.tools.seed --transactions 0 --ring-size $TRANSACTION_RING_SIZE
+
+ALTER TABLE Client ADD COLUMN IF NOT EXISTS recent_transactions JSONB NOT NULL DEFAULT '[]';
@@ -0,0 +1,18 @@
+-- Notifies every balance change on the client_changes channel as
+-- "<client id> <application_name>". Required by STATEMENT_CACHE_TTL > 0 when
+-- more than one instance writes to the same clients, so each instance can
+-- drop the statements it cached for clients changed by the others.
+CREATE OR REPLACE FUNCTION notify_client_change() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        'client_changes',
+        NEW.id || ' ' || current_setting('application_name')
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS client_changes ON Client;
+CREATE TRIGGER client_changes
+AFTER UPDATE OF balance ON Client
+FOR EACH ROW EXECUTE FUNCTION notify_client_change();
@@ -2,3 +2,6 @@ class ClientDoesNotExistError(Exception): ...
 
 
 class NoLimitError(Exception): ...
+
+
+class HistoryNotSupportedError(Exception): ...
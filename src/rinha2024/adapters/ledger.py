@@ -0,0 +1,25 @@
+from collections.abc import Iterable
+from typing import Protocol
+
+from returns import Err, Result
+
+from ..core.entities.client import Client
+from ..core.entities.entity import Entity
+from ..core.entities.transaction import Transaction
+from .errors import ClientDoesNotExistError, NoLimitError
+
+
+class Ledger(Protocol):
+    def append(
+        self, transaction: Transaction
+    ) -> Result[Entity[Client], ClientDoesNotExistError | NoLimitError]: ...
+
+
+def seed_ledger(ledger: Ledger, transactions: Iterable[Transaction]) -> None:
+    for index, transaction in enumerate(transactions, 1):
+        match ledger.append(transaction):
+            case Err(error):
+                raise ValueError(
+                    f"transaction {index}: {type(error).__name__} "
+                    f"for client {transaction.client_id}"
+                )
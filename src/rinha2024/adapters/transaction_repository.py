@@ -1,10 +1,15 @@
-from collections.abc import AsyncIterable
+from collections.abc import AsyncIterable, Sequence
+from dataclasses import dataclass
 from datetime import datetime
 from typing import AsyncContextManager, NotRequired, Protocol, TypedDict, Unpack
 
 from returns.result import Result
 
-from ..adapters.errors import ClientDoesNotExistError, NoLimitError
+from ..adapters.errors import (
+    ClientDoesNotExistError,
+    HistoryNotSupportedError,
+    NoLimitError,
+)
 from ..core.entities.client import Client
 from ..core.entities.entity import Entity
 from ..core.entities.transaction import Transaction
@@ -16,12 +21,42 @@ class GetByClientIdProps(TypedDict):
     amount: NotRequired[int]
 
 
+@dataclass(slots=True, frozen=True)
+class HistoryCursor:
+    created_at: datetime
+    id: int
+
+
+class GetHistoryProps(TypedDict):
+    id: int
+    after: NotRequired[HistoryCursor]
+
+
+@dataclass(slots=True, frozen=True)
+class BankStatement:
+    limit: int
+    balance: int
+    transactions: bytes | str
+
+
 class TransactionRepository(Protocol):
     async def create(
         self, transaction: Transaction
     ) -> Result[Entity[Client], ClientDoesNotExistError | NoLimitError]: ...
+    async def create_many(
+        self, transactions: Sequence[Transaction]
+    ) -> Sequence[Result[Entity[Client], ClientDoesNotExistError | NoLimitError]]: ...
     def get_by_client_id(
         self, **props: Unpack[GetByClientIdProps]
     ) -> AsyncContextManager[
         Result[AsyncIterable[Entity[Transaction]], ClientDoesNotExistError]
     ]: ...
+    async def get_statement(
+        self, **props: Unpack[GetByClientIdProps]
+    ) -> Result[BankStatement, ClientDoesNotExistError]: ...
+    def get_history(self, **props: Unpack[GetHistoryProps]) -> AsyncContextManager[
+        Result[
+            AsyncIterable[Entity[Transaction]],
+            ClientDoesNotExistError | HistoryNotSupportedError,
+        ]
+    ]: ...
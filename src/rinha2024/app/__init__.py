@@ -1,46 +1,355 @@
 from __future__ import annotations
 
-from contextlib import asynccontextmanager
+import asyncio
+import random
+from contextlib import asynccontextmanager, suppress
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from uuid import uuid4
 
 import asyncpg
 from starlette.applications import Starlette
 from starlette.config import Config
+from starlette.datastructures import CommaSeparatedStrings
+from starlette.middleware import Middleware
 from starlette.routing import Route
 
+from ..adapters.ledger import seed_ledger
+from ..adapters.transaction_repository import TransactionRepository
+from ..core.transaction_generator import generate_transactions
+from .adapters.batching_transaction_repository import BatchingTransactionRepository
+from .adapters.caching_transaction_repository import CachingTransactionRepository
+from .adapters.client_directory import ClientDirectory
+from .adapters.client_write_dispatcher import ClientWriteDispatcher
+from .adapters.in_memory_client_repository import InMemoryClientRepository
+from .adapters.in_memory_ledger import InMemoryLedger
+from .adapters.in_memory_transaction_repository import InMemoryTransactionRepository
+from .adapters.mapped_client_repository import MappedClientRepository
+from .adapters.mapped_ledger import MappedLedger, flush_periodically
+from .adapters.mapped_transaction_repository import MappedTransactionRepository
+from .adapters.metered_pool import MeteredPool
 from .adapters.postgres_client_repository import PostgresClientRepository
+from .adapters.postgres_statements import (
+    StatementConnection,
+    prepare_ring_statements,
+    prepare_statements,
+)
 from .adapters.postgres_transaction_repository import PostgresTransactionRepository
+from .adapters.write_behind_ledger import (
+    PersistenceQueue,
+    TransactionIds,
+    WriteBehindClientRepository,
+    WriteBehindTransactionRepository,
+    load_ledger,
+)
+from .admission import AdmissionController
 from .controllers.get_bank_statement_controller import get_bank_statement_controller
+from .controllers.get_history_controller import get_history_controller
+from .controllers.health_controller import health_controller
 from .controllers.make_transaction_controller import make_transaction_controller
+from .controllers.make_transactions_controller import make_transactions_controller
+from .controllers.metrics_controller import metrics_controller
+from .fast_app import FastApp
+from .sharding import ClientOwnership, ShardMiddleware, ShardRouter
+from .warm_up import warm_up
 
 ENV_PATH = Path(".env")
 config = Config(ENV_PATH if ENV_PATH.exists() else None)
 
 DEBUG = config("DEBUG", cast=bool, default=False)
-POSTGRES_HOST = config("POSTGRES_HOST")
-POSTGRES_PORT = config("POSTGRES_PORT", cast=int)
-POSTGRES_DB = config("POSTGRES_DB")
-POSTGRES_USER = config("POSTGRES_USER")
-POSTGRES_PASSWORD = config("POSTGRES_PASSWORD")
+REPOSITORY_BACKEND = config("REPOSITORY_BACKEND", default="postgres")
+POSTGRES_HOST = config("POSTGRES_HOST", default=None)
+POSTGRES_PORT = config("POSTGRES_PORT", cast=int, default=None)
+POSTGRES_DB = config("POSTGRES_DB", default=None)
+POSTGRES_USER = config("POSTGRES_USER", default=None)
+POSTGRES_PASSWORD = config("POSTGRES_PASSWORD", default=None)
+POSTGRES_POOL_SIZE = config("POSTGRES_POOL_SIZE", cast=int, default=25)
+POSTGRES_POOL_MIN_SIZE = config("POSTGRES_POOL_MIN_SIZE", cast=int, default=10)
+READ_POSTGRES_HOST = config("READ_POSTGRES_HOST", default=POSTGRES_HOST)
+READ_POSTGRES_PORT = config("READ_POSTGRES_PORT", cast=int, default=POSTGRES_PORT)
+READ_POSTGRES_DB = config("READ_POSTGRES_DB", default=POSTGRES_DB)
+READ_POSTGRES_USER = config("READ_POSTGRES_USER", default=POSTGRES_USER)
+READ_POSTGRES_PASSWORD = config("READ_POSTGRES_PASSWORD", default=POSTGRES_PASSWORD)
+READ_POOL_SIZE = config("READ_POOL_SIZE", cast=int, default=0)
+WRITE_MAX_IN_FLIGHT = config("WRITE_MAX_IN_FLIGHT", cast=int, default=0)
+WRITE_MAX_QUEUE = config("WRITE_MAX_QUEUE", cast=int, default=0)
+WRITE_MAX_WAIT = config("WRITE_MAX_WAIT", cast=float, default=0)
+STATEMENT_MAX_IN_FLIGHT = config("STATEMENT_MAX_IN_FLIGHT", cast=int, default=0)
+STATEMENT_MAX_QUEUE = config("STATEMENT_MAX_QUEUE", cast=int, default=0)
+STATEMENT_MAX_WAIT = config("STATEMENT_MAX_WAIT", cast=float, default=0)
+TRANSACTION_BATCH_WINDOW = config("TRANSACTION_BATCH_WINDOW", cast=float, default=0)
+TRANSACTION_BATCH_SIZE = config("TRANSACTION_BATCH_SIZE", cast=int, default=64)
+TRANSACTION_RING_SIZE = config("TRANSACTION_RING_SIZE", cast=int, default=0)
+TRANSACTION_DISPATCH = config("TRANSACTION_DISPATCH", cast=bool, default=False)
+WRITE_BEHIND_BATCH_SIZE = config("WRITE_BEHIND_BATCH_SIZE", cast=int, default=256)
+WRITE_BEHIND_MAX_ATTEMPTS = config("WRITE_BEHIND_MAX_ATTEMPTS", cast=int, default=5)
+WRITE_BEHIND_CLOSE_TIMEOUT = config(
+    "WRITE_BEHIND_CLOSE_TIMEOUT", cast=float, default=10.0
+)
+INSTANCE_INDEX = config("INSTANCE_INDEX", cast=int, default=0)
+INSTANCE_COUNT = config("INSTANCE_COUNT", cast=int, default=1)
+INSTANCE_PEERS = config("INSTANCE_PEERS", cast=CommaSeparatedStrings, default="")
+SHARD_ROUTING = config("SHARD_ROUTING", default="forward")
+SHARD_SECRET = config("SHARD_SECRET", default="")
+SHARD_REDIRECT_URLS = config(
+    "SHARD_REDIRECT_URLS", cast=CommaSeparatedStrings, default=""
+)
+INSTANCE_NAME = config("INSTANCE_NAME", default=f"rinha2024-{uuid4().hex[:12]}")
+STATEMENT_CACHE_TTL = config("STATEMENT_CACHE_TTL", cast=float, default=0)
+WARM_UP_ROUNDS = config("WARM_UP_ROUNDS", cast=int, default=1)
+MMAP_LEDGER_PATH = config("MMAP_LEDGER_PATH", default="rinha2024.ledger")
+MMAP_LEDGER_CAPACITY = config("MMAP_LEDGER_CAPACITY", cast=int, default=1024)
+MMAP_LEDGER_FLUSH_INTERVAL = config(
+    "MMAP_LEDGER_FLUSH_INTERVAL", cast=float, default=1.0
+)
+
+IN_MEMORY_SEED_TRANSACTIONS = config("IN_MEMORY_SEED_TRANSACTIONS", cast=int, default=0)
+
+IN_MEMORY_CLIENT_LIMITS = (100000, 80000, 1000000, 10000000, 500000)
+
+OWNERSHIP = ClientOwnership(INSTANCE_INDEX, INSTANCE_COUNT)
 
 
 @asynccontextmanager
 async def lifespan(_: Starlette):
+    match REPOSITORY_BACKEND:
+        case "memory":
+            repositories = in_memory_repositories()
+        case "postgres":
+            repositories = postgres_repositories()
+        case "write-behind":
+            repositories = write_behind_repositories()
+        case "mmap":
+            repositories = mapped_repositories()
+        case backend:
+            raise ValueError(f"unknown repository backend: {backend}")
+    match SHARD_ROUTING:
+        case "forward":
+            redirects = ()
+        case "redirect" if not SHARD_REDIRECT_URLS:
+            raise ValueError("SHARD_ROUTING=redirect needs SHARD_REDIRECT_URLS")
+        case "redirect":
+            redirects = SHARD_REDIRECT_URLS
+        case routing:
+            raise ValueError(f"unknown shard routing: {routing}")
+    router = (
+        ShardRouter(OWNERSHIP, INSTANCE_PEERS, SHARD_SECRET, redirects=redirects)
+        if INSTANCE_PEERS
+        else None
+    )
+    try:
+        async with repositories as state:
+            await warm_up(
+                state["client_repository"],
+                state["transaction_repository"],
+                WARM_UP_ROUNDS,
+                READ_POOL_SIZE or POSTGRES_POOL_SIZE,
+            )
+            yield {
+                **state,
+                "shard_router": router,
+                "write_admission": AdmissionController(
+                    "write", WRITE_MAX_IN_FLIGHT, WRITE_MAX_QUEUE, WRITE_MAX_WAIT
+                ),
+                "statement_admission": AdmissionController(
+                    "statement",
+                    STATEMENT_MAX_IN_FLIGHT,
+                    STATEMENT_MAX_QUEUE,
+                    STATEMENT_MAX_WAIT,
+                ),
+            }
+    finally:
+        if router is not None:
+            await router.close()
+
+
+@asynccontextmanager
+async def in_memory_repositories():
+    ledger = InMemoryLedger()
+    clients = [ledger.add_client(limit) for limit in IN_MEMORY_CLIENT_LIMITS]
+    seed_ledger(
+        ledger,
+        generate_transactions(
+            clients,
+            IN_MEMORY_SEED_TRANSACTIONS,
+            random.Random(),
+            datetime.now(timezone.utc),
+            timedelta(days=30),
+        ),
+    )
+    yield {
+        "client_repository": InMemoryClientRepository(ledger),
+        "transaction_repository": InMemoryTransactionRepository(ledger),
+    }
+
+
+@asynccontextmanager
+async def postgres_pool():
     async with asyncpg.create_pool(
-        max_size=25,
+        min_size=min(POSTGRES_POOL_MIN_SIZE, POSTGRES_POOL_SIZE),
+        max_size=POSTGRES_POOL_SIZE,
         max_inactive_connection_lifetime=0,
+        max_cached_statement_lifetime=0,
         host=POSTGRES_HOST,
         port=POSTGRES_PORT,
         database=POSTGRES_DB,
         user=POSTGRES_USER,
         password=POSTGRES_PASSWORD,
-    ) as pool:
-        client_repository = PostgresClientRepository(pool)
-        transaction_repository = PostgresTransactionRepository(pool)
+        server_settings={"application_name": INSTANCE_NAME},
+        connection_class=StatementConnection,
+        init=prepare_ring_statements if TRANSACTION_RING_SIZE else prepare_statements,
+    ) as asyncpg_pool:
+        yield MeteredPool(asyncpg_pool, "default")
+
+
+@asynccontextmanager
+async def postgres_read_pool(pool: MeteredPool):
+    if READ_POOL_SIZE <= 0:
+        yield pool
+        return
+
+    async with asyncpg.create_pool(
+        min_size=min(POSTGRES_POOL_MIN_SIZE, READ_POOL_SIZE),
+        max_size=READ_POOL_SIZE,
+        max_inactive_connection_lifetime=0,
+        max_cached_statement_lifetime=0,
+        host=READ_POSTGRES_HOST,
+        port=READ_POSTGRES_PORT,
+        database=READ_POSTGRES_DB,
+        user=READ_POSTGRES_USER,
+        password=READ_POSTGRES_PASSWORD,
+        server_settings={"default_transaction_read_only": "on"},
+        connection_class=StatementConnection,
+        init=prepare_ring_statements if TRANSACTION_RING_SIZE else prepare_statements,
+    ) as asyncpg_pool:
+        yield MeteredPool(asyncpg_pool, "read")
+
+
+@asynccontextmanager
+async def postgres_repositories():
+    async with postgres_pool() as pool, postgres_read_pool(pool) as read_pool:
+        client_repository = ClientDirectory(PostgresClientRepository(pool))
+        await client_repository.load()
+        transaction_repository = PostgresTransactionRepository(
+            pool, read_pool, TRANSACTION_RING_SIZE
+        )
+        if TRANSACTION_BATCH_WINDOW > 0 and TRANSACTION_RING_SIZE > 0:
+            raise ValueError(
+                "TRANSACTION_RING_SIZE is not supported with TRANSACTION_BATCH_WINDOW"
+            )
+        if TRANSACTION_BATCH_WINDOW > 0 and TRANSACTION_DISPATCH:
+            raise ValueError(
+                "TRANSACTION_DISPATCH is not supported with TRANSACTION_BATCH_WINDOW"
+            )
+        if TRANSACTION_BATCH_WINDOW > 0:
+            writing_repository = BatchingTransactionRepository(
+                pool,
+                transaction_repository,
+                window=TRANSACTION_BATCH_WINDOW,
+                max_size=TRANSACTION_BATCH_SIZE,
+            )
+        elif TRANSACTION_DISPATCH:
+            writing_repository = ClientWriteDispatcher(
+                pool, transaction_repository, TRANSACTION_RING_SIZE
+            )
+        else:
+            writing_repository = None
+
+        try:
+            async with statement_cache(
+                writing_repository or transaction_repository,
+                PostgresTransactionRepository(pool, ring_size=TRANSACTION_RING_SIZE),
+            ) as repository:
+                yield {
+                    "client_repository": client_repository,
+                    "transaction_repository": repository,
+                }
+        finally:
+            if writing_repository is not None:
+                await writing_repository.close()
+
+
+@asynccontextmanager
+async def statement_cache(
+    repository: TransactionRepository, primary: TransactionRepository
+):
+    if STATEMENT_CACHE_TTL <= 0:
+        yield repository
+        return
+
+    cache = CachingTransactionRepository(
+        repository,
+        STATEMENT_CACHE_TTL,
+        INSTANCE_NAME,
+        lambda: asyncpg.connect(
+            host=POSTGRES_HOST,
+            port=POSTGRES_PORT,
+            database=POSTGRES_DB,
+            user=POSTGRES_USER,
+            password=POSTGRES_PASSWORD,
+        ),
+        primary,
+    )
+    try:
+        await cache.listen()
+        yield cache
+    finally:
+        await cache.close()
+
+
+@asynccontextmanager
+async def write_behind_repositories():
+    if TRANSACTION_RING_SIZE > 0:
+        raise ValueError(
+            "TRANSACTION_RING_SIZE is not supported with REPOSITORY_BACKEND=write-behind"
+        )
+    async with postgres_pool() as pool:
+        ledger = InMemoryLedger()
+        await load_ledger(pool, ledger, OWNERSHIP)
+        queue = PersistenceQueue(
+            pool, WRITE_BEHIND_BATCH_SIZE, WRITE_BEHIND_MAX_ATTEMPTS
+        )
+        queue.start()
+        try:
+            yield {
+                "client_repository": WriteBehindClientRepository(
+                    ledger, PostgresClientRepository(pool), OWNERSHIP
+                ),
+                "transaction_repository": WriteBehindTransactionRepository(
+                    ledger,
+                    TransactionIds(pool, WRITE_BEHIND_BATCH_SIZE),
+                    queue,
+                    PostgresTransactionRepository(pool),
+                ),
+            }
+        finally:
+            await queue.close(WRITE_BEHIND_CLOSE_TIMEOUT)
+
+
+@asynccontextmanager
+async def mapped_repositories():
+    ledger = MappedLedger(
+        MMAP_LEDGER_PATH,
+        MMAP_LEDGER_CAPACITY,
+        IN_MEMORY_CLIENT_LIMITS,
+        flush_on_write=MMAP_LEDGER_FLUSH_INTERVAL <= 0,
+    )
+    flushing = (
+        asyncio.create_task(flush_periodically(ledger, MMAP_LEDGER_FLUSH_INTERVAL))
+        if MMAP_LEDGER_FLUSH_INTERVAL > 0
+        else None
+    )
+    try:
         yield {
-            "client_repository": client_repository,
-            "transaction_repository": transaction_repository,
+            "client_repository": MappedClientRepository(ledger),
+            "transaction_repository": MappedTransactionRepository(ledger),
         }
+    finally:
+        if flushing is not None:
+            flushing.cancel()
+            with suppress(asyncio.CancelledError):
+                await flushing
+        ledger.close()
 
 
 app = Starlette(
@@ -51,11 +360,26 @@ app = Starlette(
             make_transaction_controller,
             methods=["POST"],
         ),
+        Route(
+            "/clientes/{id:int}/transacoes/lote",
+            make_transactions_controller,
+            methods=["POST"],
+        ),
         Route(
             "/clientes/{id:int}/extrato",
             get_bank_statement_controller,
             methods=["GET"],
         ),
+        Route(
+            "/clientes/{id:int}/historico",
+            get_history_controller,
+            methods=["GET"],
+        ),
+        Route("/metrics", metrics_controller, methods=["GET"]),
+        Route("/health", health_controller, methods=["GET"]),
     ],
+    middleware=[Middleware(ShardMiddleware)],
     lifespan=lifespan,
 )
+
+fast_app = ShardMiddleware(FastApp(app))
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterable, Mapping, Sequence
+from typing import AsyncContextManager, Unpack
+
+from asyncpg import Connection, Record
+from asyncpg.pool import PoolConnectionProxy
+from returns import Err, Ok, Result
+
+from ...adapters.errors import (
+    ClientDoesNotExistError,
+    HistoryNotSupportedError,
+    NoLimitError,
+)
+from ...adapters.transaction_repository import (
+    BankStatement,
+    GetByClientIdProps,
+    GetHistoryProps,
+    TransactionRepository,
+)
+from ...core.entities.client import Client
+from ...core.entities.entity import Entity
+from ...core.entities.transaction import Transaction, TransactionKind
+from .metered_pool import MeteredPool
+from .postgres_statements import QUERY_SECONDS, Statement
+
+type CreateResult = Result[Entity[Client], ClientDoesNotExistError | NoLimitError]
+
+
+class BatchingTransactionRepository(TransactionRepository):
+    def __init__(
+        self,
+        pool: MeteredPool,
+        repository: TransactionRepository,
+        window: float,
+        max_size: int,
+    ) -> None:
+        self.__pool = pool
+        self.__repository = repository
+        self.__window = window
+        self.__max_size = max_size
+        self.__pending = list[tuple[Transaction, asyncio.Future[CreateResult]]]()
+        self.__timer: asyncio.TimerHandle | None = None
+        self.__tasks = set[asyncio.Task[None]]()
+
+    async def create(self, transaction: Transaction) -> CreateResult:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.__pending.append((transaction, future))
+        if len(self.__pending) >= self.__max_size:
+            self.__flush()
+        elif self.__timer is None:
+            self.__timer = loop.call_later(self.__window, self.__flush)
+        return await future
+
+    async def create_many(
+        self, transactions: Sequence[Transaction]
+    ) -> Sequence[CreateResult]:
+        return await self.__repository.create_many(transactions)
+
+    def get_by_client_id(
+        self, **props: Unpack[GetByClientIdProps]
+    ) -> AsyncContextManager[
+        Result[AsyncIterable[Entity[Transaction]], ClientDoesNotExistError]
+    ]:
+        return self.__repository.get_by_client_id(**props)
+
+    async def get_statement(
+        self, **props: Unpack[GetByClientIdProps]
+    ) -> Result[BankStatement, ClientDoesNotExistError]:
+        return await self.__repository.get_statement(**props)
+
+    def get_history(self, **props: Unpack[GetHistoryProps]) -> AsyncContextManager[
+        Result[
+            AsyncIterable[Entity[Transaction]],
+            ClientDoesNotExistError | HistoryNotSupportedError,
+        ]
+    ]:
+        return self.__repository.get_history(**props)
+
+    async def close(self) -> None:
+        self.__flush()
+        await asyncio.gather(*self.__tasks)
+
+    def __flush(self) -> None:
+        if self.__timer is not None:
+            self.__timer.cancel()
+            self.__timer = None
+        if not self.__pending:
+            return
+        batch, self.__pending = self.__pending, []
+        task = asyncio.create_task(self.__apply(batch))
+        self.__tasks.add(task)
+        task.add_done_callback(self.__tasks.discard)
+
+    async def __apply(
+        self, batch: list[tuple[Transaction, asyncio.Future[CreateResult]]]
+    ) -> None:
+        try:
+            async with self.__pool.acquire() as connection:
+                # Writes whose caller went away before the batch locks its
+                # clients are dropped; once locked, the whole batch is applied.
+                batch = [item for item in batch if not item[1].cancelled()]
+                if not batch:
+                    return
+                results = await apply_transactions(
+                    connection, [transaction for transaction, _ in batch]
+                )
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+async def apply_transactions(
+    connection: Connection[Record] | PoolConnectionProxy[Record],
+    transactions: Sequence[Transaction],
+) -> list[CreateResult]:
+    async with connection.transaction():
+        with QUERY_SECONDS[Statement.LOCK_CLIENTS].time():
+            records = await connection.statement(Statement.LOCK_CLIENTS).fetch(
+                list({transaction.client_id for transaction in transactions})
+            )
+        clients = {
+            record["id"]: Client(record["limit"], record["balance"])
+            for record in records
+        }
+
+        results = list[CreateResult]()
+        applied = list[Transaction]()
+        for transaction in transactions:
+            client = clients.get(transaction.client_id)
+            if client is None:
+                results.append(Err(ClientDoesNotExistError()))
+                continue
+            if transaction.kind == TransactionKind.CREDIT:
+                balance = client.balance + transaction.value
+            else:
+                balance = client.balance - transaction.value
+                if balance < client.limit * -1:
+                    results.append(Err(NoLimitError()))
+                    continue
+            client = Client(client.limit, balance)
+            clients[transaction.client_id] = client
+            applied.append(transaction)
+            results.append(Ok(Entity(client, transaction.client_id)))
+
+        if applied:
+            await store_transactions(
+                connection,
+                applied,
+                {
+                    transaction.client_id: clients[transaction.client_id].balance
+                    for transaction in applied
+                },
+            )
+    return results
+
+
+async def store_transactions(
+    connection: Connection[Record] | PoolConnectionProxy[Record],
+    transactions: Sequence[Transaction],
+    balances: Mapping[int, int],
+) -> None:
+    with QUERY_SECONDS[Statement.CREATE_TRANSACTIONS].time():
+        await connection.statement(Statement.CREATE_TRANSACTIONS).fetch(
+            [transaction.client_id for transaction in transactions],
+            [transaction.value for transaction in transactions],
+            [transaction.kind for transaction in transactions],
+            [transaction.description for transaction in transactions],
+            [transaction.created_at for transaction in transactions],
+        )
+    with QUERY_SECONDS[Statement.UPDATE_BALANCES].time():
+        await connection.statement(Statement.UPDATE_BALANCES).fetch(
+            list(balances), list(balances.values())
+        )
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import Counter, deque
+from collections.abc import AsyncIterable, Awaitable, Callable, Sequence
+from contextlib import suppress
+from time import monotonic
+from typing import AsyncContextManager, Unpack
+
+import asyncpg
+import orjson
+from returns import Ok, Result
+
+from ...adapters.errors import (
+    ClientDoesNotExistError,
+    HistoryNotSupportedError,
+    NoLimitError,
+)
+from ...adapters.transaction_repository import (
+    BankStatement,
+    GetByClientIdProps,
+    GetHistoryProps,
+    TransactionRepository,
+)
+from ...core.entities.client import Client
+from ...core.entities.entity import Entity
+from ...core.entities.transaction import Transaction
+from ..metrics import METRICS, Metrics
+from .transaction_json import render_transaction, render_transactions
+
+CLIENT_CHANGES_CHANNEL = "client_changes"
+CLIENT_CHANGES_TRIGGER_EXISTS = (
+    """SELECT EXISTS(\n"""
+    """    SELECT 1 FROM pg_trigger\n"""
+    """    WHERE tgrelid = 'client'::regclass AND tgname = 'client_changes'\n"""
+    """)\n"""
+)
+STATEMENT_SIZE = 10
+
+type CreateResult = Result[Entity[Client], ClientDoesNotExistError | NoLimitError]
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeTriggerMissingError(Exception):
+    def __init__(self) -> None:
+        super().__init__(
+            f"the {CLIENT_CHANGES_CHANNEL} trigger is missing, apply "
+            "migrations/0002_client_change_notifications.sql"
+        )
+
+
+class CachedStatement:
+    __slots__ = ("limit", "balance", "transactions", "json", "expires_at")
+
+    def __init__(
+        self, statement: BankStatement, transactions: deque[bytes], expires_at: float
+    ) -> None:
+        self.limit = statement.limit
+        self.balance = statement.balance
+        self.transactions = transactions
+        self.json: bytes | None = None
+        self.expires_at = expires_at
+
+    def to_statement(self) -> BankStatement:
+        if self.json is None:
+            self.json = render_transactions(self.transactions)
+        return BankStatement(self.limit, self.balance, self.json)
+
+
+class CachingTransactionRepository(TransactionRepository):
+    def __init__(
+        self,
+        repository: TransactionRepository,
+        ttl: float,
+        instance: str,
+        connect: Callable[[], Awaitable[asyncpg.Connection]],
+        primary: TransactionRepository | None = None,
+        reconnect_delay: float = 1.0,
+        metrics: Metrics = METRICS,
+    ) -> None:
+        self.__repository = repository
+        self.__primary = repository if primary is None else primary
+        self.__ttl = ttl
+        self.__instance = instance
+        self.__connect = connect
+        self.__reconnect_delay = reconnect_delay
+        self.__statements = dict[int, CachedStatement]()
+        self.__epochs = Counter[int]()
+        self.__writing = Counter[int]()
+        self.__hits = 0
+        self.__misses = 0
+        self.__connection: asyncpg.Connection | None = None
+        self.__disconnections = 0
+        self.__reconnecting: asyncio.Task[None] | None = None
+        self.__closed = False
+        metrics.counter(
+            "rinha_statement_cache_hits_total",
+            "Statements served from the process cache.",
+            lambda: self.__hits,
+        )
+        metrics.counter(
+            "rinha_statement_cache_misses_total",
+            "Statements read from the repository.",
+            lambda: self.__misses,
+        )
+        metrics.gauge(
+            "rinha_statement_cache_size",
+            "Clients with a cached statement.",
+            lambda: len(self.__statements),
+        )
+        metrics.gauge(
+            "rinha_statement_cache_listening",
+            "Whether the change listener is connected and caching is enabled.",
+            lambda: int(self.__connection is not None),
+        )
+
+    async def listen(self) -> None:
+        connection = await self.__connect()
+        try:
+            if not await connection.fetchval(CLIENT_CHANGES_TRIGGER_EXISTS):
+                raise ChangeTriggerMissingError()
+            connection.add_termination_listener(self.__on_termination)
+            await connection.add_listener(CLIENT_CHANGES_CHANNEL, self.__on_change)
+        except BaseException:
+            await connection.close()
+            raise
+        self.__statements.clear()
+        self.__connection = connection
+
+    async def close(self) -> None:
+        self.__closed = True
+        if self.__reconnecting is not None:
+            self.__reconnecting.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.__reconnecting
+        connection, self.__connection = self.__connection, None
+        if connection is not None and not connection.is_closed():
+            connection.remove_termination_listener(self.__on_termination)
+            await connection.close()
+
+    async def create(self, transaction: Transaction) -> CreateResult:
+        id = transaction.client_id
+        epoch = self.__start_write(id)
+        try:
+            result = await self.__repository.create(transaction)
+        except BaseException:
+            self.__statements.pop(id, None)
+            raise
+        finally:
+            self.__writing[id] -= 1
+        self.__finish_write(id, epoch, ((transaction, result),))
+        return result
+
+    async def create_many(
+        self, transactions: Sequence[Transaction]
+    ) -> Sequence[CreateResult]:
+        ids = {transaction.client_id for transaction in transactions}
+        epochs = {id: self.__start_write(id) for id in ids}
+        try:
+            results = await self.__repository.create_many(transactions)
+        except BaseException:
+            for id in ids:
+                self.__statements.pop(id, None)
+            raise
+        finally:
+            for id in ids:
+                self.__writing[id] -= 1
+        for id, epoch in epochs.items():
+            self.__finish_write(
+                id,
+                epoch,
+                tuple(
+                    (transaction, result)
+                    for transaction, result in zip(transactions, results)
+                    if transaction.client_id == id
+                ),
+            )
+        return results
+
+    def get_by_client_id(
+        self, **props: Unpack[GetByClientIdProps]
+    ) -> AsyncContextManager[
+        Result[AsyncIterable[Entity[Transaction]], ClientDoesNotExistError]
+    ]:
+        return self.__repository.get_by_client_id(**props)
+
+    async def get_statement(
+        self, **props: Unpack[GetByClientIdProps]
+    ) -> Result[BankStatement, ClientDoesNotExistError]:
+        amount = props.get("amount", STATEMENT_SIZE)
+        if "starting_from" in props or amount != STATEMENT_SIZE:
+            return await self.__repository.get_statement(**props)
+
+        id = props["id"]
+        cached = self.__statements.get(id)
+        if cached is not None and cached.expires_at > monotonic():
+            self.__hits += 1
+            return Ok(cached.to_statement())
+
+        self.__misses += 1
+        if self.__connection is None:
+            return await self.__repository.get_statement(**props)
+        epoch = self.__epochs[id]
+        disconnections = self.__disconnections
+        result = await self.__primary.get_statement(**props)
+        match result:
+            case Ok(statement) if (
+                self.__connection is not None
+                and self.__disconnections == disconnections
+                and self.__writing[id] == 0
+                and self.__epochs[id] == epoch
+            ):
+                self.__statements[id] = CachedStatement(
+                    statement,
+                    deque(
+                        (
+                            orjson.dumps(item)
+                            for item in orjson.loads(statement.transactions)
+                        ),
+                        maxlen=STATEMENT_SIZE,
+                    ),
+                    monotonic() + self.__ttl,
+                )
+        return result
+
+    def get_history(self, **props: Unpack[GetHistoryProps]) -> AsyncContextManager[
+        Result[
+            AsyncIterable[Entity[Transaction]],
+            ClientDoesNotExistError | HistoryNotSupportedError,
+        ]
+    ]:
+        return self.__repository.get_history(**props)
+
+    def __start_write(self, id: int) -> int:
+        self.__epochs[id] += 1
+        self.__writing[id] += 1
+        return self.__epochs[id]
+
+    def __finish_write(
+        self,
+        id: int,
+        epoch: int,
+        results: Sequence[tuple[Transaction, CreateResult]],
+    ) -> None:
+        cached = self.__statements.get(id)
+        if cached is None:
+            return
+        if self.__epochs[id] != epoch or self.__writing[id] > 0:
+            del self.__statements[id]
+            return
+        for transaction, result in results:
+            match result:
+                case Ok(client):
+                    cached.balance = client.props.balance
+                    cached.transactions.appendleft(render_transaction(transaction))
+                    cached.json = None
+
+    def __on_change(
+        self,
+        connection: asyncpg.Connection,
+        pid: int,
+        channel: str,
+        payload: str,
+    ) -> None:
+        id, _, instance = payload.partition(" ")
+        if instance == self.__instance:
+            return
+        self.__epochs[int(id)] += 1
+        self.__statements.pop(int(id), None)
+
+    def __on_termination(self, connection: asyncpg.Connection) -> None:
+        if connection is not self.__connection:
+            return
+        logger.warning(
+            "lost the %s listener; caching statements is disabled until it is back",
+            CLIENT_CHANGES_CHANNEL,
+        )
+        self.__connection = None
+        self.__disconnections += 1
+        self.__statements.clear()
+        if not self.__closed:
+            self.__reconnecting = asyncio.create_task(self.__reconnect())
+
+    async def __reconnect(self) -> None:
+        while not self.__closed:
+            await asyncio.sleep(self.__reconnect_delay)
+            try:
+                await self.listen()
+            except (OSError, asyncpg.PostgresError, ChangeTriggerMissingError):
+                logger.exception("could not listen to %s", CLIENT_CHANGES_CHANNEL)
+                continue
+            logger.info("listening to %s again", CLIENT_CHANGES_CHANNEL)
+            return
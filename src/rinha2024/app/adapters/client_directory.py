@@ -0,0 +1,38 @@
+from collections.abc import Sequence
+
+from returns import Err, Result
+
+from ...adapters.client_repository import ClientRepository
+from ...adapters.errors import ClientDoesNotExistError
+from ...core.entities.client import Client
+from ...core.entities.entity import Entity
+
+
+class ClientDirectory(ClientRepository):
+    def __init__(self, repository: ClientRepository) -> None:
+        self.__repository = repository
+        self.__limits = dict[int, int]()
+
+    async def load(self) -> None:
+        await self.get_all()
+
+    def limit(self, id: int) -> int | None:
+        return self.__limits.get(id)
+
+    async def create(self, client: Client) -> Entity[Client]:
+        created = await self.__repository.create(client)
+        self.__limits[created.id] = created.props.limit
+        return created
+
+    async def get(self, id: int) -> Result[Entity[Client], ClientDoesNotExistError]:
+        if id not in self.__limits:
+            return Err(ClientDoesNotExistError())
+        return await self.__repository.get(id)
+
+    async def get_all(self) -> Sequence[Entity[Client]]:
+        clients = await self.__repository.get_all()
+        self.__limits = {client.id: client.props.limit for client in clients}
+        return clients
+
+    async def exists(self, id: int) -> bool:
+        return id in self.__limits
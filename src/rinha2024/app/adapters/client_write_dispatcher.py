@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterable, Sequence
+from typing import AsyncContextManager, Unpack
+
+from returns import Result
+
+from ...adapters.errors import ClientDoesNotExistError, NoLimitError
+from ...adapters.transaction_repository import (
+    BankStatement,
+    GetByClientIdProps,
+    GetHistoryProps,
+    TransactionRepository,
+)
+from ...core.entities.client import Client
+from ...core.entities.entity import Entity
+from ...core.entities.transaction import Transaction
+from ..metrics import METRICS, Metrics
+from .metered_pool import MeteredPool
+from .postgres_transaction_repository import create_transaction
+
+type CreateResult = Result[Entity[Client], ClientDoesNotExistError | NoLimitError]
+type WriteQueue = deque[tuple[Transaction, asyncio.Future[CreateResult]]]
+
+
+class ClientWriteDispatcher(TransactionRepository):
+    def __init__(
+        self,
+        pool: MeteredPool,
+        repository: TransactionRepository,
+        ring_size: int = 0,
+        metrics: Metrics = METRICS,
+    ) -> None:
+        self.__pool = pool
+        self.__repository = repository
+        self.__ring_size = ring_size
+        self.__queues = dict[int, WriteQueue]()
+        self.__tasks = set[asyncio.Task[None]]()
+        metrics.gauge(
+            "rinha_dispatcher_queued_writes",
+            "Writes waiting behind another write for the same client.",
+            lambda: sum(len(queue) for queue in self.__queues.values()),
+        )
+        metrics.gauge(
+            "rinha_dispatcher_active_clients",
+            "Clients with a write worker holding a connection.",
+            lambda: len(self.__queues),
+        )
+
+    async def create(self, transaction: Transaction) -> CreateResult:
+        future = asyncio.get_running_loop().create_future()
+        queue = self.__queues.get(transaction.client_id)
+        if queue is None:
+            queue = deque[tuple[Transaction, asyncio.Future[CreateResult]]]()
+            self.__queues[transaction.client_id] = queue
+            task = asyncio.create_task(self.__drain(transaction.client_id, queue))
+            self.__tasks.add(task)
+            task.add_done_callback(self.__tasks.discard)
+        queue.append((transaction, future))
+        return await future
+
+    async def create_many(
+        self, transactions: Sequence[Transaction]
+    ) -> Sequence[CreateResult]:
+        return await self.__repository.create_many(transactions)
+
+    def get_by_client_id(
+        self, **props: Unpack[GetByClientIdProps]
+    ) -> AsyncContextManager[
+        Result[AsyncIterable[Entity[Transaction]], ClientDoesNotExistError]
+    ]:
+        return self.__repository.get_by_client_id(**props)
+
+    async def get_statement(
+        self, **props: Unpack[GetByClientIdProps]
+    ) -> Result[BankStatement, ClientDoesNotExistError]:
+        return await self.__repository.get_statement(**props)
+
+    def get_history(
+        self, **props: Unpack[GetHistoryProps]
+    ) -> AsyncContextManager[
+        Result[AsyncIterable[Entity[Transaction]], ClientDoesNotExistError]
+    ]:
+        return self.__repository.get_history(**props)
+
+    async def close(self) -> None:
+        await asyncio.gather(*self.__tasks)
+
+    async def __drain(self, id: int, queue: WriteQueue) -> None:
+        failure: Exception | None = None
+        try:
+            async with self.__pool.acquire() as connection:
+                while queue:
+                    transaction, future = queue[0]
+                    if future.done():
+                        queue.popleft()
+                        continue
+                    try:
+                        result = await create_transaction(
+                            connection, transaction, self.__ring_size
+                        )
+                    except Exception as error:
+                        queue.popleft()
+                        if not future.done():
+                            future.set_exception(error)
+                        continue
+                    queue.popleft()
+                    if not future.done():
+                        future.set_result(result)
+                del self.__queues[id]
+        except Exception as error:
+            failure = error
+        finally:
+            if self.__queues.get(id) is queue:
+                del self.__queues[id]
+            while queue:
+                _, future = queue.popleft()
+                if future.done():
+                    continue
+                if failure is None:
+                    future.cancel()
+                else:
+                    future.set_exception(failure)
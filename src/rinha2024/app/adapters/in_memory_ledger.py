@@ -0,0 +1,128 @@
+from collections.abc import Iterator
+from datetime import datetime
+from itertools import islice
+
+from returns import Err, Ok, Result
+
+from ...adapters.errors import ClientDoesNotExistError, NoLimitError
+from ...adapters.transaction_repository import BankStatement
+from ...core.entities.client import Client
+from ...core.entities.entity import Entity
+from ...core.entities.transaction import Transaction, TransactionKind
+from ...core.entities.transaction_ring import TransactionRing
+from .transaction_json import render_transaction, render_transactions
+
+HISTORY_SIZE = 10
+
+
+class ClientLedger:
+    __slots__ = ("limit", "balance", "transactions", "statement")
+
+    def __init__(self, id: int, limit: int, balance: int, history_size: int) -> None:
+        self.limit = limit
+        self.balance = balance
+        self.transactions = TransactionRing(id, history_size)
+        self.statement: bytes | None = None
+
+    def to_entity(self, id: int) -> Entity[Client]:
+        return Entity(Client(self.limit, self.balance), id)
+
+
+class InMemoryLedger:
+    def __init__(self, history_size: int = HISTORY_SIZE) -> None:
+        self.__history_size = history_size
+        self.__last_client_id = 0
+        self.__last_transaction_id = 0
+        self.__clients = dict[int, ClientLedger]()
+
+    def add_client(self, limit: int, balance: int = 0) -> Entity[Client]:
+        return self.load_client(self.__last_client_id + 1, limit, balance)
+
+    def load_client(self, id: int, limit: int, balance: int) -> Entity[Client]:
+        ledger = ClientLedger(id, limit, balance, self.__history_size)
+        self.__clients[id] = ledger
+        self.__last_client_id = max(self.__last_client_id, id)
+        return ledger.to_entity(id)
+
+    def load_transaction(self, transaction: Entity[Transaction]) -> None:
+        ledger = self.__clients[transaction.props.client_id]
+        ledger.transactions.append(transaction.id, transaction.props)
+        ledger.statement = None
+        self.__last_transaction_id = max(self.__last_transaction_id, transaction.id)
+
+    @property
+    def history_size(self) -> int:
+        return self.__history_size
+
+    def get(self, id: int) -> ClientLedger | None:
+        return self.__clients.get(id)
+
+    def clients(self) -> Iterator[tuple[int, ClientLedger]]:
+        return iter(self.__clients.items())
+
+    def __contains__(self, id: int) -> bool:
+        return id in self.__clients
+
+    def append(
+        self, transaction: Transaction, id: int | None = None
+    ) -> Result[Entity[Client], ClientDoesNotExistError | NoLimitError]:
+        ledger = self.__clients.get(transaction.client_id)
+        if ledger is None:
+            return Err(ClientDoesNotExistError())
+
+        if transaction.kind == TransactionKind.CREDIT:
+            balance = ledger.balance + transaction.value
+        else:
+            balance = ledger.balance - transaction.value
+            if balance < ledger.limit * -1:
+                return Err(NoLimitError())
+
+        ledger.balance = balance
+        if id is None:
+            id = self.__last_transaction_id + 1
+        self.__last_transaction_id = max(self.__last_transaction_id, id)
+        ledger.transactions.append(id, transaction)
+        ledger.statement = None
+        return Ok(ledger.to_entity(transaction.client_id))
+
+    def latest(
+        self, id: int, starting_from: datetime, amount: int
+    ) -> Result[tuple[Entity[Transaction], ...], ClientDoesNotExistError]:
+        ledger = self.__clients.get(id)
+        if ledger is None:
+            return Err(ClientDoesNotExistError())
+        return Ok(tuple(islice(ledger.transactions.newest(starting_from), amount)))
+
+    def statement(
+        self, id: int, starting_from: datetime, amount: int
+    ) -> Result[BankStatement, ClientDoesNotExistError]:
+        ledger = self.__clients.get(id)
+        if ledger is None:
+            return Err(ClientDoesNotExistError())
+        latest = ledger.transactions.latest_created_at()
+        if amount < len(ledger.transactions) or (
+            latest is not None and latest > starting_from
+        ):
+            return Ok(
+                BankStatement(
+                    ledger.limit,
+                    ledger.balance,
+                    self.__render(ledger, starting_from, amount),
+                )
+            )
+        if ledger.statement is None:
+            ledger.statement = self.__render(ledger, starting_from, amount)
+        return Ok(BankStatement(ledger.limit, ledger.balance, ledger.statement))
+
+    def __render(
+        self, ledger: ClientLedger, starting_from: datetime, amount: int
+    ) -> bytes:
+        return render_transactions(
+            islice(
+                (
+                    render_transaction(transaction.props)
+                    for transaction in ledger.transactions.newest(starting_from)
+                ),
+                amount,
+            )
+        )
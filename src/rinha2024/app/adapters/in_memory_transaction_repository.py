@@ -1,88 +1,81 @@
-from collections.abc import Sequence
-from copy import copy
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Sequence
+from contextlib import nullcontext
 from datetime import datetime, timezone
-from operator import add, sub
-from typing import Unpack
+from typing import AsyncContextManager, Unpack
 
 from returns import Err, Ok
 from returns.result import Result
 
-from ...adapters.errors import ClientDoesNotExistError, NoLimitError
-from ...adapters.transaction_repository import GetByClientIdProps, TransactionRepository
+from ...adapters.errors import (
+    ClientDoesNotExistError,
+    HistoryNotSupportedError,
+    NoLimitError,
+)
+from ...adapters.transaction_repository import (
+    BankStatement,
+    GetByClientIdProps,
+    GetHistoryProps,
+    TransactionRepository,
+)
 from ...core.entities.client import Client
 from ...core.entities.entity import Entity
-from ...core.entities.transaction import Transaction, TransactionKind
-
-OPERATION_MAP = {TransactionKind.CREDIT: add, TransactionKind.DEBIT: sub}
+from ...core.entities.transaction import Transaction
+from .in_memory_ledger import InMemoryLedger
 
 
 class InMemoryTransactionRepository(TransactionRepository):
-    def __init__(
-        self, clients: dict[int, int], transactions: list[Transaction]
-    ) -> None:
-        self.__clients = clients
-        self.__transactions = transactions
+    def __init__(self, ledger: InMemoryLedger) -> None:
+        self.__ledger = ledger
 
     async def create(
         self, transaction: Transaction
     ) -> Result[Entity[Client], ClientDoesNotExistError | NoLimitError]:
-        if transaction.client_id not in self.__clients:
-            return Err(ClientDoesNotExistError())
-
-        operation = OPERATION_MAP[transaction.kind]
-        balance = operation(
-            self.__get_balance(transaction.client_id), transaction.value
-        )
+        return self.__ledger.append(transaction)
 
-        if balance < self.__clients[transaction.client_id] * -1:
-            return Err(NoLimitError())
+    async def create_many(
+        self, transactions: Sequence[Transaction]
+    ) -> Sequence[Result[Entity[Client], ClientDoesNotExistError | NoLimitError]]:
+        return [self.__ledger.append(transaction) for transaction in transactions]
 
-        self.__transactions.append(copy(transaction))
-        return Ok(
-            Entity(
-                Client(self.__clients[transaction.client_id], balance),
-                transaction.client_id,
-            )
-        )
-
-    def __get_balance(self, id: int) -> int:
-        return sum(
-            map(
-                lambda transaction: (
-                    transaction.value
-                    if transaction.kind == TransactionKind.CREDIT
-                    else transaction.value * -1
-                ),
-                filter(
-                    lambda transaction: transaction.client_id == id, self.__transactions
-                ),
-            )
-        )
+    def get_by_client_id(
+        self, **props: Unpack[GetByClientIdProps]
+    ) -> AsyncContextManager[
+        Result[AsyncIterable[Entity[Transaction]], ClientDoesNotExistError]
+    ]:
+        if "starting_from" not in props:
+            props["starting_from"] = datetime.now(timezone.utc)
+        if "amount" not in props:
+            props["amount"] = self.__ledger.history_size
+        match self.__ledger.latest(
+            props["id"], props["starting_from"], props["amount"]
+        ):
+            case Ok(transactions):
+                return nullcontext(Ok(self.__iterate(transactions)))
+            case Err(error):
+                return nullcontext(Err(error))
 
-    async def get_by_client_id(
+    async def get_statement(
         self, **props: Unpack[GetByClientIdProps]
-    ) -> Result[Sequence[Entity[Transaction]], ClientDoesNotExistError]:
-        if props["id"] not in self.__clients:
-            return Err(ClientDoesNotExistError())
+    ) -> Result[BankStatement, ClientDoesNotExistError]:
         if "starting_from" not in props:
             props["starting_from"] = datetime.now(timezone.utc)
         if "amount" not in props:
-            props["amount"] = len(self.__transactions)
-        return Ok(
-            tuple(
-                map(
-                    lambda transaction: Entity(
-                        transaction, self.__transactions.index(transaction)
-                    ),
-                    sorted(
-                        filter(
-                            lambda transaction: transaction.client_id == props["id"]
-                            and transaction.created_at <= props["starting_from"],
-                            self.__transactions,
-                        ),
-                        key=lambda transaction: transaction.created_at,
-                        reverse=True,
-                    )[0 : props["amount"]],
-                )
-            )
+            props["amount"] = 10
+        return self.__ledger.statement(
+            props["id"], props["starting_from"], props["amount"]
         )
+
+    def get_history(self, **props: Unpack[GetHistoryProps]) -> AsyncContextManager[
+        Result[
+            AsyncIterable[Entity[Transaction]],
+            ClientDoesNotExistError | HistoryNotSupportedError,
+        ]
+    ]:
+        # The ledger keeps only the latest transactions of each client.
+        return nullcontext(Err(HistoryNotSupportedError()))
+
+    async def __iterate(
+        self, transactions: Iterable[Entity[Transaction]]
+    ) -> AsyncIterator[Entity[Transaction]]:
+        for transaction in transactions:
+            yield transaction
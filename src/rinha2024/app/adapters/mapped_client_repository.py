@@ -0,0 +1,29 @@
+from collections.abc import Sequence
+
+from returns import Err, Ok, Result
+
+from ...adapters.client_repository import ClientRepository
+from ...adapters.errors import ClientDoesNotExistError
+from ...core.entities.client import Client
+from ...core.entities.entity import Entity
+from .mapped_ledger import MappedLedger
+
+
+class MappedClientRepository(ClientRepository):
+    def __init__(self, ledger: MappedLedger) -> None:
+        self.__ledger = ledger
+
+    async def create(self, client: Client) -> Entity[Client]:
+        return self.__ledger.add_client(client.limit, client.balance)
+
+    async def get(self, id: int) -> Result[Entity[Client], ClientDoesNotExistError]:
+        client = self.__ledger.get(id)
+        if client is None:
+            return Err(ClientDoesNotExistError())
+        return Ok(client)
+
+    async def get_all(self) -> Sequence[Entity[Client]]:
+        return tuple(self.__ledger.clients())
+
+    async def exists(self, id: int) -> bool:
+        return id in self.__ledger
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import mmap
+import os
+import struct
+from collections.abc import Iterator
+from datetime import datetime
+from itertools import islice
+from types import TracebackType
+from typing import Optional
+
+from returns import Err, Ok, Result
+
+from ...adapters.errors import ClientDoesNotExistError, NoLimitError
+from ...adapters.transaction_repository import BankStatement
+from ...core.entities.client import Client
+from ...core.entities.entity import Entity
+from ...core.entities.transaction import Transaction, TransactionKind
+from ...core.entities.transaction_ring import from_microseconds, to_microseconds
+from .in_memory_ledger import HISTORY_SIZE
+from .transaction_json import render_transaction, render_transactions
+
+MAGIC = b"RINHALDG"
+VERSION = 1
+HEADER = struct.Struct("<8sIII")
+HEADER_SIZE = 64
+SLOT = struct.Struct("<IIqqQ")
+ENTRY = struct.Struct("<QqqcB40s6x")
+
+
+class LedgerLayoutError(Exception): ...
+
+
+class MappedLedger:
+    def __init__(
+        self,
+        path: str,
+        capacity: int,
+        limits: tuple[int, ...] = (),
+        history_size: int = HISTORY_SIZE,
+        flush_on_write: bool = False,
+    ) -> None:
+        self.__capacity = capacity
+        self.__history_size = history_size
+        self.__flush_on_write = flush_on_write
+        self.__slot_size = SLOT.size + history_size * ENTRY.size
+        size = HEADER_SIZE + capacity * self.__slot_size
+        self.__fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            with HeaderLock(self.__fd):
+                created = os.fstat(self.__fd).st_size == 0
+                if created:
+                    os.ftruncate(self.__fd, size)
+                    os.pwrite(
+                        self.__fd,
+                        HEADER.pack(MAGIC, VERSION, capacity, history_size),
+                        0,
+                    )
+                layout = HEADER.unpack(os.pread(self.__fd, HEADER.size, 0))
+                if layout != (MAGIC, VERSION, capacity, history_size):
+                    raise LedgerLayoutError(
+                        f"{path} was created with version {layout[1]}, capacity "
+                        f"{layout[2]} and history size {layout[3]}"
+                    )
+                self.__map = mmap.mmap(self.__fd, size)
+                if created:
+                    for id, limit in enumerate(limits, 1):
+                        self.__write_slot(id, 1, 0, limit, 0, 0)
+                    self.__map.flush()
+        except BaseException:
+            os.close(self.__fd)
+            raise
+
+    @property
+    def history_size(self) -> int:
+        return self.__history_size
+
+    def add_client(self, limit: int, balance: int = 0) -> Entity[Client]:
+        with HeaderLock(self.__fd):
+            id = next(
+                (
+                    id
+                    for id in range(1, self.__capacity + 1)
+                    if not self.__read_slot(id)[0]
+                ),
+                None,
+            )
+            if id is None:
+                raise LedgerLayoutError(f"ledger is full ({self.__capacity} clients)")
+            self.__write_slot(id, 1, 0, limit, balance, 0)
+        self.__flush(self.__offset(id), SLOT.size)
+        return Entity(Client(limit, balance), id)
+
+    def get(self, id: int) -> Entity[Client] | None:
+        if not self.__in_range(id):
+            return None
+        with self.__locked(id, fcntl.LOCK_SH):
+            exists, _, limit, balance, _ = self.__read_slot(id)
+        if not exists:
+            return None
+        return Entity(Client(limit, balance), id)
+
+    def clients(self) -> Iterator[Entity[Client]]:
+        for id in self.__ids():
+            client = self.get(id)
+            if client is not None:
+                yield client
+
+    def __contains__(self, id: int) -> bool:
+        return self.__in_range(id) and bool(self.__read_slot(id)[0])
+
+    def append(
+        self, transaction: Transaction
+    ) -> Result[Entity[Client], ClientDoesNotExistError | NoLimitError]:
+        id = transaction.client_id
+        if id not in self:
+            return Err(ClientDoesNotExistError())
+
+        with self.__locked(id, fcntl.LOCK_EX):
+            exists, length, limit, balance, sequence = self.__read_slot(id)
+            if transaction.kind == TransactionKind.CREDIT:
+                balance += transaction.value
+            else:
+                balance -= transaction.value
+                if balance < limit * -1:
+                    return Err(NoLimitError())
+
+            description = transaction.description.encode()
+            position = sequence % self.__history_size
+            ENTRY.pack_into(
+                self.__map,
+                self.__offset(id) + SLOT.size + position * ENTRY.size,
+                sequence + 1,
+                transaction.value,
+                to_microseconds(transaction.created_at),
+                transaction.kind.encode(),
+                len(description),
+                description,
+            )
+            self.__write_slot(
+                id,
+                exists,
+                min(length + 1, self.__history_size),
+                limit,
+                balance,
+                sequence + 1,
+            )
+            self.__flush(self.__offset(id), self.__slot_size)
+        return Ok(Entity(Client(limit, balance), id))
+
+    def latest(
+        self, id: int, starting_from: datetime, amount: int
+    ) -> Result[tuple[Entity[Transaction], ...], ClientDoesNotExistError]:
+        match self.__snapshot(id):
+            case Ok((_, transactions)):
+                return Ok(
+                    tuple(
+                        islice(
+                            (
+                                transaction
+                                for transaction in transactions
+                                if transaction.props.created_at <= starting_from
+                            ),
+                            amount,
+                        )
+                    )
+                )
+            case Err(error):
+                return Err(error)
+
+    def statement(
+        self, id: int, starting_from: datetime, amount: int
+    ) -> Result[BankStatement, ClientDoesNotExistError]:
+        match self.__snapshot(id):
+            case Ok((client, transactions)):
+                return Ok(
+                    BankStatement(
+                        client.limit,
+                        client.balance,
+                        render_transactions(
+                            islice(
+                                (
+                                    render_transaction(transaction.props)
+                                    for transaction in transactions
+                                    if transaction.props.created_at <= starting_from
+                                ),
+                                amount,
+                            )
+                        ),
+                    )
+                )
+            case Err(error):
+                return Err(error)
+
+    def flush(self) -> None:
+        self.__map.flush()
+
+    def close(self) -> None:
+        self.__map.flush()
+        self.__map.close()
+        os.close(self.__fd)
+
+    def __snapshot(
+        self, id: int
+    ) -> Result[tuple[Client, list[Entity[Transaction]]], ClientDoesNotExistError]:
+        if not self.__in_range(id):
+            return Err(ClientDoesNotExistError())
+        with self.__locked(id, fcntl.LOCK_SH):
+            exists, length, limit, balance, sequence = self.__read_slot(id)
+            if not exists:
+                return Err(ClientDoesNotExistError())
+            entries = [
+                ENTRY.unpack_from(
+                    self.__map,
+                    self.__offset(id)
+                    + SLOT.size
+                    + (sequence - 1 - index) % self.__history_size * ENTRY.size,
+                )
+                for index in range(length)
+            ]
+        return Ok(
+            (
+                Client(limit, balance),
+                [
+                    Entity(
+                        Transaction(
+                            client_id=id,
+                            value=value,
+                            kind=TransactionKind(kind.decode()),
+                            description=description[:size].decode(),
+                            created_at=from_microseconds(created_at),
+                        ),
+                        transaction_id,
+                    )
+                    for transaction_id, value, created_at, kind, size, description in entries
+                ],
+            )
+        )
+
+    def __ids(self) -> Iterator[int]:
+        return (id for id in range(1, self.__capacity + 1) if self.__read_slot(id)[0])
+
+    def __in_range(self, id: int) -> bool:
+        return 1 <= id <= self.__capacity
+
+    def __offset(self, id: int) -> int:
+        return HEADER_SIZE + (id - 1) * self.__slot_size
+
+    def __read_slot(self, id: int) -> tuple[int, int, int, int, int]:
+        return SLOT.unpack_from(self.__map, self.__offset(id))
+
+    def __write_slot(
+        self, id: int, exists: int, length: int, limit: int, balance: int, sequence: int
+    ) -> None:
+        SLOT.pack_into(
+            self.__map, self.__offset(id), exists, length, limit, balance, sequence
+        )
+
+    def __locked(self, id: int, operation: int) -> SlotLock:
+        return SlotLock(self.__fd, self.__offset(id), self.__slot_size, operation)
+
+    def __flush(self, offset: int, size: int) -> None:
+        if not self.__flush_on_write:
+            return
+        start = offset - offset % mmap.PAGESIZE
+        self.__map.flush(start, offset + size - start)
+
+
+async def flush_periodically(ledger: MappedLedger, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        ledger.flush()
+
+
+class SlotLock:
+    __slots__ = ("__fd", "__offset", "__size", "__operation")
+
+    def __init__(self, fd: int, offset: int, size: int, operation: int) -> None:
+        self.__fd = fd
+        self.__offset = offset
+        self.__size = size
+        self.__operation = operation
+
+    def __enter__(self) -> None:
+        fcntl.lockf(self.__fd, self.__operation, self.__size, self.__offset)
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        fcntl.lockf(self.__fd, fcntl.LOCK_UN, self.__size, self.__offset)
+
+
+class HeaderLock(SlotLock):
+    __slots__ = ()
+
+    def __init__(self, fd: int) -> None:
+        super().__init__(fd, 0, HEADER_SIZE, fcntl.LOCK_EX)
@@ -0,0 +1,81 @@
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Sequence
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import AsyncContextManager, Unpack
+
+from returns import Err, Ok
+from returns.result import Result
+
+from ...adapters.errors import (
+    ClientDoesNotExistError,
+    HistoryNotSupportedError,
+    NoLimitError,
+)
+from ...adapters.transaction_repository import (
+    BankStatement,
+    GetByClientIdProps,
+    GetHistoryProps,
+    TransactionRepository,
+)
+from ...core.entities.client import Client
+from ...core.entities.entity import Entity
+from ...core.entities.transaction import Transaction
+from .mapped_ledger import MappedLedger
+
+
+class MappedTransactionRepository(TransactionRepository):
+    def __init__(self, ledger: MappedLedger) -> None:
+        self.__ledger = ledger
+
+    async def create(
+        self, transaction: Transaction
+    ) -> Result[Entity[Client], ClientDoesNotExistError | NoLimitError]:
+        return self.__ledger.append(transaction)
+
+    async def create_many(
+        self, transactions: Sequence[Transaction]
+    ) -> Sequence[Result[Entity[Client], ClientDoesNotExistError | NoLimitError]]:
+        return [self.__ledger.append(transaction) for transaction in transactions]
+
+    def get_by_client_id(
+        self, **props: Unpack[GetByClientIdProps]
+    ) -> AsyncContextManager[
+        Result[AsyncIterable[Entity[Transaction]], ClientDoesNotExistError]
+    ]:
+        if "starting_from" not in props:
+            props["starting_from"] = datetime.now(timezone.utc)
+        if "amount" not in props:
+            props["amount"] = self.__ledger.history_size
+        match self.__ledger.latest(
+            props["id"], props["starting_from"], props["amount"]
+        ):
+            case Ok(transactions):
+                return nullcontext(Ok(self.__iterate(transactions)))
+            case Err(error):
+                return nullcontext(Err(error))
+
+    async def get_statement(
+        self, **props: Unpack[GetByClientIdProps]
+    ) -> Result[BankStatement, ClientDoesNotExistError]:
+        if "starting_from" not in props:
+            props["starting_from"] = datetime.now(timezone.utc)
+        if "amount" not in props:
+            props["amount"] = 10
+        return self.__ledger.statement(
+            props["id"], props["starting_from"], props["amount"]
+        )
+
+    def get_history(self, **props: Unpack[GetHistoryProps]) -> AsyncContextManager[
+        Result[
+            AsyncIterable[Entity[Transaction]],
+            ClientDoesNotExistError | HistoryNotSupportedError,
+        ]
+    ]:
+        # The ledger keeps only the latest transactions of each client.
+        return nullcontext(Err(HistoryNotSupportedError()))
+
+    async def __iterate(
+        self, transactions: Iterable[Entity[Transaction]]
+    ) -> AsyncIterator[Entity[Transaction]]:
+        for transaction in transactions:
+            yield transaction
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from collections.abc import Generator
+from time import perf_counter
+from types import TracebackType
+from typing import Any, Optional
+
+from asyncpg import Pool, Record
+from asyncpg.pool import PoolConnectionProxy
+
+from ..metrics import METRICS, Metrics
+
+
+class MeteredPool:
+    def __init__(self, pool: Pool[Record], name: str, metrics: Metrics = METRICS):
+        self.__pool = pool
+        self.__waiters = 0
+        self.__acquire_seconds = metrics.histogram(
+            "rinha_pool_acquire_seconds",
+            "Time spent waiting for a pooled connection.",
+            pool=name,
+        )
+        metrics.gauge("rinha_pool_size", "Open connections.", pool.get_size, pool=name)
+        metrics.gauge(
+            "rinha_pool_idle", "Idle connections.", pool.get_idle_size, pool=name
+        )
+        metrics.gauge(
+            "rinha_pool_max_size",
+            "Maximum pool size.",
+            pool.get_max_size,
+            pool=name,
+        )
+        metrics.gauge(
+            "rinha_pool_waiters",
+            "Callers blocked until a busy connection is released.",
+            lambda: self.__waiters,
+            pool=name,
+        )
+
+    def acquire(self) -> MeteredAcquire:
+        return MeteredAcquire(self)
+
+    async def wait_for_connection(self) -> PoolConnectionProxy[Record]:
+        blocked = self.__exhausted()
+        self.__waiters += blocked
+        started = perf_counter()
+        try:
+            return await self.__pool.acquire()
+        finally:
+            self.__waiters -= blocked
+            self.__acquire_seconds.observe(perf_counter() - started)
+
+    async def release(self, connection: PoolConnectionProxy[Record]) -> None:
+        await self.__pool.release(connection)
+
+    def __exhausted(self) -> bool:
+        return (
+            self.__pool.get_idle_size() == 0
+            and self.__pool.get_size() >= self.__pool.get_max_size()
+        )
+
+
+class MeteredAcquire:
+    __slots__ = ("__pool", "__connection")
+
+    def __init__(self, pool: MeteredPool) -> None:
+        self.__pool = pool
+
+    async def __aenter__(self) -> PoolConnectionProxy[Record]:
+        self.__connection = await self.__pool.wait_for_connection()
+        return self.__connection
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.__pool.release(self.__connection)
+
+    def __await__(self) -> Generator[Any, None, PoolConnectionProxy[Record]]:
+        return self.__pool.wait_for_connection().__await__()
@@ -2,35 +2,30 @@ from __future__ import annotations
 
 from collections.abc import Sequence
 
-from asyncpg import Pool, Record
 from returns import Err, Ok, Result
 
 from ...adapters.client_repository import ClientRepository
 from ...adapters.errors import ClientDoesNotExistError
 from ...core.entities.client import Client
 from ...core.entities.entity import Entity
+from .metered_pool import MeteredPool
+from .postgres_statements import Statement
 
 
 class PostgresClientRepository(ClientRepository):
-    def __init__(self, pool: Pool[Record]) -> None:
+    def __init__(self, pool: MeteredPool) -> None:
         self.__pool = pool
 
     async def create(self, client: Client) -> Entity[Client]:
         async with self.__pool.acquire() as connection:
-            create_client_prepare = await connection.prepare(
-                """INSERT INTO Client(limit_value, balance)\n"""
-                """VALUES($1, 0);\n"""
-                """RETURNING id""",
+            id: int = await connection.statement(Statement.CREATE_CLIENT).fetchval(
+                client.limit
             )
-            id: int = await create_client_prepare.fetchval(client.limit)
         return Entity(Client(client.limit, 0), id)
 
     async def get(self, id: int) -> Result[Entity[Client], ClientDoesNotExistError]:
         async with self.__pool.acquire() as connection:
-            get_client_prepare = await connection.prepare(
-                "SELECT id, limit_value AS limit, balance FROM Client WHERE id = $1;\n",
-            )
-            record = await get_client_prepare.fetchrow(id)
+            record = await connection.statement(Statement.GET_CLIENT).fetchrow(id)
 
             if not record:
                 return Err(ClientDoesNotExistError())
@@ -38,9 +33,7 @@ class PostgresClientRepository(ClientRepository):
 
     async def get_all(self) -> Sequence[Entity[Client]]:
         async with self.__pool.acquire() as connection:
-            result = await connection.fetch(
-                "SELECT id, limit_value AS limit, balance FROM Client;\n",
-            )
+            result = await connection.statement(Statement.GET_ALL_CLIENTS).fetch()
 
             return tuple(
                 map(
@@ -51,8 +44,8 @@ class PostgresClientRepository(ClientRepository):
 
     async def exists(self, id: int) -> bool:
         async with self.__pool.acquire() as connection:
-            exists: bool = await connection.fetchval(
-                """SELECT EXISTS(SELECT 1 FROM Client WHERE id = $1)""", id
+            exists: bool = await connection.statement(Statement.CLIENT_EXISTS).fetchval(
+                id
             )
 
         return exists
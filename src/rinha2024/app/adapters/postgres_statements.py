@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from enum import StrEnum
+from typing import Any
+
+from asyncpg import Connection, PostgresError, Record
+from asyncpg.cursor import CursorFactory
+
+from ..metrics import METRICS
+
+
+class Statement(StrEnum):
+    CREATE_CLIENT = (
+        """INSERT INTO Client(limit_value, balance)\n"""
+        """VALUES($1, 0)\n"""
+        """RETURNING id\n"""
+    )
+    GET_CLIENT = (
+        """SELECT id, limit_value AS limit, balance FROM Client WHERE id = $1\n"""
+    )
+    GET_ALL_CLIENTS = """SELECT id, limit_value AS limit, balance FROM Client\n"""
+    CLIENT_EXISTS = """SELECT EXISTS(SELECT 1 FROM Client WHERE id = $1)\n"""
+    CREATE_TRANSACTION = (
+        """WITH client AS (\n"""
+        """    SELECT id FROM Client WHERE id = $1\n"""
+        """), updated AS (\n"""
+        """    UPDATE Client\n"""
+        """    SET balance = balance + $2\n"""
+        """    WHERE id = $1 AND balance + $2 >= limit_value * -1\n"""
+        """    RETURNING id, limit_value, balance\n"""
+        """), inserted AS (\n"""
+        """    INSERT INTO Transaction (client_id, value, kind, description, created_at)\n"""
+        """    SELECT id, $3, $4, $5, $6 FROM updated\n"""
+        """)\n"""
+        """SELECT\n"""
+        """    EXISTS(SELECT 1 FROM client) AS found,\n"""
+        """    updated.id,\n"""
+        """    updated.limit_value AS limit,\n"""
+        """    updated.balance\n"""
+        """FROM (VALUES (1)) AS single\n"""
+        """LEFT JOIN updated ON TRUE\n"""
+    )
+    CREATE_RING_TRANSACTION = (
+        """WITH client AS (\n"""
+        """    SELECT id FROM Client WHERE id = $1\n"""
+        """), updated AS (\n"""
+        """    UPDATE Client\n"""
+        """    SET\n"""
+        """        balance = balance + $2,\n"""
+        """        recent_transactions = jsonb_path_query_array(\n"""
+        """            jsonb_build_array(jsonb_build_object(\n"""
+        """                'valor', $3::int,\n"""
+        """                'tipo', $4::text,\n"""
+        """                'descricao', $5::text,\n"""
+        """                'realizada_em', $6::timestamptz\n"""
+        """            )) || recent_transactions,\n"""
+        """            '$[0 to $last]',\n"""
+        """            jsonb_build_object('last', $7::int - 1)\n"""
+        """        )\n"""
+        """    WHERE id = $1 AND balance + $2 >= limit_value * -1\n"""
+        """    RETURNING id, limit_value, balance\n"""
+        """), inserted AS (\n"""
+        """    INSERT INTO Transaction (client_id, value, kind, description, created_at)\n"""
+        """    SELECT id, $3, $4, $5, $6 FROM updated\n"""
+        """)\n"""
+        """SELECT\n"""
+        """    EXISTS(SELECT 1 FROM client) AS found,\n"""
+        """    updated.id,\n"""
+        """    updated.limit_value AS limit,\n"""
+        """    updated.balance\n"""
+        """FROM (VALUES (1)) AS single\n"""
+        """LEFT JOIN updated ON TRUE\n"""
+    )
+    GET_TRANSACTIONS = (
+        """SELECT id, client_id, kind, description, value, created_at\n"""
+        """FROM Transaction\n"""
+        """WHERE client_id = $1 AND created_at <= $2\n"""
+        """ORDER BY created_at DESC, id DESC\n"""
+        """LIMIT $3\n"""
+    )
+    GET_HISTORY = (
+        """SELECT id, client_id, kind, description, value, created_at\n"""
+        """FROM Transaction\n"""
+        """WHERE client_id = $1 AND (created_at, id) > ($2, $3)\n"""
+        """ORDER BY created_at, id\n"""
+        """LIMIT $4\n"""
+    )
+    LOAD_TRANSACTIONS = (
+        """SELECT id, client_id, kind, description, value, created_at\n"""
+        """FROM (\n"""
+        """    SELECT\n"""
+        """        *,\n"""
+        """        row_number() OVER (\n"""
+        """            PARTITION BY client_id ORDER BY created_at DESC, id DESC\n"""
+        """        ) AS position\n"""
+        """    FROM Transaction\n"""
+        """    WHERE client_id = ANY($1::int[])\n"""
+        """) recent\n"""
+        """WHERE position <= $2\n"""
+        """ORDER BY client_id, created_at, id\n"""
+    )
+    GET_STATEMENT = (
+        """SELECT\n"""
+        """    Client.limit_value AS limit,\n"""
+        """    Client.balance,\n"""
+        """    COALESCE((\n"""
+        """        SELECT '[' || string_agg(\n"""
+        """            recent.entry, ',' ORDER BY recent.created_at DESC, recent.id DESC\n"""
+        """        ) || ']'\n"""
+        """        FROM (\n"""
+        """            SELECT id, created_at, row_to_json(entry)::text AS entry\n"""
+        """            FROM Transaction, LATERAL (\n"""
+        """                SELECT\n"""
+        """                    value AS valor,\n"""
+        """                    kind AS tipo,\n"""
+        """                    description AS descricao,\n"""
+        """                    created_at AS realizada_em\n"""
+        """            ) AS entry\n"""
+        """            WHERE client_id = Client.id AND created_at <= $2\n"""
+        """            ORDER BY created_at DESC, id DESC\n"""
+        """            LIMIT $3\n"""
+        """        ) AS recent\n"""
+        """    ), '[]') AS transactions\n"""
+        """FROM Client\n"""
+        """WHERE Client.id = $1\n"""
+    )
+    GET_RING_STATEMENT = (
+        """SELECT\n"""
+        """    limit_value AS limit,\n"""
+        """    balance,\n"""
+        """    COALESCE((\n"""
+        """        SELECT jsonb_agg(\n"""
+        """            ring.entry ORDER BY ring.created_at DESC, ring.position\n"""
+        """        )::text\n"""
+        """        FROM (\n"""
+        """            SELECT\n"""
+        """                entry,\n"""
+        """                position,\n"""
+        """                (entry->>'realizada_em')::timestamptz AS created_at\n"""
+        """            FROM jsonb_array_elements(recent_transactions)\n"""
+        """                WITH ORDINALITY AS recent(entry, position)\n"""
+        """            WHERE (entry->>'realizada_em')::timestamptz <= $2\n"""
+        """            ORDER BY created_at DESC, position\n"""
+        """            LIMIT $3\n"""
+        """        ) ring\n"""
+        """    ), '[]') AS transactions,\n"""
+        """    jsonb_array_length(recent_transactions) < $4 OR (\n"""
+        """        SELECT count(*)\n"""
+        """        FROM jsonb_array_elements(recent_transactions) AS entry\n"""
+        """        WHERE (entry->>'realizada_em')::timestamptz <= $2\n"""
+        """    ) >= $3 AS complete\n"""
+        """FROM Client\n"""
+        """WHERE id = $1\n"""
+    )
+    REBUILD_RECENT_TRANSACTIONS = (
+        """UPDATE Client\n"""
+        """SET recent_transactions = COALESCE((\n"""
+        """    SELECT jsonb_agg(\n"""
+        """        jsonb_build_object(\n"""
+        """            'valor', value,\n"""
+        """            'tipo', kind,\n"""
+        """            'descricao', description,\n"""
+        """            'realizada_em', created_at\n"""
+        """        )\n"""
+        """        ORDER BY created_at DESC, id DESC\n"""
+        """    )\n"""
+        """    FROM (\n"""
+        """        SELECT *\n"""
+        """        FROM Transaction\n"""
+        """        WHERE client_id = Client.id\n"""
+        """        ORDER BY created_at DESC, id DESC\n"""
+        """        LIMIT $1\n"""
+        """    ) last\n"""
+        """), '[]')\n"""
+    )
+    LOCK_CLIENTS = (
+        """SELECT id, limit_value AS limit, balance FROM Client\n"""
+        """WHERE id = ANY($1::int[])\n"""
+        """ORDER BY id\n"""
+        """FOR UPDATE\n"""
+    )
+    CREATE_TRANSACTIONS = (
+        """INSERT INTO Transaction (client_id, value, kind, description, created_at)\n"""
+        """SELECT * FROM unnest(\n"""
+        """    $1::int[], $2::int[], $3::text[], $4::text[], $5::timestamptz[]\n"""
+        """)\n"""
+    )
+    CREATE_IDENTIFIED_TRANSACTIONS = (
+        """INSERT INTO Transaction (id, client_id, value, kind, description, created_at)\n"""
+        """SELECT * FROM unnest(\n"""
+        """    $1::int[], $2::int[], $3::int[], $4::text[], $5::text[],\n"""
+        """    $6::timestamptz[]\n"""
+        """)\n"""
+    )
+    RESERVE_TRANSACTION_IDS = (
+        """SELECT nextval(pg_get_serial_sequence('transaction', 'id')) AS id\n"""
+        """FROM generate_series(1, $1)\n"""
+    )
+    UPDATE_BALANCES = (
+        """UPDATE Client\n"""
+        """SET balance = updated.balance\n"""
+        """FROM unnest($1::int[], $2::int[]) AS updated(id, balance)\n"""
+        """WHERE Client.id = updated.id\n"""
+    )
+
+
+RING_STATEMENTS = (Statement.CREATE_RING_TRANSACTION, Statement.GET_RING_STATEMENT)
+MAINTENANCE_STATEMENTS = (Statement.REBUILD_RECENT_TRANSACTIONS,)
+TABLE_STATEMENTS = tuple(
+    statement
+    for statement in Statement
+    if statement not in RING_STATEMENTS + MAINTENANCE_STATEMENTS
+)
+
+QUERY_SECONDS = {
+    statement: METRICS.histogram(
+        "rinha_query_seconds",
+        "Time spent executing a prepared statement, including lock waits.",
+        statement=statement.name.lower(),
+    )
+    for statement in Statement
+}
+
+
+class StatementPreparationError(Exception):
+    def __init__(self, statement: Statement) -> None:
+        super().__init__(f"could not prepare statement {statement.name}")
+        self.statement = statement
+
+
+class BoundStatement:
+    __slots__ = ("__connection", "__query")
+
+    def __init__(self, connection: Connection, query: str) -> None:
+        self.__connection = connection
+        self.__query = query
+
+    async def fetch(self, *args: Any) -> list[Record]:
+        return await self.__connection.fetch(self.__query, *args)
+
+    async def fetchrow(self, *args: Any) -> Record | None:
+        return await self.__connection.fetchrow(self.__query, *args)
+
+    async def fetchval(self, *args: Any) -> Any:
+        return await self.__connection.fetchval(self.__query, *args)
+
+    def cursor(self, *args: Any, prefetch: int | None = None) -> CursorFactory[Record]:
+        return self.__connection.cursor(self.__query, *args, prefetch=prefetch)
+
+
+class StatementConnection(Connection):
+    __slots__ = ("__statements",)
+
+    def statement(self, statement: Statement) -> BoundStatement:
+        return self.__statements[statement]
+
+    async def prepare_statements(self, statements: Iterable[Statement]) -> None:
+        prepared = dict[Statement, BoundStatement]()
+        for statement in statements:
+            try:
+                # An empty executemany parses and describes the statement into
+                # the connection's statement cache without running it, which is
+                # where BoundStatement finds it on every acquire.
+                await self.executemany(statement.value, ())
+            except PostgresError as error:
+                raise StatementPreparationError(statement) from error
+            prepared[statement] = BoundStatement(self, statement.value)
+        self.__statements = prepared
+
+
+async def prepare_statements(connection: StatementConnection) -> None:
+    await connection.prepare_statements(TABLE_STATEMENTS)
+
+
+async def prepare_ring_statements(connection: StatementConnection) -> None:
+    await connection.prepare_statements(TABLE_STATEMENTS + RING_STATEMENTS)
@@ -1,67 +1,66 @@
 from __future__ import annotations
 
-import asyncio
-from collections.abc import AsyncIterable
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
 from datetime import datetime, timezone
 from types import TracebackType
 from typing import AsyncContextManager, Optional, Unpack
 
-from asyncpg import Pool, Record
+from asyncpg import Connection, Record
 from asyncpg.cursor import CursorFactory
 from asyncpg.pool import PoolConnectionProxy
 from asyncpg.transaction import Transaction as AsyncpgTransaction
 from returns import Err, Ok, Result
 
-from ...adapters.errors import ClientDoesNotExistError, NoLimitError
-from ...adapters.transaction_repository import GetByClientIdProps, TransactionRepository
+from ...adapters.errors import (
+    ClientDoesNotExistError,
+    HistoryNotSupportedError,
+    NoLimitError,
+)
+from ...adapters.transaction_repository import (
+    BankStatement,
+    GetByClientIdProps,
+    GetHistoryProps,
+    HistoryCursor,
+    TransactionRepository,
+)
 from ...core.entities.client import Client
 from ...core.entities.entity import Entity
-from ...core.entities.transaction import Transaction
+from ...core.entities.transaction import Transaction, TransactionKind
+from .batching_transaction_repository import apply_transactions
+from .metered_pool import MeteredPool
+from .postgres_statements import QUERY_SECONDS, Statement
+
+HISTORY_PAGE_SIZE = 500
 
 
 class PostgresTransactionRepository(TransactionRepository):
-    def __init__(self, pool: Pool[Record]):
+    def __init__(
+        self,
+        pool: MeteredPool,
+        read_pool: MeteredPool | None = None,
+        ring_size: int = 0,
+    ):
         self.__pool = pool
+        self.__read_pool = pool if read_pool is None else read_pool
+        self.__ring_size = ring_size
 
     async def create(
         self, transaction: Transaction
     ) -> Result[Entity[Client], ClientDoesNotExistError | NoLimitError]:
         async with self.__pool.acquire() as connection:
+            return await create_transaction(connection, transaction, self.__ring_size)
+
+    async def create_many(
+        self, transactions: Sequence[Transaction]
+    ) -> Sequence[Result[Entity[Client], ClientDoesNotExistError | NoLimitError]]:
+        async with self.__pool.acquire() as connection:
+            if self.__ring_size <= 0:
+                return await apply_transactions(connection, transactions)
             async with connection.transaction():
-                client_prepare = await connection.prepare(
-                    """SELECT id, limit_value AS limit, balance FROM Client WHERE id = $1\n"""
-                    """FOR UPDATE\n""",
-                )
-                client_result = await client_prepare.fetchrow(transaction.client_id)
-                if not client_result:
-                    return Err(ClientDoesNotExistError())
-
-                client_id = client_result["id"]
-                limit = client_result["limit"]
-                balance = client_result["balance"]
-                if transaction.kind == "c":
-                    new_balance = balance + transaction.value
-                else:
-                    new_balance = balance - transaction.value
-                    if new_balance < limit * -1:
-                        return Err(NoLimitError())
-                await connection.execute(
-                    """INSERT INTO Transaction (client_id, value, kind, description, created_at)\n"""
-                    """VALUES ($1, $2, $3, $4, $5)\n""",
-                    transaction.client_id,
-                    transaction.value,
-                    transaction.kind,
-                    transaction.description,
-                    transaction.created_at,
-                )
-                await connection.execute(
-                    """UPDATE Client\n"""
-                    """SET balance = $2\n"""
-                    """WHERE id = $1\n""",
-                    transaction.client_id,
-                    new_balance,
-                )
-            return Ok(Entity(Client(limit=limit, balance=new_balance), client_id))
+                return [
+                    await create_transaction(connection, transaction, self.__ring_size)
+                    for transaction in transactions
+                ]
 
     def get_by_client_id(
         self, **props: Unpack[GetByClientIdProps]
@@ -72,7 +71,83 @@ class PostgresTransactionRepository(TransactionRepository):
             props["starting_from"] = datetime.now(timezone.utc)
         if "amount" not in props:
             props["amount"] = 10
-        return GetTransactionsContextManager(self.__pool, **props)
+        return GetTransactionsContextManager(
+            self.__read_pool,
+            Statement.GET_TRANSACTIONS,
+            props["id"],
+            props["starting_from"],
+            props["amount"],
+        )
+
+    def get_history(self, **props: Unpack[GetHistoryProps]) -> AsyncContextManager[
+        Result[
+            AsyncIterable[Entity[Transaction]],
+            ClientDoesNotExistError | HistoryNotSupportedError,
+        ]
+    ]:
+        if "after" not in props:
+            props["after"] = HistoryCursor(datetime.min.replace(tzinfo=timezone.utc), 0)
+        return GetHistoryContextManager(self.__read_pool, props["id"], props["after"])
+
+    async def get_statement(
+        self, **props: Unpack[GetByClientIdProps]
+    ) -> Result[BankStatement, ClientDoesNotExistError]:
+        if "starting_from" not in props:
+            props["starting_from"] = datetime.now(timezone.utc)
+        if "amount" not in props:
+            props["amount"] = 10
+        arguments = (props["id"], props["starting_from"], props["amount"])
+        async with self.__read_pool.acquire() as connection:
+            if props["amount"] <= self.__ring_size:
+                with QUERY_SECONDS[Statement.GET_RING_STATEMENT].time():
+                    record = await connection.statement(
+                        Statement.GET_RING_STATEMENT
+                    ).fetchrow(*arguments, self.__ring_size)
+                # A full ring holds fewer than amount transactions up to a
+                # starting_from older than its oldest entry; the table has them.
+                if not record or record["complete"]:
+                    return to_statement(record)
+            with QUERY_SECONDS[Statement.GET_STATEMENT].time():
+                record = await connection.statement(Statement.GET_STATEMENT).fetchrow(
+                    *arguments
+                )
+        return to_statement(record)
+
+
+async def create_transaction(
+    connection: Connection[Record] | PoolConnectionProxy[Record],
+    transaction: Transaction,
+    ring_size: int = 0,
+) -> Result[Entity[Client], ClientDoesNotExistError | NoLimitError]:
+    if transaction.kind == TransactionKind.CREDIT:
+        amount = transaction.value
+    else:
+        amount = transaction.value * -1
+    arguments = (
+        transaction.client_id,
+        amount,
+        transaction.value,
+        transaction.kind,
+        transaction.description,
+        transaction.created_at,
+    )
+    if ring_size > 0:
+        with QUERY_SECONDS[Statement.CREATE_RING_TRANSACTION].time():
+            record = await connection.statement(
+                Statement.CREATE_RING_TRANSACTION
+            ).fetchrow(*arguments, ring_size)
+    else:
+        with QUERY_SECONDS[Statement.CREATE_TRANSACTION].time():
+            record = await connection.statement(Statement.CREATE_TRANSACTION).fetchrow(
+                *arguments
+            )
+    if not record["found"]:
+        return Err(ClientDoesNotExistError())
+    if record["id"] is None:
+        return Err(NoLimitError())
+    return Ok(
+        Entity(Client(limit=record["limit"], balance=record["balance"]), record["id"])
+    )
 
 
 class GetTransactionsContextManager:
@@ -80,37 +155,37 @@ class GetTransactionsContextManager:
     __connection: PoolConnectionProxy[Record]
 
     def __init__(
-        self, pool: Pool[Record], id: int, starting_from: datetime, amount: int
+        self,
+        pool: MeteredPool,
+        statement: Statement,
+        id: int,
+        *arguments: object,
     ):
         self.__pool = pool
+        self.__statement = statement
         self.__id = id
-        self.__starting_from = starting_from
-        self.__amount = amount
+        self.__arguments = arguments
 
     async def __aenter__(
         self,
     ) -> Result[AsyncIterable[Entity[Transaction]], ClientDoesNotExistError]:
         self.__connection = await self.__pool.acquire()
-        self.__transaction = self.__connection.transaction()
-        await self.__transaction.start()
-        exists_prepare = await self.__connection.prepare(
-            """SELECT EXISTS(SELECT 1 FROM Client WHERE id = $1)\n"""
-        )
-        cursor_prepare = await self.__connection.prepare(
-            """SELECT id, client_id, kind, description, value, created_at\n"""
-            """FROM Transaction\n"""
-            """WHERE client_id = $1 AND created_at <= $2\n"""
-            """ORDER BY created_at DESC\n"""
-            """LIMIT $3\n""",
-        )
-        exists: bool = await exists_prepare.fetchval(self.__id)
+        try:
+            self.__transaction = self.__connection.transaction(
+                isolation="repeatable_read", readonly=True
+            )
+            await self.__transaction.start()
+            exists: bool = await self.__connection.statement(
+                Statement.CLIENT_EXISTS
+            ).fetchval(self.__id)
+        except BaseException:
+            await self.__pool.release(self.__connection)
+            raise
         if not exists:
             return Err(ClientDoesNotExistError())
 
-        cursor = cursor_prepare.cursor(
-            self.__id,
-            self.__starting_from,
-            self.__amount,
+        cursor = self.__connection.statement(self.__statement).cursor(
+            self.__id, *self.__arguments
         )
         return Ok(GetTransactions(cursor))
 
@@ -119,15 +194,68 @@ class GetTransactionsContextManager:
         exc_type: Optional[type[BaseException]],
         exc_value: Optional[BaseException],
         traceback: Optional[TracebackType],
-    ):
-        if exc_type and exc_value and traceback:
-            await self.__transaction.rollback()
-            exc_value.__traceback__ = traceback
-            raise exc_value
-        else:
-            await self.__transaction.commit()
+    ) -> None:
+        try:
+            if exc_type is None:
+                await self.__transaction.commit()
+            else:
+                await self.__transaction.rollback()
+        finally:
+            await self.__pool.release(self.__connection)
 
-        await self.__pool.release(self.__connection)
+
+class GetHistoryContextManager:
+    def __init__(self, pool: MeteredPool, id: int, after: HistoryCursor) -> None:
+        self.__pool = pool
+        self.__id = id
+        self.__after = after
+
+    async def __aenter__(
+        self,
+    ) -> Result[AsyncIterable[Entity[Transaction]], ClientDoesNotExistError]:
+        async with self.__pool.acquire() as connection:
+            with QUERY_SECONDS[Statement.CLIENT_EXISTS].time():
+                exists: bool = await connection.statement(
+                    Statement.CLIENT_EXISTS
+                ).fetchval(self.__id)
+        if not exists:
+            return Err(ClientDoesNotExistError())
+        return Ok(HistoryPages(self.__pool, self.__id, self.__after))
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None: ...
+
+
+class HistoryPages:
+    def __init__(
+        self,
+        pool: MeteredPool,
+        id: int,
+        after: HistoryCursor,
+        page_size: int = HISTORY_PAGE_SIZE,
+    ) -> None:
+        self.__pool = pool
+        self.__id = id
+        self.__after = after
+        self.__page_size = page_size
+
+    async def __aiter__(self) -> AsyncIterator[Entity[Transaction]]:
+        after = self.__after
+        while True:
+            async with self.__pool.acquire() as connection:
+                with QUERY_SECONDS[Statement.GET_HISTORY].time():
+                    records = await connection.statement(Statement.GET_HISTORY).fetch(
+                        self.__id, after.created_at, after.id, self.__page_size
+                    )
+            for record in records:
+                yield to_entity(record)
+            if len(records) < self.__page_size:
+                return
+            after = HistoryCursor(records[-1]["created_at"], records[-1]["id"])
 
 
 class GetTransactions:
@@ -138,14 +266,25 @@ class GetTransactions:
         return self
 
     async def __anext__(self):
-        record = await anext(self.__cursor)
-        return Entity(
-            Transaction(
-                client_id=record["client_id"],
-                kind=record["kind"],
-                description=record["description"],
-                value=record["value"],
-                created_at=record["created_at"],
-            ),
-            id=record["id"],
-        )
+        return to_entity(await anext(self.__cursor))
+
+
+def to_entity(record: Record) -> Entity[Transaction]:
+    return Entity(
+        Transaction(
+            client_id=record["client_id"],
+            kind=record["kind"],
+            description=record["description"],
+            value=record["value"],
+            created_at=record["created_at"],
+        ),
+        id=record["id"],
+    )
+
+
+def to_statement(
+    record: Record | None,
+) -> Result[BankStatement, ClientDoesNotExistError]:
+    if not record:
+        return Err(ClientDoesNotExistError())
+    return Ok(BankStatement(record["limit"], record["balance"], record["transactions"]))
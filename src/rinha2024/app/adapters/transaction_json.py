@@ -0,0 +1,20 @@
+from collections.abc import Iterable
+
+import orjson
+
+from ...core.entities.transaction import Transaction
+
+
+def render_transaction(transaction: Transaction) -> bytes:
+    return orjson.dumps(
+        {
+            "valor": transaction.value,
+            "tipo": transaction.kind,
+            "descricao": transaction.description,
+            "realizada_em": transaction.created_at,
+        }
+    )
+
+
+def render_transactions(transactions: Iterable[bytes]) -> bytes:
+    return b"[" + b",".join(transactions) + b"]"
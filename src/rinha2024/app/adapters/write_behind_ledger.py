@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import AsyncIterable, Mapping, Sequence
+from typing import AsyncContextManager, Unpack
+
+import orjson
+from asyncpg import Connection, Record
+from asyncpg.pool import PoolConnectionProxy
+from returns import Ok, Result
+
+from ...adapters.client_repository import ClientRepository
+from ...adapters.errors import (
+    ClientDoesNotExistError,
+    HistoryNotSupportedError,
+    NoLimitError,
+)
+from ...adapters.transaction_repository import GetHistoryProps, TransactionRepository
+from ...core.entities.client import Client
+from ...core.entities.entity import Entity
+from ...core.entities.transaction import Transaction
+from ..metrics import METRICS, Metrics
+from ..sharding import ClientOwnership
+from .in_memory_client_repository import InMemoryClientRepository
+from .in_memory_ledger import InMemoryLedger
+from .in_memory_transaction_repository import InMemoryTransactionRepository
+from .metered_pool import MeteredPool
+from .postgres_statements import QUERY_SECONDS, Statement
+
+logger = logging.getLogger(__name__)
+
+
+class TransactionIds:
+    def __init__(self, pool: MeteredPool, block_size: int) -> None:
+        self.__pool = pool
+        self.__block_size = block_size
+        self.__ids = deque[int]()
+        self.__lock = asyncio.Lock()
+
+    async def take(self, amount: int) -> list[int]:
+        async with self.__lock:
+            if len(self.__ids) < amount:
+                await self.__reserve(max(amount - len(self.__ids), self.__block_size))
+            return [self.__ids.popleft() for _ in range(amount)]
+
+    async def __reserve(self, amount: int) -> None:
+        async with self.__pool.acquire() as connection:
+            with QUERY_SECONDS[Statement.RESERVE_TRANSACTION_IDS].time():
+                records = await connection.statement(
+                    Statement.RESERVE_TRANSACTION_IDS
+                ).fetch(amount)
+        self.__ids.extend(record["id"] for record in records)
+
+
+class ClientSuspendedError(Exception):
+    def __init__(self, id: int) -> None:
+        super().__init__(
+            f"writes for client {id} are suspended after its transactions "
+            "were dropped"
+        )
+        self.id = id
+
+
+class PersistenceQueue:
+    def __init__(
+        self,
+        pool: MeteredPool,
+        max_size: int,
+        max_attempts: int = 5,
+        retry_delay: float = 0.5,
+        metrics: Metrics = METRICS,
+    ) -> None:
+        self.__pool = pool
+        self.__max_size = max_size
+        self.__max_attempts = max_attempts
+        self.__retry_delay = retry_delay
+        self.__pending = list[tuple[Entity[Transaction], int]]()
+        self.__ready = asyncio.Event()
+        self.__closing = False
+        self.__failures = 0
+        self.__dropped = 0
+        self.__suspended = set[int]()
+        self.__task: asyncio.Task[None] | None = None
+        self.__batch_seconds = metrics.histogram(
+            "rinha_write_behind_batch_seconds",
+            "Time spent persisting one write-behind batch.",
+        )
+        metrics.gauge(
+            "rinha_write_behind_pending",
+            "Accepted transactions not yet persisted.",
+            lambda: len(self.__pending),
+        )
+        metrics.counter(
+            "rinha_write_behind_failures_total",
+            "Write-behind batches that had to be retried.",
+            lambda: self.__failures,
+        )
+        metrics.counter(
+            "rinha_write_behind_dropped_total",
+            "Accepted transactions given up on and written to the dead-letter log.",
+            lambda: self.__dropped,
+        )
+        metrics.gauge(
+            "rinha_write_behind_suspended_clients",
+            "Clients refusing writes because some of their transactions were dropped.",
+            lambda: len(self.__suspended),
+        )
+
+    def start(self) -> None:
+        self.__task = asyncio.create_task(self.__run())
+
+    def suspended(self, id: int) -> bool:
+        return id in self.__suspended
+
+    def enqueue(self, transaction: Entity[Transaction], balance: int) -> None:
+        self.__pending.append((transaction, balance))
+        self.__ready.set()
+
+    async def close(self, timeout: float) -> None:
+        self.__closing = True
+        self.__ready.set()
+        if self.__task is None:
+            return
+        try:
+            await asyncio.wait_for(self.__task, timeout)
+        except TimeoutError:
+            pending = self.__pending[:]
+            self.__pending.clear()
+            self.__drop(pending, f"still pending {timeout:.1f}s after closing")
+
+    async def __run(self) -> None:
+        attempts = 0
+        while True:
+            await self.__ready.wait()
+            if not self.__pending:
+                if self.__closing:
+                    return
+                self.__ready.clear()
+                continue
+            batch = self.__pending[: self.__max_size]
+            try:
+                await self.__persist(batch)
+            except Exception:
+                attempts += 1
+                self.__failures += 1
+                logger.exception(
+                    "failed to persist %d transactions (attempt %d of %d)",
+                    len(batch),
+                    attempts,
+                    self.__max_attempts,
+                )
+                if attempts < self.__max_attempts:
+                    await asyncio.sleep(self.__retry_delay)
+                    continue
+                del self.__pending[: len(batch)]
+                self.__drop(batch, f"persisting failed {attempts} times")
+            else:
+                del self.__pending[: len(batch)]
+            attempts = 0
+
+    async def __persist(self, batch: Sequence[tuple[Entity[Transaction], int]]) -> None:
+        with self.__batch_seconds.time():
+            async with self.__pool.acquire() as connection:
+                async with connection.transaction():
+                    await store_identified_transactions(
+                        connection,
+                        [transaction for transaction, _ in batch],
+                        {
+                            transaction.props.client_id: balance
+                            for transaction, balance in batch
+                        },
+                    )
+
+    def __drop(
+        self, batch: Sequence[tuple[Entity[Transaction], int]], reason: str
+    ) -> None:
+        # Batches store each client's absolute balance, so once a client's
+        # transactions are dropped its later ones would write a balance that
+        # counts amounts Postgres never stored. Those are dropped as well and
+        # the client refuses writes until the ledger is rebuilt from Postgres.
+        clients = {transaction.props.client_id for transaction, _ in batch}
+        self.__suspended |= clients
+        self.__dead_letter(batch, reason)
+        following = [
+            item for item in self.__pending if item[0].props.client_id in clients
+        ]
+        self.__pending[:] = [
+            item for item in self.__pending if item[0].props.client_id not in clients
+        ]
+        self.__dead_letter(
+            following, "an earlier transaction of the client was dropped"
+        )
+
+    def __dead_letter(
+        self, batch: Sequence[tuple[Entity[Transaction], int]], reason: str
+    ) -> None:
+        if not batch:
+            return
+        self.__dropped += len(batch)
+        logger.error(
+            "dropping %d unpersisted transactions, %s:\n%s",
+            len(batch),
+            reason,
+            b"\n".join(
+                orjson.dumps(
+                    {
+                        "id": transaction.id,
+                        "cliente": transaction.props.client_id,
+                        "valor": transaction.props.value,
+                        "tipo": transaction.props.kind,
+                        "descricao": transaction.props.description,
+                        "realizada_em": transaction.props.created_at,
+                        "saldo": balance,
+                    }
+                )
+                for transaction, balance in batch
+            ).decode(),
+        )
+
+
+class WriteBehindTransactionRepository(InMemoryTransactionRepository):
+    def __init__(
+        self,
+        ledger: InMemoryLedger,
+        ids: TransactionIds,
+        queue: PersistenceQueue,
+        archive: TransactionRepository,
+    ) -> None:
+        super().__init__(ledger)
+        self.__ledger = ledger
+        self.__ids = ids
+        self.__queue = queue
+        self.__archive = archive
+
+    async def create(
+        self, transaction: Transaction
+    ) -> Result[Entity[Client], ClientDoesNotExistError | NoLimitError]:
+        (result,) = await self.create_many((transaction,))
+        return result
+
+    async def create_many(
+        self, transactions: Sequence[Transaction]
+    ) -> Sequence[Result[Entity[Client], ClientDoesNotExistError | NoLimitError]]:
+        ids = await self.__ids.take(len(transactions))
+        for transaction in transactions:
+            if self.__queue.suspended(transaction.client_id):
+                raise ClientSuspendedError(transaction.client_id)
+        results = list[Result[Entity[Client], ClientDoesNotExistError | NoLimitError]]()
+        for id, transaction in zip(ids, transactions):
+            result = self.__ledger.append(transaction, id)
+            match result:
+                case Ok(client):
+                    self.__queue.enqueue(Entity(transaction, id), client.props.balance)
+            results.append(result)
+        return results
+
+    def get_history(self, **props: Unpack[GetHistoryProps]) -> AsyncContextManager[
+        Result[
+            AsyncIterable[Entity[Transaction]],
+            ClientDoesNotExistError | HistoryNotSupportedError,
+        ]
+    ]:
+        return self.__archive.get_history(**props)
+
+
+class WriteBehindClientRepository(InMemoryClientRepository):
+    def __init__(
+        self,
+        ledger: InMemoryLedger,
+        repository: ClientRepository,
+        ownership: ClientOwnership,
+    ) -> None:
+        super().__init__(ledger)
+        self.__ledger = ledger
+        self.__repository = repository
+        self.__ownership = ownership
+
+    async def create(self, client: Client) -> Entity[Client]:
+        created = await self.__repository.create(client)
+        if self.__ownership.owns(created.id):
+            self.__ledger.load_client(
+                created.id, created.props.limit, created.props.balance
+            )
+        return created
+
+
+async def store_identified_transactions(
+    connection: Connection[Record] | PoolConnectionProxy[Record],
+    transactions: Sequence[Entity[Transaction]],
+    balances: Mapping[int, int],
+) -> None:
+    with QUERY_SECONDS[Statement.CREATE_IDENTIFIED_TRANSACTIONS].time():
+        await connection.statement(Statement.CREATE_IDENTIFIED_TRANSACTIONS).fetch(
+            [transaction.id for transaction in transactions],
+            [transaction.props.client_id for transaction in transactions],
+            [transaction.props.value for transaction in transactions],
+            [transaction.props.kind for transaction in transactions],
+            [transaction.props.description for transaction in transactions],
+            [transaction.props.created_at for transaction in transactions],
+        )
+    with QUERY_SECONDS[Statement.UPDATE_BALANCES].time():
+        await connection.statement(Statement.UPDATE_BALANCES).fetch(
+            list(balances), list(balances.values())
+        )
+
+
+async def load_ledger(
+    pool: MeteredPool, ledger: InMemoryLedger, ownership: ClientOwnership
+) -> None:
+    async with pool.acquire() as connection:
+        async with connection.transaction(isolation="repeatable_read"):
+            with QUERY_SECONDS[Statement.GET_ALL_CLIENTS].time():
+                clients = await connection.statement(Statement.GET_ALL_CLIENTS).fetch()
+            owned = [record for record in clients if ownership.owns(record["id"])]
+            for record in owned:
+                ledger.load_client(record["id"], record["limit"], record["balance"])
+            with QUERY_SECONDS[Statement.LOAD_TRANSACTIONS].time():
+                transactions = await connection.statement(
+                    Statement.LOAD_TRANSACTIONS
+                ).fetch([record["id"] for record in owned], ledger.history_size)
+    for record in transactions:
+        ledger.load_transaction(
+            Entity(
+                Transaction(
+                    client_id=record["client_id"],
+                    kind=record["kind"],
+                    description=record["description"],
+                    value=record["value"],
+                    created_at=record["created_at"],
+                ),
+                id=record["id"],
+            )
+        )
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from types import TracebackType
+from typing import Optional
+
+from .metrics import METRICS, Metrics
+
+RETRY_AFTER = b"1"
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int,
+        max_queue: int,
+        max_wait: float,
+        metrics: Metrics = METRICS,
+    ) -> None:
+        self.__max_in_flight = max_in_flight
+        self.__max_queue = max_queue
+        self.__max_wait = max_wait
+        self.__in_flight = 0
+        self.__queue = deque[asyncio.Future[None]]()
+        self.__rejected = 0
+        metrics.gauge(
+            "rinha_admission_in_flight",
+            "Admitted requests still running.",
+            lambda: self.__in_flight,
+            budget=name,
+        )
+        metrics.gauge(
+            "rinha_admission_queued",
+            "Requests waiting for admission.",
+            lambda: len(self.__queue),
+            budget=name,
+        )
+        metrics.counter(
+            "rinha_admission_rejected_total",
+            "Requests shed because the budget was exhausted.",
+            lambda: self.__rejected,
+            budget=name,
+        )
+
+    def admit(self) -> Admission:
+        return Admission(self)
+
+    async def acquire(self) -> bool:
+        if self.__max_in_flight <= 0:
+            return True
+        if self.__in_flight < self.__max_in_flight and not self.__queue:
+            self.__in_flight += 1
+            return True
+        if len(self.__queue) >= self.__max_queue or self.__max_wait <= 0:
+            self.__rejected += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        self.__queue.append(future)
+        try:
+            await asyncio.wait_for(future, self.__max_wait)
+        except TimeoutError:
+            if future.done() and not future.cancelled():
+                return True
+            if future in self.__queue:
+                self.__queue.remove(future)
+            self.__rejected += 1
+            return False
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            elif future in self.__queue:
+                self.__queue.remove(future)
+            raise
+        return True
+
+    def release(self) -> None:
+        if self.__max_in_flight <= 0:
+            return
+        while self.__queue:
+            future = self.__queue.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.__in_flight -= 1
+
+
+class Admission:
+    __slots__ = ("__controller", "__admitted")
+
+    def __init__(self, controller: AdmissionController) -> None:
+        self.__controller = controller
+
+    async def __aenter__(self) -> bool:
+        self.__admitted = await self.__controller.acquire()
+        return self.__admitted
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if self.__admitted:
+            self.__controller.release()
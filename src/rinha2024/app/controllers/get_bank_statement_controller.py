@@ -1,40 +1,80 @@
 from datetime import datetime, timezone
 
+import orjson
 from returns import Err, Ok
 from starlette.requests import Request
 from starlette.responses import Response
 
 from ...adapters.client_repository import ClientRepository
 from ...adapters.transaction_repository import TransactionRepository
-from .orjson_response import OrjsonResponse
-
-
-async def get_bank_statement_controller(request: Request):
-    id: int = request.path_params["id"]
-    transaction_repository: TransactionRepository = request.state.transaction_repository
-    client_repository: ClientRepository = request.state.client_repository
-    async with transaction_repository.get_by_client_id(
-        id=id, amount=10
-    ) as transaction_result:
-        match transaction_result:
-            case Ok(transactions):
-                client = (await client_repository.get(id)).unwrap()
-                json_response = {
-                    "saldo": {
-                        "total": client.props.balance,
-                        "data_extrato": str(datetime.now(timezone.utc)),
-                        "limite": client.props.limit,
-                    },
-                    "ultimas_transacoes": [
-                        {
-                            "valor": transaction.props.value,
-                            "tipo": transaction.props.kind,
-                            "descricao": transaction.props.description,
-                            "realizada_em": str(transaction.props.created_at),
-                        }
-                        async for transaction in transactions
-                    ],
-                }
-                return OrjsonResponse(json_response)
-            case Err():
-                return Response(status_code=404)
+from ..admission import AdmissionController
+from ..metrics import METRICS
+from .response import render_response
+
+REQUEST_SECONDS = METRICS.histogram(
+    "rinha_request_seconds", "Time spent handling a request.", endpoint="extrato"
+)
+RENDER_SECONDS = METRICS.histogram(
+    "rinha_render_seconds", "Time spent serializing a response.", endpoint="extrato"
+)
+
+
+async def get_bank_statement_controller(request: Request) -> Response:
+    status_code, content = await get_bank_statement(
+        request.path_params["id"],
+        request.state.client_repository,
+        request.state.transaction_repository,
+        request.state.statement_admission,
+    )
+    return render_response(status_code, content)
+
+
+async def get_bank_statement(
+    id: int,
+    client_repository: ClientRepository,
+    transaction_repository: TransactionRepository,
+    admission: AdmissionController,
+) -> tuple[int, bytes]:
+    with REQUEST_SECONDS.time():
+        return await __get_bank_statement(
+            id, client_repository, transaction_repository, admission
+        )
+
+
+async def __get_bank_statement(
+    id: int,
+    client_repository: ClientRepository,
+    transaction_repository: TransactionRepository,
+    admission: AdmissionController,
+) -> tuple[int, bytes]:
+    if not await client_repository.exists(id):
+        return 404, b""
+
+    async with admission.admit() as admitted:
+        if not admitted:
+            return 503, b""
+        result = await transaction_repository.get_statement(id=id, amount=10)
+    match result:
+        case Ok(statement):
+            with RENDER_SECONDS.time():
+                transactions = statement.transactions
+                if isinstance(transactions, str):
+                    transactions = transactions.encode()
+                balance = orjson.dumps(
+                    {
+                        "total": statement.balance,
+                        "data_extrato": datetime.now(timezone.utc),
+                        "limite": statement.limit,
+                    }
+                )
+                return 200, b"".join(
+                    (
+                        b'{"saldo":',
+                        balance,
+                        b',"ultimas_transacoes":',
+                        transactions,
+                        b"}",
+                    )
+                )
+        case Err():
+            return 404, b""
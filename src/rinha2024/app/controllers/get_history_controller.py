@@ -0,0 +1,90 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import AsyncIterable, AsyncIterator
+from contextlib import AsyncExitStack
+from datetime import datetime
+
+import orjson
+from returns import Err, Ok
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from ...adapters.errors import HistoryNotSupportedError
+from ...adapters.transaction_repository import GetHistoryProps, HistoryCursor
+from ...core.entities.entity import Entity
+from ...core.entities.transaction import Transaction
+from .response import render_response
+
+CHUNK_SIZE = 64 * 1024
+
+
+async def get_history_controller(request: Request) -> Response:
+    props: GetHistoryProps = {"id": request.path_params["id"]}
+    if "cursor" in request.query_params:
+        after = decode_cursor(request.query_params["cursor"])
+        if after is None:
+            return render_response(422, b"")
+        props["after"] = after
+
+    if not await request.state.client_repository.exists(props["id"]):
+        return render_response(404, b"")
+    history = AsyncExitStack()
+    match await history.enter_async_context(
+        request.state.transaction_repository.get_history(**props)
+    ):
+        case Ok(transactions):
+            return StreamingResponse(
+                stream_history(history, transactions),
+                media_type="application/x-ndjson",
+            )
+        case Err(HistoryNotSupportedError()):
+            status_code = 501
+        case Err(_):
+            status_code = 404
+    await history.aclose()
+    return render_response(status_code, b"")
+
+
+async def stream_history(
+    history: AsyncExitStack, transactions: AsyncIterable[Entity[Transaction]]
+) -> AsyncIterator[bytes]:
+    async with history:
+        chunk = bytearray()
+        async for transaction in transactions:
+            chunk += render_history_line(transaction)
+            if len(chunk) >= CHUNK_SIZE:
+                yield bytes(chunk)
+                chunk.clear()
+        if chunk:
+            yield bytes(chunk)
+
+
+def render_history_line(transaction: Entity[Transaction]) -> bytes:
+    props = transaction.props
+    return orjson.dumps(
+        {
+            "cursor": encode_cursor(HistoryCursor(props.created_at, transaction.id)),
+            "valor": props.value,
+            "tipo": props.kind,
+            "descricao": props.description,
+            "realizada_em": props.created_at,
+        },
+        option=orjson.OPT_APPEND_NEWLINE,
+    )
+
+
+def encode_cursor(cursor: HistoryCursor) -> str:
+    token = urlsafe_b64encode(orjson.dumps([cursor.created_at, cursor.id]))
+    return token.rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> HistoryCursor | None:
+    try:
+        created_at, id = orjson.loads(
+            urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        )
+        cursor = HistoryCursor(datetime.fromisoformat(created_at), id)
+    except (ValueError, TypeError):
+        return None
+    if cursor.created_at.tzinfo is None or not isinstance(cursor.id, int):
+        return None
+    return cursor
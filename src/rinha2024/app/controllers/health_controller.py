@@ -0,0 +1,6 @@
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+async def health_controller(_: Request) -> Response:
+    return Response(b'{"status":"pronto"}', media_type="application/json")
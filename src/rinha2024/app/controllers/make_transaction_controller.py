@@ -7,46 +7,97 @@ from returns import Err, Ok
 from starlette.requests import Request
 from starlette.responses import Response
 
+from ...adapters.client_repository import ClientRepository
 from ...adapters.errors import ClientDoesNotExistError, NoLimitError
 from ...adapters.transaction_repository import TransactionRepository
 from ...core.entities.transaction import Transaction
-from .orjson_response import OrjsonResponse
+from ..admission import AdmissionController
+from ..metrics import METRICS
+from .response import render_response
+
+REQUEST_SECONDS = METRICS.histogram(
+    "rinha_request_seconds", "Time spent handling a request.", endpoint="transacoes"
+)
+PARSE_SECONDS = METRICS.histogram(
+    "rinha_parse_seconds", "Time spent parsing and validating a transaction payload."
+)
+RENDER_SECONDS = METRICS.histogram(
+    "rinha_render_seconds", "Time spent serializing a response.", endpoint="transacoes"
+)
 
 
 async def make_transaction_controller(request: Request) -> Response:
-    id: int = request.path_params["id"]
-    try:
-        payload = orjson.loads(await request.body())
-        if not __validate_payload(payload):
-            return Response(status_code=422)
-    except JSONDecodeError:
-        return Response(status_code=422)
-
-    transaction_repository: TransactionRepository = request.state.transaction_repository
-
-    result = await transaction_repository.create(
-        Transaction(
-            id,
-            payload["valor"],
-            payload["tipo"],
-            payload["descricao"],
-            datetime.now(timezone.utc),
-        )
+    status_code, content = await make_transaction(
+        request.path_params["id"],
+        await request.body(),
+        request.state.client_repository,
+        request.state.transaction_repository,
+        request.state.write_admission,
     )
+    return render_response(status_code, content)
+
+
+async def make_transaction(
+    id: int,
+    body: bytes,
+    client_repository: ClientRepository,
+    transaction_repository: TransactionRepository,
+    admission: AdmissionController,
+) -> tuple[int, bytes]:
+    with REQUEST_SECONDS.time():
+        return await __make_transaction(
+            id, body, client_repository, transaction_repository, admission
+        )
+
+
+async def __make_transaction(
+    id: int,
+    body: bytes,
+    client_repository: ClientRepository,
+    transaction_repository: TransactionRepository,
+    admission: AdmissionController,
+) -> tuple[int, bytes]:
+    with PARSE_SECONDS.time():
+        try:
+            payload = orjson.loads(body)
+            if not validate_payload(payload):
+                return 422, b""
+        except JSONDecodeError:
+            return 422, b""
+
+    if not await client_repository.exists(id):
+        return 404, b""
+
+    async with admission.admit() as admitted:
+        if not admitted:
+            return 503, b""
+        result = await transaction_repository.create(
+            Transaction(
+                id,
+                payload["valor"],
+                payload["tipo"],
+                payload["descricao"],
+                datetime.now(timezone.utc),
+            )
+        )
     match result:
         case Ok(client):
-            return OrjsonResponse(
-                {"limite": client.props.limit, "saldo": client.props.balance}
-            )
+            with RENDER_SECONDS.time():
+                return 200, orjson.dumps(
+                    {"limite": client.props.limit, "saldo": client.props.balance}
+                )
         case Err(error):
             match error:
                 case ClientDoesNotExistError():
-                    return Response(status_code=404)
+                    return 404, b""
                 case NoLimitError():
-                    return Response(status_code=422)
+                    return 422, b""
+
 
+def validate_payload(payload: Any) -> bool:
+    if not isinstance(payload, dict):
+        return False
 
-def __validate_payload(payload: dict[str, Any]) -> bool:
     valor = payload.get("valor")
     tipo = payload.get("tipo")
     descricao = payload.get("descricao")
@@ -0,0 +1,114 @@
+from datetime import datetime, timezone
+
+import orjson
+from orjson import JSONDecodeError
+from returns import Err, Ok
+from starlette.requests import Request
+from starlette.responses import Response
+
+from ...adapters.client_repository import ClientRepository
+from ...adapters.errors import ClientDoesNotExistError, NoLimitError
+from ...adapters.transaction_repository import TransactionRepository
+from ...core.entities.transaction import Transaction
+from ..admission import AdmissionController
+from ..metrics import METRICS
+from .make_transaction_controller import validate_payload
+from .response import render_response
+
+MAX_BATCH_SIZE = 100
+APPLIED = "aplicada"
+NO_LIMIT = "sem_limite"
+INVALID = "invalida"
+
+REQUEST_SECONDS = METRICS.histogram(
+    "rinha_request_seconds", "Time spent handling a request.", endpoint="lote"
+)
+
+
+async def make_transactions_controller(request: Request) -> Response:
+    status_code, content = await make_transactions(
+        request.path_params["id"],
+        await request.body(),
+        request.state.client_repository,
+        request.state.transaction_repository,
+        request.state.write_admission,
+    )
+    return render_response(status_code, content)
+
+
+async def make_transactions(
+    id: int,
+    body: bytes,
+    client_repository: ClientRepository,
+    transaction_repository: TransactionRepository,
+    admission: AdmissionController,
+) -> tuple[int, bytes]:
+    with REQUEST_SECONDS.time():
+        return await __make_transactions(
+            id, body, client_repository, transaction_repository, admission
+        )
+
+
+async def __make_transactions(
+    id: int,
+    body: bytes,
+    client_repository: ClientRepository,
+    transaction_repository: TransactionRepository,
+    admission: AdmissionController,
+) -> tuple[int, bytes]:
+    try:
+        payloads = orjson.loads(body)
+    except JSONDecodeError:
+        return 422, b""
+    if not isinstance(payloads, list) or not 1 <= len(payloads) <= MAX_BATCH_SIZE:
+        return 422, b""
+
+    if not await client_repository.exists(id):
+        return 404, b""
+
+    created_at = datetime.now(timezone.utc)
+    valid = [validate_payload(payload) for payload in payloads]
+    transactions = [
+        Transaction(
+            id, payload["valor"], payload["tipo"], payload["descricao"], created_at
+        )
+        for payload, is_valid in zip(payloads, valid)
+        if is_valid
+    ]
+
+    if not transactions:
+        results = ()
+    else:
+        async with admission.admit() as admitted:
+            if not admitted:
+                return 503, b""
+            results = await transaction_repository.create_many(transactions)
+
+    applied = iter(results)
+    outcomes = list[str]()
+    client = None
+    for is_valid in valid:
+        if not is_valid:
+            outcomes.append(INVALID)
+            continue
+        match next(applied):
+            case Ok(client):
+                outcomes.append(APPLIED)
+            case Err(NoLimitError()):
+                outcomes.append(NO_LIMIT)
+            case Err(ClientDoesNotExistError()):
+                return 404, b""
+    if client is None:
+        match await client_repository.get(id):
+            case Ok(entity):
+                client = entity
+            case Err():
+                return 404, b""
+
+    return 200, orjson.dumps(
+        {
+            "limite": client.props.limit,
+            "saldo": client.props.balance,
+            "resultados": outcomes,
+        }
+    )
@@ -0,0 +1,8 @@
+from starlette.requests import Request
+from starlette.responses import Response
+
+from ..metrics import METRICS
+
+
+async def metrics_controller(_: Request) -> Response:
+    return Response(METRICS.render(), media_type="text/plain; version=0.0.4")
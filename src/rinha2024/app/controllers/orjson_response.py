@@ -1,9 +0,0 @@
-from typing import Any
-
-import orjson
-from starlette.responses import JSONResponse
-
-
-class OrjsonResponse(JSONResponse):
-    def render(self, content: dict[str, Any]) -> bytes:
-        return orjson.dumps(content)
@@ -0,0 +1,13 @@
+from starlette.responses import Response
+
+from ..admission import RETRY_AFTER
+
+
+def render_response(status_code: int, content: bytes) -> Response:
+    if status_code == 503:
+        return Response(
+            status_code=status_code, headers={"retry-after": RETRY_AFTER.decode()}
+        )
+    if not content:
+        return Response(status_code=status_code)
+    return Response(content, status_code=status_code, media_type="application/json")
@@ -0,0 +1,67 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .admission import RETRY_AFTER
+from .controllers.get_bank_statement_controller import get_bank_statement
+from .controllers.make_transaction_controller import make_transaction
+
+EMPTY_HEADERS = [(b"content-length", b"0")]
+OVERLOADED_HEADERS = [(b"content-length", b"0"), (b"retry-after", RETRY_AFTER)]
+JSON_CONTENT_TYPE = (b"content-type", b"application/json")
+
+
+class FastApp:
+    def __init__(self, app: ASGIApp) -> None:
+        self.__app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.__app(scope, receive, send)
+
+        match scope["path"].split("/"):
+            case ["", "clientes", id, "transacoes"] if (
+                scope["method"] == "POST" and id.isascii() and id.isdigit()
+            ):
+                state = scope["state"]
+                status_code, content = await make_transaction(
+                    int(id),
+                    await self.__read_body(receive),
+                    state["client_repository"],
+                    state["transaction_repository"],
+                    state["write_admission"],
+                )
+            case ["", "clientes", id, "extrato"] if (
+                scope["method"] == "GET" and id.isascii() and id.isdigit()
+            ):
+                state = scope["state"]
+                status_code, content = await get_bank_statement(
+                    int(id),
+                    state["client_repository"],
+                    state["transaction_repository"],
+                    state["statement_admission"],
+                )
+            case _:
+                return await self.__app(scope, receive, send)
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status_code,
+                "headers": (
+                    [
+                        JSON_CONTENT_TYPE,
+                        (b"content-length", str(len(content)).encode()),
+                    ]
+                    if content
+                    else OVERLOADED_HEADERS if status_code == 503 else EMPTY_HEADERS
+                ),
+            }
+        )
+        await send({"type": "http.response.body", "body": content})
+
+    async def __read_body(self, receive: Receive) -> bytes:
+        message = await receive()
+        body: bytes = message.get("body", b"")
+        while message.get("more_body", False):
+            message = await receive()
+            body += message.get("body", b"")
+        return body
@@ -0,0 +1,127 @@
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from time import perf_counter
+from types import TracebackType
+from typing import Optional
+
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+type Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self) -> "Timer":
+        return Timer(self)
+
+
+class Timer:
+    __slots__ = ("__histogram", "__started")
+
+    def __init__(self, histogram: Histogram) -> None:
+        self.__histogram = histogram
+
+    def __enter__(self) -> None:
+        self.__started = perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.__histogram.observe(perf_counter() - self.__started)
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.__documentation = dict[str, str]()
+        self.__histograms = dict[str, dict[Labels, Histogram]]()
+        self.__gauges = dict[str, dict[Labels, Callable[[], float]]]()
+        self.__counters = dict[str, dict[Labels, Callable[[], float]]]()
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+        **labels: str,
+    ) -> Histogram:
+        self.__documentation[name] = documentation
+        histograms = self.__histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        if key not in histograms:
+            histograms[key] = Histogram(buckets)
+        return histograms[key]
+
+    def gauge(
+        self, name: str, documentation: str, read: Callable[[], float], **labels: str
+    ) -> None:
+        self.__documentation[name] = documentation
+        self.__gauges.setdefault(name, {})[tuple(sorted(labels.items()))] = read
+
+    def counter(
+        self, name: str, documentation: str, read: Callable[[], float], **labels: str
+    ) -> None:
+        self.__documentation[name] = documentation
+        self.__counters.setdefault(name, {})[tuple(sorted(labels.items()))] = read
+
+    def render(self) -> bytes:
+        return "".join(self.__render()).encode()
+
+    def __render(self) -> Iterator[str]:
+        for name, histograms in self.__histograms.items():
+            yield f"# HELP {name} {self.__documentation[name]}\n"
+            yield f"# TYPE {name} histogram\n"
+            for labels, histogram in histograms.items():
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    le = format_labels(labels + (("le", str(bound)),))
+                    yield f"{name}_bucket{le} {cumulative}\n"
+                le = format_labels(labels + (("le", "+Inf"),))
+                yield f"{name}_bucket{le} {histogram.count}\n"
+                yield f"{name}_sum{format_labels(labels)} {histogram.sum}\n"
+                yield f"{name}_count{format_labels(labels)} {histogram.count}\n"
+        for kind, values in (("gauge", self.__gauges), ("counter", self.__counters)):
+            for name, reads in values.items():
+                yield f"# HELP {name} {self.__documentation[name]}\n"
+                yield f"# TYPE {name} {kind}\n"
+                for labels, read in reads.items():
+                    yield f"{name}{format_labels(labels)} {read()}\n"
+
+
+def format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}"
+
+
+METRICS = Metrics()
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import asyncio
+import hmac
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .metrics import METRICS, Metrics
+
+FORWARDED_HEADER = b"x-rinha-forwarded"
+RELAYED_HEADERS = frozenset(
+    (b"content-type", b"content-length", b"location", b"retry-after")
+)
+UNAVAILABLE = (502, [(b"content-length", b"0")], b"")
+
+type Headers = list[tuple[bytes, bytes]]
+type Stream = tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+@dataclass(slots=True, frozen=True)
+class ClientOwnership:
+    index: int
+    count: int
+
+    def owner(self, id: int) -> int:
+        return id % self.count
+
+    def owns(self, id: int) -> bool:
+        return self.count <= 1 or self.owner(id) == self.index
+
+
+class ShardRouter:
+    def __init__(
+        self,
+        ownership: ClientOwnership,
+        peers: Sequence[str],
+        secret: str,
+        redirects: Sequence[str] = (),
+        max_idle: int = 16,
+        metrics: Metrics = METRICS,
+    ) -> None:
+        if len(peers) != ownership.count:
+            raise ValueError(
+                f"expected {ownership.count} peers, got {len(peers)}: {peers}"
+            )
+        if not secret:
+            raise ValueError("peers need a shared secret to trust forwarded requests")
+        if redirects and len(redirects) != ownership.count:
+            raise ValueError(
+                f"expected {ownership.count} redirect urls, got {len(redirects)}: "
+                f"{redirects}"
+            )
+        self.__ownership = ownership
+        self.__secret = secret.encode()
+        self.__peers = [Peer(url, self.__secret, max_idle) for url in peers]
+        self.__redirects = [url.rstrip("/").encode() for url in redirects]
+        self.__forwarded = 0
+        metrics.counter(
+            "rinha_shard_forwarded_total",
+            "Requests routed to the instance that owns the client.",
+            lambda: self.__forwarded,
+        )
+
+    def owns(self, id: int) -> bool:
+        return self.__ownership.owns(id)
+
+    def accepts(self, id: int, headers: Headers) -> bool:
+        return self.owns(id) or any(
+            name == FORWARDED_HEADER and hmac.compare_digest(value, self.__secret)
+            for name, value in headers
+        )
+
+    async def route(
+        self, id: int, method: str, path: str, body: bytes
+    ) -> tuple[int, Headers, bytes]:
+        self.__forwarded += 1
+        owner = self.__ownership.owner(id)
+        if self.__redirects:
+            return (
+                307,
+                [
+                    (b"location", self.__redirects[owner] + path.encode()),
+                    (b"content-length", b"0"),
+                ],
+                b"",
+            )
+        try:
+            return await self.__peers[owner].forward(method, path, body)
+        except (OSError, EOFError, PeerResponseError):
+            return UNAVAILABLE
+
+    async def close(self) -> None:
+        for peer in self.__peers:
+            await peer.close()
+
+
+class ShardMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.__app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            router: ShardRouter | None = scope["state"]["shard_router"]
+            if router is not None:
+                match scope["path"].split("/"):
+                    case ["", "clientes", id, *_] if (
+                        id.isascii()
+                        and id.isdigit()
+                        and not router.accepts(int(id), scope["headers"])
+                    ):
+                        return await self.__route(router, scope, receive, send, int(id))
+        await self.__app(scope, receive, send)
+
+    async def __route(
+        self, router: ShardRouter, scope: Scope, receive: Receive, send: Send, id: int
+    ) -> None:
+        path = scope["path"]
+        if scope.get("query_string"):
+            path += "?" + scope["query_string"].decode("latin-1")
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+        status_code, headers, content = await router.route(
+            id, scope["method"], path, body
+        )
+        await send(
+            {"type": "http.response.start", "status": status_code, "headers": headers}
+        )
+        await send({"type": "http.response.body", "body": content})
+
+
+class PeerResponseError(Exception): ...
+
+
+class Peer:
+    def __init__(self, url: str, secret: bytes, max_idle: int) -> None:
+        parts = urlsplit(url)
+        self.__host = parts.hostname or "localhost"
+        self.__port = parts.port or 80
+        self.__authority = parts.netloc.encode()
+        self.__secret = secret
+        self.__max_idle = max_idle
+        self.__idle = deque[Stream]()
+
+    async def forward(
+        self, method: str, path: str, body: bytes
+    ) -> tuple[int, Headers, bytes]:
+        request = (
+            f"{method} {path} HTTP/1.1\r\n".encode()
+            + b"host: "
+            + self.__authority
+            + b"\r\ncontent-type: application/json\r\n"
+            + FORWARDED_HEADER
+            + b": "
+            + self.__secret
+            + f"\r\ncontent-length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        stream = await self.__connect()
+        try:
+            return await self.__exchange(stream, request)
+        except BaseException:
+            stream[1].close()
+            raise
+
+    async def close(self) -> None:
+        while self.__idle:
+            _, writer = self.__idle.pop()
+            writer.close()
+
+    async def __connect(self) -> Stream:
+        while self.__idle:
+            reader, writer = self.__idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer
+            writer.close()
+        return await asyncio.open_connection(self.__host, self.__port)
+
+    async def __exchange(
+        self, stream: Stream, request: bytes
+    ) -> tuple[int, Headers, bytes]:
+        reader, writer = stream
+        writer.write(request)
+        try:
+            status_code, headers, content, keep_alive = await self.__read_response(
+                reader
+            )
+        except (ValueError, IndexError, asyncio.LimitOverrunError) as error:
+            raise PeerResponseError(
+                f"malformed response from the peer: {error}"
+            ) from error
+        if keep_alive and len(self.__idle) < self.__max_idle:
+            self.__idle.append(stream)
+        else:
+            writer.close()
+        return status_code, headers, content
+
+    async def __read_response(
+        self, reader: asyncio.StreamReader
+    ) -> tuple[int, Headers, bytes, bool]:
+        head = await reader.readuntil(b"\r\n\r\n")
+        status_line, *lines = head[:-4].split(b"\r\n")
+        version, status_code, *_ = status_line.split()
+        if not version.startswith(b"HTTP/"):
+            raise ValueError(f"not an HTTP status line: {status_line!r}")
+        headers = list[tuple[bytes, bytes]]()
+        length = 0
+        chunked = False
+        keep_alive = True
+        for line in lines:
+            name, _, value = line.partition(b":")
+            name, value = name.strip().lower(), value.strip()
+            if name == b"content-length":
+                length = int(value)
+            elif name == b"transfer-encoding":
+                chunked = value.lower() == b"chunked"
+            elif name == b"connection":
+                keep_alive = value.lower() != b"close"
+            if name in RELAYED_HEADERS:
+                headers.append((name, value))
+        if chunked:
+            content = await self.__read_chunks(reader)
+            headers.append((b"content-length", str(len(content)).encode()))
+        else:
+            content = await reader.readexactly(length)
+        return int(status_code), headers, content, keep_alive
+
+    async def __read_chunks(self, reader: asyncio.StreamReader) -> bytes:
+        chunks = list[bytes]()
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return b"".join(chunks)
+            chunks.append((await reader.readexactly(size + 2))[:-2])
@@ -0,0 +1,23 @@
+import asyncio
+
+from ..adapters.client_repository import ClientRepository
+from ..adapters.transaction_repository import TransactionRepository
+
+
+async def warm_up(
+    client_repository: ClientRepository,
+    transaction_repository: TransactionRepository,
+    rounds: int,
+    concurrency: int,
+) -> None:
+    if rounds <= 0:
+        return
+    clients = await client_repository.get_all()
+    slots = asyncio.Semaphore(max(concurrency, 1))
+
+    async def get_statement(id: int) -> None:
+        async with slots:
+            await transaction_repository.get_statement(id=id)
+
+    for _ in range(rounds):
+        await asyncio.gather(*(get_statement(client.id) for client in clients))
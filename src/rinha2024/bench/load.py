@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+from importlib import import_module
+from time import perf_counter
+from typing import Any
+from urllib.parse import urlsplit
+
+import orjson
+
+CLIENT_IDS = (1, 2, 3, 4, 5)
+UNKNOWN_CLIENT_ID = 6
+INVALID_PAYLOADS = (
+    {"valor": 1.2, "tipo": "d", "descricao": "devolve"},
+    {"valor": 1, "tipo": "x", "descricao": "devolve"},
+    {"valor": 1, "tipo": "c", "descricao": "123456789 e mais um pouco"},
+    {"valor": 1, "tipo": "c", "descricao": ""},
+    {"valor": 1, "tipo": "c", "descricao": None},
+)
+TRAFFIC_MIX = {
+    "debit": 0.5,
+    "credit": 0.25,
+    "statement": 0.2,
+    "invalid": 0.03,
+    "unknown": 0.02,
+}
+
+type Request = Callable[[str, str, bytes], Awaitable[tuple[int, bytes]]]
+
+
+@dataclass(slots=True)
+class EndpointReport:
+    latencies: list[float] = field(default_factory=list)
+    statuses: Counter[int] = field(default_factory=Counter)
+    unexpected: int = 0
+
+    def summary(self, elapsed: float) -> dict[str, Any]:
+        latencies = sorted(self.latencies)
+        return {
+            "requests": len(latencies),
+            "throughput": len(latencies) / elapsed if elapsed else 0,
+            "p50": percentile(latencies, 0.5),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "max": latencies[-1] if latencies else 0,
+            "statuses": dict(sorted(self.statuses.items())),
+            "unexpected": self.unexpected,
+        }
+
+
+@dataclass(slots=True)
+class LoadReport:
+    endpoints: dict[str, EndpointReport] = field(
+        default_factory=lambda: {
+            "transacoes": EndpointReport(),
+            "extrato": EndpointReport(),
+        }
+    )
+    applied: Counter[int] = field(default_factory=Counter)
+    limit_violations: int = 0
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class AsgiLifespan:
+    def __init__(self, app: Any) -> None:
+        self.__app = app
+        self.__receive = asyncio.Queue[dict[str, Any]]()
+        self.__send = asyncio.Queue[dict[str, Any]]()
+        self.state = dict[str, Any]()
+
+    async def __aenter__(self) -> AsgiLifespan:
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": self.state}
+        self.__task = asyncio.create_task(
+            self.__app(scope, self.__receive.get, self.__send.put)
+        )
+        await self.__receive.put({"type": "lifespan.startup"})
+        message = await self.__send.get()
+        if message["type"] != "lifespan.startup.complete":
+            raise RuntimeError(message.get("message", "application startup failed"))
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        await self.__receive.put({"type": "lifespan.shutdown"})
+        await self.__send.get()
+        await self.__task
+
+
+def asgi_request(app: Any, state: dict[str, Any]) -> Request:
+    async def request(method: str, path: str, body: bytes) -> tuple[int, bytes]:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [
+                (b"host", b"bench"),
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("bench", 80),
+            "state": state.copy(),
+        }
+        sent = list[dict[str, Any]]()
+
+        async def receive() -> dict[str, Any]:
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message: dict[str, Any]) -> None:
+            sent.append(message)
+
+        await app(scope, receive, send)
+        return sent[0]["status"], b"".join(
+            message.get("body", b"") for message in sent[1:]
+        )
+
+    return request
+
+
+@asynccontextmanager
+async def socket_request(url: str) -> AsyncIterator[Request]:
+    parts = urlsplit(url)
+    host = parts.hostname or "localhost"
+    reader, writer = await asyncio.open_connection(host, parts.port or 80)
+
+    async def request(method: str, path: str, body: bytes) -> tuple[int, bytes]:
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\n"
+            f"host: {host}\r\n"
+            f"content-type: application/json\r\n"
+            f"content-length: {len(body)}\r\n\r\n".encode() + body
+        )
+        head = await reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        length = 0
+        for line in header_lines:
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        return int(status_line.split()[1]), await reader.readexactly(length)
+
+    try:
+        yield request
+    finally:
+        writer.close()
+
+
+def next_request(rng: random.Random) -> tuple[str, int, str, bytes, str]:
+    kind = rng.choices(tuple(TRAFFIC_MIX), weights=tuple(TRAFFIC_MIX.values()))[0]
+    id = rng.choice(CLIENT_IDS)
+    match kind:
+        case "debit" | "credit":
+            payload = {
+                "valor": rng.randint(1, 10000),
+                "tipo": "d" if kind == "debit" else "c",
+                "descricao": "bench",
+            }
+            return "POST", id, "transacoes", orjson.dumps(payload), kind
+        case "statement":
+            return "GET", id, "extrato", b"", kind
+        case "invalid":
+            payload = rng.choice(INVALID_PAYLOADS)
+            return "POST", id, "transacoes", orjson.dumps(payload), kind
+        case _:
+            if rng.random() < 0.5:
+                return "GET", UNKNOWN_CLIENT_ID, "extrato", b"", kind
+            payload = {"valor": 1, "tipo": "c", "descricao": "bench"}
+            return "POST", UNKNOWN_CLIENT_ID, "transacoes", orjson.dumps(payload), kind
+
+
+async def worker(
+    request: Request, report: LoadReport, rng: random.Random, amount: int
+) -> None:
+    for _ in range(amount):
+        method, id, endpoint, body, kind = next_request(rng)
+        started = perf_counter()
+        status, content = await request(method, f"/clientes/{id}/{endpoint}", body)
+        elapsed = perf_counter() - started
+
+        endpoint_report = report.endpoints[endpoint]
+        endpoint_report.latencies.append(elapsed)
+        endpoint_report.statuses[status] += 1
+        match kind:
+            case "invalid":
+                expected = status in (400, 422)
+            case "unknown":
+                expected = status == 404
+            case "debit":
+                expected = status in (200, 422)
+            case _:
+                expected = status == 200
+        if not expected:
+            endpoint_report.unexpected += 1
+
+        if kind in ("debit", "credit") and status == 200:
+            payload = orjson.loads(body)
+            value = payload["valor"] if kind == "credit" else payload["valor"] * -1
+            report.applied[id] += value
+            response = orjson.loads(content)
+            if response["saldo"] < response["limite"] * -1:
+                report.limit_violations += 1
+
+
+async def balances(request: Request) -> dict[int, tuple[int, int]]:
+    result = dict[int, tuple[int, int]]()
+    for id in CLIENT_IDS:
+        status, content = await request("GET", f"/clientes/{id}/extrato", b"")
+        if status != 200:
+            raise RuntimeError(f"could not read the statement of client {id}")
+        saldo = orjson.loads(content)["saldo"]
+        result[id] = (saldo["total"], saldo["limite"])
+    return result
+
+
+async def run(
+    requests: list[Request], amount: int, seed: int
+) -> tuple[LoadReport, float, dict[str, Any]]:
+    report = LoadReport()
+    initial = await balances(requests[0])
+    per_worker, remainder = divmod(amount, len(requests))
+    started = perf_counter()
+    await asyncio.gather(
+        *(
+            worker(
+                request,
+                report,
+                random.Random(seed + index),
+                per_worker + (1 if index < remainder else 0),
+            )
+            for index, request in enumerate(requests)
+        )
+    )
+    elapsed = perf_counter() - started
+    final = await balances(requests[0])
+
+    consistency = {
+        str(id): {
+            "expected": initial[id][0] + report.applied[id],
+            "actual": final[id][0],
+            "within_limit": final[id][0] >= final[id][1] * -1,
+        }
+        for id in CLIENT_IDS
+    }
+    return report, elapsed, consistency
+
+
+async def main(arguments: argparse.Namespace) -> int:
+    if arguments.url:
+        async with AsyncExitStack() as stack:
+            requests = [
+                await stack.enter_async_context(socket_request(arguments.url))
+                for _ in range(arguments.concurrency)
+            ]
+            report, elapsed, consistency = await run(
+                requests, arguments.requests, arguments.seed
+            )
+    else:
+        os.environ["REPOSITORY_BACKEND"] = arguments.backend
+        os.environ.setdefault(
+            "MMAP_LEDGER_PATH", os.path.join(tempfile.mkdtemp(), "ledger")
+        )
+        module, _, attribute = arguments.app.partition(":")
+        app = getattr(import_module(module), attribute)
+        async with AsgiLifespan(app) as lifespan:
+            request = asgi_request(app, lifespan.state)
+            report, elapsed, consistency = await run(
+                [request] * arguments.concurrency, arguments.requests, arguments.seed
+            )
+
+    result = {
+        "elapsed": elapsed,
+        "throughput": sum(len(e.latencies) for e in report.endpoints.values())
+        / elapsed,
+        "endpoints": {
+            name: endpoint.summary(elapsed)
+            for name, endpoint in report.endpoints.items()
+        },
+        "limit_violations": report.limit_violations,
+        "consistency": consistency,
+    }
+    consistent = report.limit_violations == 0 and all(
+        client["expected"] == client["actual"] and client["within_limit"]
+        for client in consistency.values()
+    )
+    unexpected = sum(e.unexpected for e in report.endpoints.values())
+
+    if arguments.json:
+        sys.stdout.buffer.write(
+            orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        )
+        sys.stdout.write("\n")
+    else:
+        print_report(result)
+    return 0 if consistent and not unexpected else 1
+
+
+def print_report(result: dict[str, Any]) -> None:
+    print(
+        f"{'endpoint':<12}{'requests':>10}{'req/s':>10}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}  statuses"
+    )
+    for name, endpoint in result["endpoints"].items():
+        print(
+            f"{name:<12}{endpoint['requests']:>10}{endpoint['throughput']:>10.0f}"
+            f"{endpoint['p50'] * 1000:>10.2f}{endpoint['p95'] * 1000:>10.2f}"
+            f"{endpoint['p99'] * 1000:>10.2f}{endpoint['max'] * 1000:>10.2f}"
+            f"  {endpoint['statuses']} unexpected={endpoint['unexpected']}"
+        )
+    print(f"total: {result['throughput']:.0f} req/s in {result['elapsed']:.2f}s")
+    print(f"limit violations: {result['limit_violations']}")
+    for id, client in result["consistency"].items():
+        state = (
+            "ok"
+            if client["expected"] == client["actual"] and client["within_limit"]
+            else "MISMATCH"
+        )
+        print(
+            f"client {id}: expected {client['expected']} "
+            f"actual {client['actual']} {state}"
+        )
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m rinha2024.bench.load",
+        description="Replays the Rinha traffic mix against the API.",
+    )
+    parser.add_argument(
+        "--app",
+        default="rinha2024.app:fast_app",
+        help="ASGI application to drive in process (module:attribute)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("memory", "postgres", "write-behind", "mmap"),
+        default="memory",
+        help="REPOSITORY_BACKEND used by the in-process application",
+    )
+    parser.add_argument("--url", help="drive a running server over a local socket")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_arguments())))
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from collections.abc import Awaitable, Callable
+from importlib import import_module
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Any
+
+import orjson
+
+from ..adapters.client_repository import ClientRepository
+from ..adapters.transaction_repository import TransactionRepository
+from ..core.entities.client import Client
+from ..core.entities.transaction import Transaction, TransactionKind
+from .load import AsgiLifespan, Request, asgi_request, percentile
+
+HISTORY_SIZES = (1000, 10000, 100000, 1000000)
+POPULATE_CHUNK_SIZE = 1000
+CLIENT_LIMIT = 100000
+DEFAULT_THRESHOLD = 1.0
+DEFAULT_MAX_GROWTH = 3.0
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+
+type Operation = Callable[[], Awaitable[Any]]
+type Results = dict[str, dict[str, dict[str, float]]]
+
+
+def operations(
+    id: int,
+    clients: ClientRepository,
+    transactions: TransactionRepository,
+    request: Request,
+) -> dict[str, Operation]:
+    credit = Transaction(id, 1, TransactionKind.CREDIT, "bench")
+    debit = Transaction(id, 1, TransactionKind.DEBIT, "bench")
+    payload = orjson.dumps({"valor": 1, "tipo": "c", "descricao": "bench"})
+
+    async def get_by_client_id() -> None:
+        async with transactions.get_by_client_id(id=id) as result:
+            async for _ in result.unwrap():
+                pass
+
+    return {
+        "create_credit": lambda: transactions.create(credit),
+        "create_debit": lambda: transactions.create(debit),
+        "get_by_client_id": get_by_client_id,
+        "get_statement": lambda: transactions.get_statement(id=id),
+        "get": lambda: clients.get(id),
+        "exists": lambda: clients.exists(id),
+        "make_transaction": lambda: request(
+            "POST", f"/clientes/{id}/transacoes", payload
+        ),
+        "get_bank_statement": lambda: request("GET", f"/clientes/{id}/extrato", b""),
+    }
+
+
+async def populate(
+    transactions: TransactionRepository, id: int, current: int, target: int
+) -> None:
+    while current < target:
+        amount = min(POPULATE_CHUNK_SIZE, target - current)
+        await transactions.create_many(
+            [Transaction(id, 1, TransactionKind.CREDIT, "seed") for _ in range(amount)]
+        )
+        current += amount
+
+
+async def measure(operation: Operation, iterations: int) -> dict[str, float]:
+    latencies = list[float]()
+    for _ in range(iterations):
+        started = perf_counter()
+        await operation()
+        latencies.append(perf_counter() - started)
+    latencies.sort()
+    return {
+        "median": median(latencies),
+        "p99": percentile(latencies, 0.99),
+        "iterations": iterations,
+    }
+
+
+async def run(arguments: argparse.Namespace) -> Results:
+    os.environ["REPOSITORY_BACKEND"] = arguments.backend
+    os.environ.setdefault(
+        "MMAP_LEDGER_PATH", os.path.join(tempfile.mkdtemp(), "ledger")
+    )
+    module, _, attribute = arguments.app.partition(":")
+    app = getattr(import_module(module), attribute)
+    results: Results = {}
+    async with AsgiLifespan(app) as lifespan:
+        clients: ClientRepository = lifespan.state["client_repository"]
+        transactions: TransactionRepository = lifespan.state["transaction_repository"]
+        client = await clients.create(Client(CLIENT_LIMIT, 0))
+        benchmarks = operations(
+            client.id, clients, transactions, asgi_request(app, lifespan.state)
+        )
+        history = 0
+        for size in sorted(arguments.history):
+            await populate(transactions, client.id, history, size)
+            history = size
+            for operation in benchmarks.values():
+                for _ in range(arguments.warmup):
+                    await operation()
+            results[str(size)] = {
+                name: await measure(operation, arguments.iterations)
+                for name, operation in benchmarks.items()
+            }
+            history += (arguments.iterations + arguments.warmup) * 3
+    return results
+
+
+def regressions(
+    backend: str,
+    results: Results,
+    baseline: dict[str, Any],
+    threshold: float,
+) -> list[str]:
+    thresholds: dict[str, float] = baseline.get("thresholds", {})
+    expected: Results = baseline.get("results", {}).get(backend, {})
+    failures = list[str]()
+    for size, measurements in results.items():
+        for name, measurement in measurements.items():
+            reference = expected.get(size, {}).get(name)
+            if reference is None:
+                continue
+            limit = reference["median"] * (1 + thresholds.get(name, threshold))
+            if measurement["median"] > limit:
+                failures.append(
+                    f"{backend} {name} at {size} transactions: "
+                    f"{measurement['median'] * 1e6:.1f}us > {limit * 1e6:.1f}us"
+                )
+    return failures
+
+
+def growths(backend: str, results: Results, max_growth: float) -> list[str]:
+    sizes = sorted(results, key=int)
+    if len(sizes) < 2:
+        return []
+    smallest, largest = results[sizes[0]], results[sizes[-1]]
+    return [
+        f"{backend} {name} grows {growth:.1f}x from {sizes[0]} to {sizes[-1]} "
+        "transactions"
+        for name in smallest
+        if (growth := largest[name]["median"] / smallest[name]["median"]) > max_growth
+    ]
+
+
+def print_results(backend: str, results: Results) -> None:
+    print(
+        f"{'backend':<14}{'history':>10}  {'operation':<20}"
+        f"{'median us':>12}{'p99 us':>12}"
+    )
+    for size, measurements in results.items():
+        for name, measurement in measurements.items():
+            print(
+                f"{backend:<14}{size:>10}  {name:<20}"
+                f"{measurement['median'] * 1e6:>12.1f}"
+                f"{measurement['p99'] * 1e6:>12.1f}"
+            )
+
+
+async def main(arguments: argparse.Namespace) -> int:
+    results = await run(arguments)
+    print_results(arguments.backend, results)
+
+    failures = growths(arguments.backend, results, arguments.max_growth)
+    if arguments.baseline and arguments.baseline.exists():
+        baseline = orjson.loads(arguments.baseline.read_bytes())
+        failures += regressions(
+            arguments.backend, results, baseline, arguments.threshold
+        )
+    if arguments.save:
+        saved = (
+            orjson.loads(arguments.save.read_bytes())
+            if arguments.save.exists()
+            else {"thresholds": {}, "results": {}}
+        )
+        saved["results"][arguments.backend] = results
+        arguments.save.write_bytes(
+            orjson.dumps(saved, option=orjson.OPT_INDENT_2) + b"\n"
+        )
+
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m rinha2024.bench.repositories",
+        description="Measures each repository operation and controller per backend.",
+    )
+    parser.add_argument(
+        "--app",
+        default="rinha2024.app:fast_app",
+        help="ASGI application whose lifespan builds the repositories",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("memory", "postgres", "write-behind", "mmap"),
+        default="memory",
+        help="REPOSITORY_BACKEND under measurement",
+    )
+    parser.add_argument(
+        "--history",
+        type=lambda value: tuple(int(size) for size in value.split(",")),
+        default=HISTORY_SIZES,
+        help="comma separated history sizes of the measured client",
+    )
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="JSON baseline to compare the medians against",
+    )
+    parser.add_argument(
+        "--save", type=Path, help="write the results for this backend into a baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed median slowdown over the baseline, as a fraction",
+    )
+    parser.add_argument(
+        "--max-growth",
+        type=float,
+        default=DEFAULT_MAX_GROWTH,
+        help="allowed median ratio between the largest and smallest history",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_arguments())))
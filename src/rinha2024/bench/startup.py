@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+from importlib import import_module
+from time import perf_counter
+
+from .load import AsgiLifespan
+
+DEFAULT_IMPORT_BUDGET = 0.2
+DEFAULT_STARTUP_BUDGET = 1.0
+
+
+def import_times(module: str) -> tuple[float, list[tuple[str, float]]]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    children = list[tuple[str, float]]()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        seconds = int(cumulative) / 1e6
+        depth = len(name) - len(name.lstrip()) - 1
+        if depth == 0 and name.strip() == module:
+            return seconds, children
+        if depth == 0:
+            children = []
+        elif depth == 2:
+            children.append((name.strip(), seconds))
+    raise RuntimeError(f"{module} was already imported by the interpreter")
+
+
+async def startup_time(app: str) -> float:
+    module, _, attribute = app.partition(":")
+    application = getattr(import_module(module), attribute)
+    started = perf_counter()
+    async with AsgiLifespan(application):
+        return perf_counter() - started
+
+
+async def main(arguments: argparse.Namespace) -> int:
+    module = arguments.app.partition(":")[0]
+    imported, children = import_times(module)
+    print(f"import {module}: {imported * 1000:.1f} ms")
+    slowest = sorted(children, key=lambda child: child[1], reverse=True)
+    for name, seconds in slowest[: arguments.top]:
+        print(f"  {name:<56}{seconds * 1000:>8.1f} ms")
+
+    os.environ["REPOSITORY_BACKEND"] = arguments.backend
+    os.environ.setdefault(
+        "MMAP_LEDGER_PATH", os.path.join(tempfile.mkdtemp(), "ledger")
+    )
+    started = await startup_time(arguments.app)
+    print(f"lifespan startup ({arguments.backend}): {started * 1000:.1f} ms")
+
+    failures = list[str]()
+    if imported > arguments.import_budget:
+        failures.append(
+            f"import took {imported * 1000:.1f} ms, "
+            f"budget is {arguments.import_budget * 1000:.0f} ms"
+        )
+    if started > arguments.startup_budget:
+        failures.append(
+            f"startup took {started * 1000:.1f} ms, "
+            f"budget is {arguments.startup_budget * 1000:.0f} ms"
+        )
+    for failure in failures:
+        print(f"OVER BUDGET {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m rinha2024.bench.startup",
+        description="Checks the import and warm-up time of the application.",
+    )
+    parser.add_argument(
+        "--app",
+        default="rinha2024.app:fast_app",
+        help="ASGI application to import and start (module:attribute)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=("memory", "postgres", "write-behind", "mmap"),
+        default="memory",
+        help="REPOSITORY_BACKEND used for the lifespan startup",
+    )
+    parser.add_argument(
+        "--import-budget",
+        type=float,
+        default=DEFAULT_IMPORT_BUDGET,
+        help="seconds allowed for importing the application module",
+    )
+    parser.add_argument(
+        "--startup-budget",
+        type=float,
+        default=DEFAULT_STARTUP_BUDGET,
+        help="seconds allowed for the lifespan startup, warm-up included",
+    )
+    parser.add_argument(
+        "--top", type=int, default=10, help="slowest direct imports to list"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_arguments())))
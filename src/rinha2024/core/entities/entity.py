@@ -1,4 +1,6 @@
 class Entity[T]:
+    __slots__ = ("__id", "__props")
+
     def __init__(self, props: T, id: int) -> None:
         self.__id = id
         self.__props = props
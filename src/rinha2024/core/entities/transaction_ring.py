@@ -0,0 +1,87 @@
+from array import array
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+
+from .entity import Entity
+from .transaction import Transaction, TransactionKind
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+KINDS = {ord(kind): kind for kind in TransactionKind}
+
+
+def to_microseconds(moment: datetime) -> int:
+    return (moment - EPOCH) // MICROSECOND
+
+
+def from_microseconds(microseconds: int) -> datetime:
+    return EPOCH + timedelta(microseconds=microseconds)
+
+
+class TransactionRing:
+    __slots__ = (
+        "__client_id",
+        "__ids",
+        "__values",
+        "__kinds",
+        "__created_at",
+        "__descriptions",
+        "__count",
+    )
+
+    def __init__(self, client_id: int, size: int) -> None:
+        self.__client_id = client_id
+        self.__ids = array("q", [0]) * size
+        self.__values = array("q", [0]) * size
+        self.__kinds = bytearray(size)
+        self.__created_at = array("q", [0]) * size
+        self.__descriptions = [""] * size
+        self.__count = 0
+
+    def __len__(self) -> int:
+        return min(self.__count, len(self.__kinds))
+
+    def append(self, id: int, transaction: Transaction) -> None:
+        if not self.__kinds:
+            return
+        position = self.__count % len(self.__kinds)
+        self.__ids[position] = id
+        self.__values[position] = transaction.value
+        self.__kinds[position] = ord(transaction.kind)
+        self.__created_at[position] = to_microseconds(transaction.created_at)
+        self.__descriptions[position] = transaction.description
+        self.__count += 1
+
+    def newest(self, starting_from: datetime) -> Iterator[Entity[Transaction]]:
+        limit = to_microseconds(starting_from)
+        for position in self.__positions(reversed(range(len(self)))):
+            if self.__created_at[position] <= limit:
+                yield self.__entity(position)
+
+    def oldest(self) -> Iterator[Entity[Transaction]]:
+        for position in self.__positions(range(len(self))):
+            yield self.__entity(position)
+
+    def latest_created_at(self) -> datetime | None:
+        if not len(self):
+            return None
+        return from_microseconds(
+            self.__created_at[(self.__count - 1) % len(self.__kinds)]
+        )
+
+    def __positions(self, indexes: Iterator[int] | range) -> Iterator[int]:
+        first = self.__count - len(self)
+        size = len(self.__kinds)
+        return ((first + index) % size for index in indexes)
+
+    def __entity(self, position: int) -> Entity[Transaction]:
+        return Entity(
+            Transaction(
+                self.__client_id,
+                self.__values[position],
+                KINDS[self.__kinds[position]],
+                self.__descriptions[position],
+                from_microseconds(self.__created_at[position]),
+            ),
+            self.__ids[position],
+        )
@@ -0,0 +1,47 @@
+import random
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta
+
+from .entities.client import Client
+from .entities.entity import Entity
+from .entities.transaction import Transaction, TransactionKind
+
+DESCRIPTIONS = (
+    "pix",
+    "boleto",
+    "mercado",
+    "aluguel",
+    "salario",
+    "padaria",
+    "farmacia",
+    "uber",
+    "ifood",
+    "luz",
+)
+MAX_VALUE = 100000
+
+
+def generate_transactions(
+    clients: Iterable[Entity[Client]],
+    amount: int,
+    rng: random.Random,
+    until: datetime,
+    span: timedelta,
+) -> Iterator[Transaction]:
+    limits = {client.id: client.props.limit for client in clients}
+    balances = {client.id: client.props.balance for client in clients}
+    ids = tuple(limits)
+    started = until - span
+    step = span / max(amount, 1)
+    for index in range(amount):
+        id = rng.choice(ids)
+        value = rng.randint(1, MAX_VALUE)
+        if rng.random() < 0.5 and balances[id] - value >= limits[id] * -1:
+            kind = TransactionKind.DEBIT
+            balances[id] -= value
+        else:
+            kind = TransactionKind.CREDIT
+            balances[id] += value
+        yield Transaction(
+            id, value, kind, rng.choice(DESCRIPTIONS), started + step * index
+        )
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import sys
+from collections.abc import Iterable, Iterator, Mapping
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import IO
+
+import asyncpg
+import orjson
+from starlette.config import Config
+
+from ..app.adapters.postgres_statements import Statement
+from ..core.entities.client import Client
+from ..core.entities.entity import Entity
+from ..core.entities.transaction import Transaction, TransactionKind
+from ..core.transaction_generator import generate_transactions
+
+ENV_PATH = Path(".env")
+config = Config(ENV_PATH if ENV_PATH.exists() else None)
+
+COLUMNS = ("client_id", "value", "kind", "description", "created_at")
+UPDATE_BALANCE = """UPDATE Client SET balance = $2 WHERE id = $1\n"""
+HAS_RECENT_TRANSACTIONS = (
+    """SELECT EXISTS(\n"""
+    """    SELECT 1 FROM information_schema.columns\n"""
+    """    WHERE table_name = 'client' AND column_name = 'recent_transactions'\n"""
+    """)\n"""
+)
+
+
+def read_transactions(stream: IO[bytes]) -> Iterator[Transaction]:
+    for line, content in enumerate(stream, 1):
+        if not content.strip():
+            continue
+        try:
+            payload = orjson.loads(content)
+            transaction = Transaction(
+                int(payload["cliente"]),
+                int(payload["valor"]),
+                TransactionKind(payload["tipo"]),
+                str(payload["descricao"]),
+                datetime.fromisoformat(payload["realizada_em"]),
+            )
+        except (orjson.JSONDecodeError, KeyError, TypeError, ValueError) as error:
+            raise ValueError(f"line {line}: {error}") from error
+        if transaction.value <= 0 or not 1 <= len(transaction.description) <= 10:
+            raise ValueError(f"line {line}: invalid transaction")
+        yield transaction
+
+
+def check_transactions(
+    transactions: Iterable[Transaction],
+    limits: Mapping[int, int],
+    balances: dict[int, int],
+) -> Iterator[Transaction]:
+    for index, transaction in enumerate(transactions, 1):
+        id = transaction.client_id
+        if id not in limits:
+            raise ValueError(f"transaction {index}: client {id} does not exist")
+        if transaction.kind == TransactionKind.CREDIT:
+            balance = balances[id] + transaction.value
+        else:
+            balance = balances[id] - transaction.value
+        if balance < limits[id] * -1:
+            raise ValueError(f"transaction {index}: client {id} has no limit left")
+        balances[id] = balance
+        yield transaction
+
+
+async def copy_transactions(
+    connection: asyncpg.Connection,
+    clients: Iterable[Entity[Client]],
+    transactions: Iterable[Transaction],
+    ring_size: int,
+) -> tuple[int, dict[int, int]]:
+    limits = {client.id: client.props.limit for client in clients}
+    balances = {client.id: client.props.balance for client in clients}
+    async with connection.transaction():
+        status = await connection.copy_records_to_table(
+            "transaction",
+            records=(
+                (
+                    transaction.client_id,
+                    transaction.value,
+                    transaction.kind.value,
+                    transaction.description,
+                    transaction.created_at,
+                )
+                for transaction in check_transactions(transactions, limits, balances)
+            ),
+            columns=COLUMNS,
+        )
+        await connection.executemany(UPDATE_BALANCE, balances.items())
+        if await connection.fetchval(HAS_RECENT_TRANSACTIONS):
+            await connection.execute(
+                Statement.REBUILD_RECENT_TRANSACTIONS.value, ring_size
+            )
+    return int(status.split()[-1]), balances
+
+
+async def main(arguments: argparse.Namespace) -> int:
+    connection = await asyncpg.connect(
+        host=config("POSTGRES_HOST", default=None),
+        port=config("POSTGRES_PORT", cast=int, default=None),
+        database=config("POSTGRES_DB", default=None),
+        user=config("POSTGRES_USER", default=None),
+        password=config("POSTGRES_PASSWORD", default=None),
+    )
+    try:
+        clients = tuple(
+            Entity(Client(record["limit"], record["balance"]), record["id"])
+            for record in await connection.fetch(Statement.GET_ALL_CLIENTS.value)
+        )
+        with ExitStack() as stack:
+            if arguments.input is None:
+                transactions = generate_transactions(
+                    clients,
+                    arguments.transactions,
+                    random.Random(arguments.seed),
+                    datetime.now(timezone.utc),
+                    timedelta(days=arguments.days),
+                )
+            elif arguments.input == "-":
+                transactions = read_transactions(sys.stdin.buffer)
+            else:
+                transactions = read_transactions(
+                    stack.enter_context(open(arguments.input, "rb"))
+                )
+
+            started = perf_counter()
+            try:
+                loaded, balances = await copy_transactions(
+                    connection, clients, transactions, arguments.ring_size
+                )
+            except ValueError as error:
+                print(f"nothing was loaded: {error}", file=sys.stderr)
+                return 1
+            elapsed = perf_counter() - started
+    finally:
+        await connection.close()
+
+    print(f"loaded {loaded} transactions in {elapsed:.1f}s")
+    for id, balance in sorted(balances.items()):
+        print(f"client {id}: balance {balance}")
+    return 0
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m rinha2024.tools.seed",
+        description=(
+            "Loads generated or imported transactions into the Postgres configured "
+            "in POSTGRES_* with COPY, keeping Client.balance consistent."
+        ),
+    )
+    parser.add_argument(
+        "--transactions",
+        type=int,
+        default=1000000,
+        help="transactions to generate across the existing clients",
+    )
+    parser.add_argument(
+        "--days",
+        type=float,
+        default=30,
+        help="generated transactions are spread over the last DAYS days",
+    )
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument(
+        "--ring-size",
+        type=int,
+        default=config("TRANSACTION_RING_SIZE", cast=int, default=0) or 10,
+        help=(
+            "transactions rebuilt into Client.recent_transactions when the column "
+            "exists; defaults to TRANSACTION_RING_SIZE, or 10 when it is not set"
+        ),
+    )
+    parser.add_argument(
+        "--input",
+        help=(
+            "NDJSON file (or - for stdin) with cliente, valor, tipo, descricao and "
+            "realizada_em per line, imported instead of generating"
+        ),
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_arguments())))
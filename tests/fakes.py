@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from inspect import isawaitable
+from types import TracebackType
+from typing import Any, Optional
+
+from rinha2024.app.adapters.postgres_statements import Statement
+
+type Handler = Callable[..., Any]
+
+
+class FakePool:
+    def __init__(self, handlers: dict[Statement, Handler]) -> None:
+        self.handlers = handlers
+        self.acquired = 0
+        self.released = 0
+        self.connections = list[FakeConnection]()
+        self.calls = list[tuple[Statement, tuple[Any, ...]]]()
+
+    @property
+    def outstanding(self) -> int:
+        return self.acquired - self.released
+
+    def acquire(self) -> FakeAcquire:
+        return FakeAcquire(self)
+
+    async def release(self, connection: FakeConnection) -> None:
+        self.released += 1
+
+
+class FakeAcquire:
+    def __init__(self, pool: FakePool) -> None:
+        self.__pool = pool
+
+    async def __aenter__(self) -> FakeConnection:
+        self.__pool.acquired += 1
+        self.__connection = FakeConnection(self.__pool)
+        self.__pool.connections.append(self.__connection)
+        return self.__connection
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.__pool.release(self.__connection)
+
+    def __await__(self):
+        return self.__aenter__().__await__()
+
+
+class FakeConnection:
+    def __init__(self, pool: FakePool) -> None:
+        self.__pool = pool
+        self.transactions = list[FakeTransaction]()
+
+    def statement(self, statement: Statement) -> FakeStatement:
+        return FakeStatement(self.__pool, statement)
+
+    def transaction(self, **options: object) -> FakeTransaction:
+        transaction = FakeTransaction()
+        self.transactions.append(transaction)
+        return transaction
+
+
+class FakeStatement:
+    def __init__(self, pool: FakePool, statement: Statement) -> None:
+        self.__pool = pool
+        self.__statement = statement
+
+    async def fetch(self, *args: Any) -> Any:
+        return await self.__result(*args)
+
+    async def fetchrow(self, *args: Any) -> Any:
+        return await self.__result(*args)
+
+    async def fetchval(self, *args: Any) -> Any:
+        return await self.__result(*args)
+
+    def cursor(self, *args: Any, prefetch: int | None = None) -> Any:
+        return self.__call(*args)
+
+    async def __result(self, *args: Any) -> Any:
+        result = self.__call(*args)
+        if isawaitable(result):
+            return await result
+        return result
+
+    def __call(self, *args: Any) -> Any:
+        self.__pool.calls.append((self.__statement, args))
+        return self.__pool.handlers[self.__statement](*args)
+
+
+class FakeTransaction:
+    def __init__(self) -> None:
+        self.state = "new"
+
+    async def start(self) -> None:
+        self.state = "started"
+
+    async def commit(self) -> None:
+        self.state = "committed"
+
+    async def rollback(self) -> None:
+        self.state = "rolled back"
+
+    async def __aenter__(self) -> FakeTransaction:
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if exc_type is None:
+            await self.commit()
+        else:
+            await self.rollback()
+
+
+async def rows(*records: Any) -> Any:
+    for record in records:
+        yield record
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from rinha2024.app.admission import AdmissionController
+from rinha2024.app.metrics import Metrics
+
+
+def controller(max_in_flight, max_queue=0, max_wait=0.0):
+    return AdmissionController("test", max_in_flight, max_queue, max_wait, Metrics())
+
+
+def test_unlimited_budget_admits_everything():
+    admission = controller(0)
+
+    async def admit():
+        return [await admission.acquire() for _ in range(100)]
+
+    assert all(asyncio.run(admit()))
+
+
+def test_full_budget_without_a_queue_sheds():
+    admission = controller(1)
+
+    async def admit():
+        async with admission.admit() as first:
+            async with admission.admit() as second:
+                return first, second
+
+    assert asyncio.run(admit()) == (True, False)
+
+
+def test_queued_request_is_admitted_on_release():
+    admission = controller(1, max_queue=1, max_wait=1.0)
+
+    async def admit():
+        assert await admission.acquire()
+        waiting = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        admission.release()
+        return await waiting
+
+    assert asyncio.run(admit())
+
+
+def test_queued_request_gives_up_after_max_wait():
+    admission = controller(1, max_queue=1, max_wait=0.01)
+
+    async def admit():
+        assert await admission.acquire()
+        return await admission.acquire()
+
+    assert not asyncio.run(admit())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    admission = controller(1, max_queue=1, max_wait=1.0)
+
+    async def admit():
+        assert await admission.acquire()
+        waiting = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        admission.release()
+        return await admission.acquire()
+
+    assert asyncio.run(admit())
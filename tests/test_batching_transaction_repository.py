@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+from returns import Err, Ok
+
+from rinha2024.adapters.errors import ClientDoesNotExistError, NoLimitError
+from rinha2024.app.adapters.batching_transaction_repository import (
+    BatchingTransactionRepository,
+)
+from rinha2024.app.adapters.postgres_statements import Statement
+from rinha2024.core.entities.transaction import Transaction, TransactionKind
+
+from .fakes import FakePool
+
+CLIENTS = {1: {"id": 1, "limit": 100, "balance": 0}}
+
+
+def credit(client_id, value):
+    return Transaction(client_id, value, TransactionKind.CREDIT, "credito")
+
+
+def debit(client_id, value):
+    return Transaction(client_id, value, TransactionKind.DEBIT, "debito")
+
+
+def pool(lock=None):
+    return FakePool(
+        {
+            Statement.LOCK_CLIENTS: lock
+            or (lambda ids: [CLIENTS[id] for id in ids if id in CLIENTS]),
+            Statement.CREATE_TRANSACTIONS: lambda *columns: [],
+            Statement.UPDATE_BALANCES: lambda ids, balances: [],
+        }
+    )
+
+
+def calls(pool, statement):
+    return [args for called, args in pool.calls if called == statement]
+
+
+def test_concurrent_writes_share_one_database_transaction():
+    fake = pool()
+    repository = BatchingTransactionRepository(fake, None, window=0.01, max_size=10)
+
+    async def write():
+        results = await asyncio.gather(
+            repository.create(credit(1, 50)),
+            repository.create(debit(1, 120)),
+            repository.create(debit(1, 200)),
+            repository.create(credit(2, 1)),
+        )
+        await repository.close()
+        return results
+
+    results = asyncio.run(write())
+
+    match results:
+        case [
+            Ok(first),
+            Ok(second),
+            Err(NoLimitError()),
+            Err(ClientDoesNotExistError()),
+        ]:
+            assert first.props.balance == 50
+            assert second.props.balance == -70
+        case _:
+            pytest.fail(f"unexpected results {results}")
+    assert fake.acquired == 1
+    assert fake.outstanding == 0
+    assert [transaction.state for transaction in fake.connections[0].transactions] == [
+        "committed"
+    ]
+    assert len(calls(fake, Statement.LOCK_CLIENTS)) == 1
+    [(client_ids, values, *_)] = calls(fake, Statement.CREATE_TRANSACTIONS)
+    assert (client_ids, values) == ([1, 1], [50, 120])
+    assert calls(fake, Statement.UPDATE_BALANCES) == [([1], [-70])]
+
+
+def test_a_full_batch_is_applied_without_waiting_for_the_window():
+    fake = pool()
+    repository = BatchingTransactionRepository(fake, None, window=60, max_size=2)
+
+    async def write():
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                repository.create(credit(1, 1)), repository.create(credit(1, 1))
+            ),
+            1,
+        )
+        await repository.close()
+        return results
+
+    assert [result.unwrap().props.balance for result in asyncio.run(write())] == [
+        1,
+        2,
+    ]
+
+
+def test_writes_cancelled_before_the_batch_locks_are_skipped():
+    fake = pool()
+    repository = BatchingTransactionRepository(fake, None, window=0.01, max_size=10)
+
+    async def write():
+        kept = asyncio.create_task(repository.create(credit(1, 5)))
+        cancelled = asyncio.create_task(repository.create(credit(1, 7)))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        result = await kept
+        await repository.close()
+        return result
+
+    assert asyncio.run(write()).unwrap().props.balance == 5
+    [(_, values, *_)] = calls(fake, Statement.CREATE_TRANSACTIONS)
+    assert values == [5]
+
+
+def test_a_failed_batch_fails_every_write_and_rolls_back():
+    def lock(ids):
+        raise ConnectionError("lost")
+
+    fake = pool(lock)
+    repository = BatchingTransactionRepository(fake, None, window=0.01, max_size=10)
+
+    async def write():
+        results = await asyncio.gather(
+            repository.create(credit(1, 1)),
+            repository.create(credit(1, 2)),
+            return_exceptions=True,
+        )
+        await repository.close()
+        return results
+
+    results = asyncio.run(write())
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert fake.connections[0].transactions[0].state == "rolled back"
+    assert fake.outstanding == 0
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.bench
+
+BACKENDS = [
+    "memory",
+    "mmap",
+    pytest.param(
+        "postgres",
+        marks=pytest.mark.skipif(
+            "POSTGRES_HOST" not in os.environ, reason="POSTGRES_HOST is not set"
+        ),
+    ),
+]
+
+
+def bench(module, *arguments):
+    return subprocess.run(
+        [sys.executable, "-m", f"rinha2024.bench.{module}", *arguments],
+        capture_output=True,
+        text=True,
+    )
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_repositories_stay_flat_as_the_history_grows(backend):
+    arguments = ["--backend", backend]
+    if baseline := os.environ.get("BENCH_BASELINE"):
+        arguments += ["--baseline", baseline]
+
+    process = bench("repositories", *arguments)
+
+    assert process.returncode == 0, process.stdout + process.stderr
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_startup_stays_within_budget(backend):
+    process = bench("startup", "--backend", backend)
+
+    assert process.returncode == 0, process.stdout + process.stderr
+
+
+@pytest.mark.parametrize("backend", ["memory", "mmap"])
+def test_load_keeps_the_balances_consistent(backend):
+    process = bench("load", "--backend", backend, "--requests", "2000")
+
+    assert process.returncode == 0, process.stdout + process.stderr
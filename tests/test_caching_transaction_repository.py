@@ -0,0 +1,175 @@
+import asyncio
+
+import orjson
+import pytest
+from returns import Ok
+
+from rinha2024.app.adapters.caching_transaction_repository import (
+    CachingTransactionRepository,
+    ChangeTriggerMissingError,
+)
+from rinha2024.app.adapters.in_memory_ledger import InMemoryLedger
+from rinha2024.app.adapters.in_memory_transaction_repository import (
+    InMemoryTransactionRepository,
+)
+from rinha2024.app.metrics import Metrics
+from rinha2024.core.entities.transaction import Transaction, TransactionKind
+
+
+def credit(client_id, value, description="credito"):
+    return Transaction(client_id, value, TransactionKind.CREDIT, description)
+
+
+class CountingTransactionRepository(InMemoryTransactionRepository):
+    def __init__(self, ledger):
+        super().__init__(ledger)
+        self.reads = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def get_statement(self, **props):
+        self.reads += 1
+        await self.gate.wait()
+        return await super().get_statement(**props)
+
+
+class ListenerConnection:
+    def __init__(self, trigger=True):
+        self.trigger = trigger
+        self.listeners = dict()
+        self.termination = None
+        self.closed = False
+
+    async def fetchval(self, query):
+        return self.trigger
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    def add_termination_listener(self, callback):
+        self.termination = callback
+
+    def remove_termination_listener(self, callback):
+        self.termination = None
+
+    def notify(self, payload):
+        self.listeners["client_changes"](self, 0, "client_changes", payload)
+
+    def terminate(self):
+        self.closed = True
+        self.termination(self)
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+def cache(connections, reconnect_delay=0):
+    ledger = InMemoryLedger()
+    ledger.add_client(1000)
+    ledger.add_client(1000)
+    repository = CountingTransactionRepository(ledger)
+    connections = iter(connections)
+
+    async def connect():
+        return next(connections)
+
+    return repository, CachingTransactionRepository(
+        repository,
+        60,
+        "api1",
+        connect,
+        reconnect_delay=reconnect_delay,
+        metrics=Metrics(),
+    )
+
+
+async def descriptions(cache, id=1):
+    match await cache.get_statement(id=id):
+        case Ok(statement):
+            return statement.balance, [
+                item["descricao"] for item in orjson.loads(statement.transactions)
+            ]
+        case result:
+            pytest.fail(f"unexpected {result}")
+
+
+def test_local_writes_update_the_cached_statement():
+    repository, caching = cache([ListenerConnection()])
+
+    async def run():
+        await caching.listen()
+        await caching.create(credit(1, 10, "a"))
+        first = await descriptions(caching)
+        await caching.create(credit(1, 5, "b"))
+        await caching.create_many([credit(1, 1, "c"), credit(2, 1, "d")])
+        return first, await descriptions(caching)
+
+    assert asyncio.run(run()) == ((10, ["a"]), (16, ["c", "b", "a"]))
+    assert repository.reads == 1
+
+
+def test_notifications_from_other_instances_invalidate_the_statement():
+    connection = ListenerConnection()
+    repository, caching = cache([connection])
+
+    async def run():
+        await caching.listen()
+        await descriptions(caching)
+        connection.notify("1 api1")
+        await descriptions(caching)
+        connection.notify("1 api2")
+        await descriptions(caching)
+
+    asyncio.run(run())
+    assert repository.reads == 2
+
+
+def test_a_write_during_a_read_keeps_the_statement_out_of_the_cache():
+    repository, caching = cache([ListenerConnection()])
+
+    async def run():
+        await caching.listen()
+        repository.gate.clear()
+        reading = asyncio.create_task(descriptions(caching))
+        await asyncio.sleep(0)
+        await caching.create(credit(1, 10, "a"))
+        repository.gate.set()
+        await reading
+        return await descriptions(caching)
+
+    assert asyncio.run(run()) == (10, ["a"])
+    assert repository.reads == 2
+
+
+def test_a_lost_listener_disables_the_cache_until_it_reconnects():
+    first, second = ListenerConnection(), ListenerConnection()
+    repository, caching = cache([first, second])
+
+    async def run():
+        await caching.listen()
+        await descriptions(caching)
+        first.terminate()
+        await descriptions(caching)
+        await descriptions(caching)
+        reads = repository.reads
+        await asyncio.sleep(0.01)
+        await descriptions(caching)
+        await descriptions(caching)
+        await caching.close()
+        return reads
+
+    assert asyncio.run(run()) == 3
+    assert repository.reads == 4
+    assert second.closed
+
+
+def test_missing_trigger_refuses_to_listen():
+    connection = ListenerConnection(trigger=False)
+    _, caching = cache([connection])
+
+    with pytest.raises(ChangeTriggerMissingError):
+        asyncio.run(caching.listen())
+    assert connection.closed
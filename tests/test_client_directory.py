@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from returns import Err, Ok
+
+from rinha2024.adapters.errors import ClientDoesNotExistError
+from rinha2024.app.adapters.client_directory import ClientDirectory
+from rinha2024.app.adapters.in_memory_client_repository import InMemoryClientRepository
+from rinha2024.app.adapters.in_memory_ledger import InMemoryLedger
+from rinha2024.app.adapters.in_memory_transaction_repository import (
+    InMemoryTransactionRepository,
+)
+from rinha2024.app.admission import AdmissionController
+from rinha2024.app.controllers.make_transaction_controller import make_transaction
+from rinha2024.app.metrics import Metrics
+from rinha2024.core.entities.client import Client
+
+
+class CountingClientRepository(InMemoryClientRepository):
+    def __init__(self, ledger):
+        super().__init__(ledger)
+        self.calls = list[str]()
+
+    async def get(self, id):
+        self.calls.append("get")
+        return await super().get(id)
+
+    async def exists(self, id):
+        self.calls.append("exists")
+        return await super().exists(id)
+
+
+class UnreachableTransactionRepository(InMemoryTransactionRepository):
+    async def create(self, transaction):
+        pytest.fail("an unknown client reached the transaction repository")
+
+
+def directory():
+    ledger = InMemoryLedger()
+    ledger.add_client(1000)
+    repository = CountingClientRepository(ledger)
+    directory = ClientDirectory(repository)
+    asyncio.run(directory.load())
+    return ledger, repository, directory
+
+
+def test_directory_answers_existence_and_limits_from_memory():
+    _, repository, clients = directory()
+
+    assert asyncio.run(clients.exists(1))
+    assert not asyncio.run(clients.exists(2))
+    assert (clients.limit(1), clients.limit(2)) == (1000, None)
+    assert repository.calls == []
+
+
+def test_directory_skips_the_repository_for_unknown_clients():
+    _, repository, clients = directory()
+
+    match asyncio.run(clients.get(2)):
+        case Err(error):
+            assert isinstance(error, ClientDoesNotExistError)
+        case result:
+            pytest.fail(f"unexpected {result}")
+    match asyncio.run(clients.get(1)):
+        case Ok(client):
+            assert client.props.limit == 1000
+        case result:
+            pytest.fail(f"unexpected {result}")
+    assert repository.calls == ["get"]
+
+
+def test_created_clients_join_the_directory():
+    _, _, clients = directory()
+
+    created = asyncio.run(clients.create(Client(500, 0)))
+
+    assert asyncio.run(clients.exists(created.id))
+    assert clients.limit(created.id) == 500
+
+
+def test_unknown_clients_are_refused_before_the_transaction_repository():
+    ledger, _, clients = directory()
+
+    assert asyncio.run(
+        make_transaction(
+            2,
+            b'{"valor": 1, "tipo": "c", "descricao": "pix"}',
+            clients,
+            UnreachableTransactionRepository(ledger),
+            AdmissionController("test", 0, 0, 0, Metrics()),
+        )
+    ) == (404, b"")
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+from returns import Ok
+
+from rinha2024.app.adapters.client_write_dispatcher import ClientWriteDispatcher
+from rinha2024.app.adapters.postgres_statements import Statement
+from rinha2024.app.metrics import Metrics
+from rinha2024.core.entities.transaction import Transaction, TransactionKind
+
+from .fakes import FakePool
+
+
+def credit(client_id, value):
+    return Transaction(client_id, value, TransactionKind.CREDIT, "credito")
+
+
+class Balances:
+    def __init__(self):
+        self.balances = dict[int, int]()
+        self.running = 0
+        self.concurrent = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    def __call__(self, id, amount, value, kind, description, created_at):
+        return self.apply(id, amount)
+
+    async def apply(self, id, amount):
+        self.running += 1
+        self.concurrent = max(self.concurrent, self.running)
+        await self.release.wait()
+        self.running -= 1
+        self.balances[id] = self.balances.get(id, 0) + amount
+        return {"found": True, "id": id, "limit": 1000, "balance": self.balances[id]}
+
+
+def test_writes_for_one_client_share_a_connection_in_order():
+    balances = Balances()
+    pool = FakePool({Statement.CREATE_TRANSACTION: balances})
+    dispatcher = ClientWriteDispatcher(pool, None, metrics=Metrics())
+
+    async def write():
+        balances.release.clear()
+        writes = [
+            asyncio.create_task(dispatcher.create(credit(1, value)))
+            for value in (1, 2, 3)
+        ]
+        await asyncio.sleep(0)
+        balances.release.set()
+        results = await asyncio.gather(*writes)
+        await dispatcher.close()
+        return results
+
+    results = asyncio.run(write())
+
+    assert [result.unwrap().props.balance for result in results] == [1, 3, 6]
+    assert pool.acquired == 1
+    assert pool.outstanding == 0
+    assert balances.concurrent == 1
+
+
+def test_clients_are_written_concurrently():
+    balances = Balances()
+    pool = FakePool({Statement.CREATE_TRANSACTION: balances})
+    dispatcher = ClientWriteDispatcher(pool, None, metrics=Metrics())
+
+    async def write():
+        balances.release.clear()
+        writes = [
+            asyncio.create_task(dispatcher.create(credit(id, 1))) for id in (1, 2)
+        ]
+        await asyncio.sleep(0.01)
+        balances.release.set()
+        return await asyncio.gather(*writes)
+
+    for result in asyncio.run(write()):
+        assert isinstance(result, Ok)
+    assert balances.concurrent == 2
+
+
+def test_cancelled_worker_cancels_the_writes_it_holds():
+    balances = Balances()
+    pool = FakePool({Statement.CREATE_TRANSACTION: balances})
+    dispatcher = ClientWriteDispatcher(pool, None, metrics=Metrics())
+
+    async def write():
+        balances.release.clear()
+        tasks = asyncio.all_tasks()
+        writes = [
+            asyncio.create_task(dispatcher.create(credit(1, value))) for value in (1, 2)
+        ]
+        await asyncio.sleep(0.01)
+        (worker,) = asyncio.all_tasks() - tasks - set(writes)
+        worker.cancel()
+        return await asyncio.wait_for(
+            asyncio.gather(*writes, return_exceptions=True), 1
+        )
+
+    results = asyncio.run(write())
+
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert pool.outstanding == 0
+
+
+def test_failed_connection_fails_every_queued_write():
+    class Unavailable(FakePool):
+        def acquire(self):
+            raise OSError("database is down")
+
+    dispatcher = ClientWriteDispatcher(Unavailable({}), None, metrics=Metrics())
+
+    async def write():
+        return await asyncio.gather(
+            dispatcher.create(credit(1, 1)),
+            dispatcher.create(credit(1, 2)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(write())
+
+    assert all(isinstance(result, OSError) for result in results)
+    with pytest.raises(OSError):
+        asyncio.run(dispatcher.create(credit(1, 3)))
@@ -0,0 +1,117 @@
+import asyncio
+
+import orjson
+import pytest
+
+from rinha2024.app.adapters.in_memory_client_repository import InMemoryClientRepository
+from rinha2024.app.adapters.in_memory_ledger import InMemoryLedger
+from rinha2024.app.adapters.in_memory_transaction_repository import (
+    InMemoryTransactionRepository,
+)
+from rinha2024.app.admission import AdmissionController
+from rinha2024.app.fast_app import FastApp
+from rinha2024.app.metrics import Metrics
+
+
+class Fallback:
+    def __init__(self):
+        self.paths = list[str]()
+
+    async def __call__(self, scope, receive, send):
+        self.paths.append(scope["path"])
+        await send({"type": "http.response.start", "status": 418, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+
+def call(path, method="GET", chunks=(b"",), write_admission=None):
+    ledger = InMemoryLedger()
+    ledger.add_client(1000)
+    fallback = Fallback()
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "state": {
+            "client_repository": InMemoryClientRepository(ledger),
+            "transaction_repository": InMemoryTransactionRepository(ledger),
+            "write_admission": write_admission
+            or AdmissionController("test", 0, 0, 0, Metrics()),
+            "statement_admission": AdmissionController("test", 0, 0, 0, Metrics()),
+        },
+    }
+    messages = iter(
+        {"type": "http.request", "body": chunk, "more_body": index < len(chunks) - 1}
+        for index, chunk in enumerate(chunks)
+    )
+    sent = list()
+
+    async def receive():
+        return next(messages)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(FastApp(fallback)(scope, receive, send))
+    start, body = sent
+    return start["status"], dict(start["headers"]), body["body"], fallback.paths
+
+
+def test_transaction_is_served_without_the_wrapped_app():
+    payload = orjson.dumps({"valor": 10, "tipo": "c", "descricao": "pix"})
+
+    status, headers, body, paths = call(
+        "/clientes/1/transacoes", "POST", (payload[:5], payload[5:])
+    )
+
+    assert status == 200
+    assert headers[b"content-type"] == b"application/json"
+    assert headers[b"content-length"] == str(len(body)).encode()
+    assert orjson.loads(body) == {"limite": 1000, "saldo": 10}
+    assert paths == []
+
+
+def test_statement_is_served_without_the_wrapped_app():
+    status, _, body, paths = call("/clientes/1/extrato")
+
+    assert status == 200
+    assert orjson.loads(body)["saldo"]["total"] == 0
+    assert paths == []
+
+
+def test_empty_responses_carry_a_zero_length():
+    status, headers, body, _ = call("/clientes/9/extrato")
+
+    assert (status, headers, body) == (404, {b"content-length": b"0"}, b"")
+
+
+def test_shed_writes_carry_retry_after():
+    admission = AdmissionController("test", 1, 0, 0, Metrics())
+    assert asyncio.run(admission.acquire())
+
+    status, headers, _, _ = call(
+        "/clientes/1/transacoes",
+        "POST",
+        (orjson.dumps({"valor": 1, "tipo": "c", "descricao": "pix"}),),
+        admission,
+    )
+
+    assert status == 503
+    assert b"retry-after" in headers
+
+
+@pytest.mark.parametrize(
+    "method, path",
+    [
+        ("GET", "/clientes/1/transacoes"),
+        ("POST", "/clientes/1/extrato"),
+        ("GET", "/clientes/um/extrato"),
+        ("GET", "/clientes/١/extrato"),
+        ("GET", "/clientes/1/historico"),
+        ("GET", "/metrics"),
+    ],
+)
+def test_other_requests_fall_through_to_the_wrapped_app(method, path):
+    status, _, _, paths = call(path, method)
+
+    assert status == 418
+    assert paths == [path]
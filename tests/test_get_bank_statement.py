@@ -0,0 +1,57 @@
+import asyncio
+
+import orjson
+
+from rinha2024.app.adapters.in_memory_client_repository import InMemoryClientRepository
+from rinha2024.app.adapters.in_memory_ledger import InMemoryLedger
+from rinha2024.app.adapters.in_memory_transaction_repository import (
+    InMemoryTransactionRepository,
+)
+from rinha2024.app.admission import AdmissionController
+from rinha2024.app.controllers.get_bank_statement_controller import get_bank_statement
+from rinha2024.app.metrics import Metrics
+from rinha2024.core.entities.transaction import Transaction, TransactionKind
+
+
+def statement(id, *transactions):
+    ledger = InMemoryLedger()
+    ledger.add_client(1000)
+    for transaction in transactions:
+        ledger.append(transaction)
+    return asyncio.run(
+        get_bank_statement(
+            id,
+            InMemoryClientRepository(ledger),
+            InMemoryTransactionRepository(ledger),
+            AdmissionController("test", 0, 0, 0, Metrics()),
+        )
+    )
+
+
+def test_statement_splices_the_rendered_transactions():
+    status, content = statement(
+        1,
+        Transaction(1, 300, TransactionKind.DEBIT, "aluguel"),
+        Transaction(1, 100, TransactionKind.CREDIT, "pix"),
+    )
+
+    assert status == 200
+    payload = orjson.loads(content)
+    assert payload["saldo"]["total"] == -200
+    assert payload["saldo"]["limite"] == 1000
+    assert "data_extrato" in payload["saldo"]
+    assert [
+        (entry["valor"], entry["tipo"], entry["descricao"])
+        for entry in payload["ultimas_transacoes"]
+    ] == [(100, "c", "pix"), (300, "d", "aluguel")]
+
+
+def test_statement_of_a_client_without_transactions():
+    status, content = statement(1)
+
+    assert status == 200
+    assert orjson.loads(content)["ultimas_transacoes"] == []
+
+
+def test_statement_of_an_unknown_client_is_not_found():
+    assert statement(2) == (404, b"")
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from rinha2024.app.adapters.in_memory_client_repository import InMemoryClientRepository
+from rinha2024.app.adapters.in_memory_ledger import InMemoryLedger
+from rinha2024.app.adapters.in_memory_transaction_repository import (
+    InMemoryTransactionRepository,
+)
+from rinha2024.app.adapters.mapped_client_repository import MappedClientRepository
+from rinha2024.app.adapters.mapped_ledger import MappedLedger
+from rinha2024.app.adapters.mapped_transaction_repository import (
+    MappedTransactionRepository,
+)
+from rinha2024.app.controllers.get_history_controller import get_history_controller
+from rinha2024.core.entities.transaction import Transaction, TransactionKind
+
+
+def get_history(id, client_repository, transaction_repository):
+    request = Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path_params": {"id": id},
+            "query_string": b"",
+            "headers": [],
+            "state": {
+                "client_repository": client_repository,
+                "transaction_repository": transaction_repository,
+            },
+        }
+    )
+    return asyncio.run(get_history_controller(request)).status_code
+
+
+@pytest.fixture(params=["memory", "mmap"])
+def repositories(request, tmp_path):
+    if request.param == "memory":
+        ledger = InMemoryLedger()
+        ledger.add_client(1000)
+        ledger.append(Transaction(1, 100, TransactionKind.CREDIT, "pix"))
+        yield InMemoryClientRepository(ledger), InMemoryTransactionRepository(ledger)
+        return
+    ledger = MappedLedger(str(tmp_path / "ledger"), 4, (1000,))
+    ledger.append(Transaction(1, 100, TransactionKind.CREDIT, "pix"))
+    yield MappedClientRepository(ledger), MappedTransactionRepository(ledger)
+    ledger.close()
+
+
+def test_ledger_backends_do_not_truncate_the_history(repositories):
+    assert get_history(1, *repositories) == 501
+
+
+def test_history_of_an_unknown_client_is_not_found(repositories):
+    assert get_history(2, *repositories) == 404
@@ -0,0 +1,67 @@
+from base64 import urlsafe_b64encode
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import orjson
+import pytest
+
+from rinha2024.adapters.transaction_repository import HistoryCursor
+from rinha2024.app.controllers.get_history_controller import (
+    decode_cursor,
+    encode_cursor,
+    render_history_line,
+)
+from rinha2024.core.entities.entity import Entity
+from rinha2024.core.entities.transaction import Transaction, TransactionKind
+
+
+def test_cursor_round_trip():
+    cursor = HistoryCursor(
+        datetime(2024, 2, 1, 12, 30, 1, 123456, tzinfo=timezone(timedelta(hours=-3))),
+        42,
+    )
+
+    token = encode_cursor(cursor)
+
+    assert "=" not in token
+    assert decode_cursor(token) == cursor
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "",
+        "not a cursor",
+        uuid4().hex,
+        encode_cursor(HistoryCursor(datetime(2024, 2, 1), 1)),
+        orjson.dumps(["2024-02-01T00:00:00+00:00"]).decode(),
+    ],
+)
+def test_invalid_cursors_are_refused(token):
+    assert decode_cursor(token) is None
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        ["2024-02-01T00:00:00+00:00", "1"],
+        ["2024-02-01", 1],
+        {"realizada_em": "2024-02-01T00:00:00+00:00", "id": 1},
+    ],
+)
+def test_cursors_with_wrong_fields_are_refused(payload):
+    assert decode_cursor(urlsafe_b64encode(orjson.dumps(payload)).decode()) is None
+
+
+def test_history_line_carries_its_own_cursor():
+    created_at = datetime(2024, 2, 1, tzinfo=timezone.utc)
+    line = render_history_line(
+        Entity(Transaction(1, 10, TransactionKind.DEBIT, "pix", created_at), 7)
+    )
+
+    assert line.endswith(b"\n")
+    payload = orjson.loads(line)
+    assert decode_cursor(payload["cursor"]) == HistoryCursor(created_at, 7)
+    assert payload["valor"] == 10
+    assert payload["tipo"] == "d"
+    assert payload["descricao"] == "pix"
@@ -0,0 +1,165 @@
+from datetime import datetime, timedelta, timezone
+
+import orjson
+import pytest
+from returns import Err, Ok
+
+from rinha2024.adapters.errors import ClientDoesNotExistError, NoLimitError
+from rinha2024.app.adapters.in_memory_ledger import InMemoryLedger
+from rinha2024.app.adapters.mapped_ledger import LedgerLayoutError, MappedLedger
+from rinha2024.core.entities.transaction import Transaction, TransactionKind
+from rinha2024.core.entities.transaction_ring import TransactionRing
+
+STARTED = datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+
+def credit(client_id, value, seconds=0, description="credito"):
+    return Transaction(
+        client_id,
+        value,
+        TransactionKind.CREDIT,
+        description,
+        STARTED + timedelta(seconds=seconds),
+    )
+
+
+def debit(client_id, value, seconds=0, description="debito"):
+    return Transaction(
+        client_id,
+        value,
+        TransactionKind.DEBIT,
+        description,
+        STARTED + timedelta(seconds=seconds),
+    )
+
+
+@pytest.fixture(params=["memory", "mmap"])
+def ledger(request, tmp_path):
+    if request.param == "memory":
+        ledger = InMemoryLedger(history_size=3)
+        ledger.add_client(1000)
+        yield ledger
+        return
+    ledger = MappedLedger(str(tmp_path / "ledger"), 4, (1000,), history_size=3)
+    yield ledger
+    ledger.close()
+
+
+def test_transaction_ring_keeps_the_newest_entries():
+    ring = TransactionRing(1, 3)
+    for index in range(5):
+        ring.append(index + 1, credit(1, index + 1, index))
+
+    assert len(ring) == 3
+    assert [entity.id for entity in ring.oldest()] == [3, 4, 5]
+    assert [entity.id for entity in ring.newest(STARTED + timedelta(seconds=3))] == [
+        4,
+        3,
+    ]
+    assert ring.latest_created_at() == STARTED + timedelta(seconds=4)
+
+
+def test_empty_transaction_ring():
+    ring = TransactionRing(1, 0)
+    ring.append(1, credit(1, 1))
+
+    assert len(ring) == 0
+    assert ring.latest_created_at() is None
+
+
+def test_ledger_applies_credits_and_debits(ledger):
+    match ledger.append(credit(1, 500)):
+        case Ok(client):
+            assert client.props.balance == 500
+        case result:
+            pytest.fail(f"unexpected {result}")
+    match ledger.append(debit(1, 1200, 1)):
+        case Ok(client):
+            assert client.props.balance == -700
+            assert client.props.limit == 1000
+        case result:
+            pytest.fail(f"unexpected {result}")
+
+
+def test_ledger_refuses_debits_over_the_limit(ledger):
+    match ledger.append(debit(1, 1001)):
+        case Err(error):
+            assert isinstance(error, NoLimitError)
+        case result:
+            pytest.fail(f"unexpected {result}")
+    match ledger.append(debit(1, 1000)):
+        case Ok(client):
+            assert client.props.balance == -1000
+        case result:
+            pytest.fail(f"unexpected {result}")
+
+
+def test_ledger_refuses_unknown_clients(ledger):
+    match ledger.append(credit(2, 1)):
+        case Err(error):
+            assert isinstance(error, ClientDoesNotExistError)
+        case result:
+            pytest.fail(f"unexpected {result}")
+    match ledger.statement(2, STARTED, 10):
+        case Err(error):
+            assert isinstance(error, ClientDoesNotExistError)
+        case result:
+            pytest.fail(f"unexpected {result}")
+
+
+def test_ledger_statement_lists_the_newest_transactions(ledger):
+    for index in range(5):
+        ledger.append(credit(1, index + 1, index, f"t{index}"))
+
+    match ledger.statement(1, STARTED + timedelta(days=1), 10):
+        case Ok(statement):
+            assert statement.balance == 15
+            assert [
+                item["descricao"] for item in orjson.loads(statement.transactions)
+            ] == ["t4", "t3", "t2"]
+        case result:
+            pytest.fail(f"unexpected {result}")
+    match ledger.statement(1, STARTED + timedelta(seconds=3), 1):
+        case Ok(statement):
+            assert [
+                item["descricao"] for item in orjson.loads(statement.transactions)
+            ] == ["t3"]
+        case result:
+            pytest.fail(f"unexpected {result}")
+
+
+def test_in_memory_ledger_uses_the_given_transaction_ids():
+    ledger = InMemoryLedger()
+    ledger.add_client(1000)
+    ledger.append(credit(1, 1), 41)
+    ledger.append(credit(1, 1, 1))
+
+    match ledger.latest(1, STARTED + timedelta(days=1), 10):
+        case Ok(transactions):
+            assert [transaction.id for transaction in transactions] == [42, 41]
+        case result:
+            pytest.fail(f"unexpected {result}")
+
+
+def test_mapped_ledger_is_shared_through_the_file(tmp_path):
+    path = str(tmp_path / "ledger")
+    writer = MappedLedger(path, 4, (1000,), history_size=3)
+    reader = MappedLedger(path, 4, history_size=3)
+    try:
+        writer.append(credit(1, 250))
+        created = writer.add_client(500, 10)
+
+        assert reader.get(1).props.balance == 250
+        assert reader.get(created.id).props.limit == 500
+        assert [client.id for client in reader.clients()] == [1, created.id]
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_mapped_ledger_refuses_a_different_layout(tmp_path):
+    path = str(tmp_path / "ledger")
+    MappedLedger(path, 4, (1000,), history_size=3).close()
+
+    with pytest.raises(LedgerLayoutError):
+        MappedLedger(path, 8, history_size=3)
@@ -0,0 +1,104 @@
+import asyncio
+
+import orjson
+import pytest
+
+from rinha2024.app.adapters.in_memory_client_repository import InMemoryClientRepository
+from rinha2024.app.adapters.in_memory_ledger import InMemoryLedger
+from rinha2024.app.adapters.in_memory_transaction_repository import (
+    InMemoryTransactionRepository,
+)
+from rinha2024.app.admission import AdmissionController
+from rinha2024.app.controllers.make_transactions_controller import (
+    MAX_BATCH_SIZE,
+    make_transactions,
+)
+from rinha2024.app.metrics import Metrics
+
+
+class RecordingTransactionRepository(InMemoryTransactionRepository):
+    def __init__(self, ledger):
+        super().__init__(ledger)
+        self.batches = list()
+
+    async def create_many(self, transactions):
+        self.batches.append(transactions)
+        return await super().create_many(transactions)
+
+
+def post(id, payload, limit=1000):
+    ledger = InMemoryLedger()
+    ledger.add_client(limit)
+    transactions = RecordingTransactionRepository(ledger)
+    status, content = asyncio.run(
+        make_transactions(
+            id,
+            payload if isinstance(payload, bytes) else orjson.dumps(payload),
+            InMemoryClientRepository(ledger),
+            transactions,
+            AdmissionController("test", 0, 0, 0, Metrics()),
+        )
+    )
+    return status, orjson.loads(content) if content else None, transactions.batches
+
+
+def test_batch_reports_each_transaction():
+    status, content, batches = post(
+        1,
+        [
+            {"valor": 500, "tipo": "c", "descricao": "deposito"},
+            {"valor": 2000, "tipo": "d", "descricao": "aluguel"},
+            {"valor": 1.5, "tipo": "d", "descricao": "quebrado"},
+            {"valor": 1200, "tipo": "d", "descricao": "mercado"},
+        ],
+    )
+
+    assert status == 200
+    assert content == {
+        "limite": 1000,
+        "saldo": -700,
+        "resultados": ["aplicada", "sem_limite", "invalida", "aplicada"],
+    }
+    assert len(batches) == 1
+    assert len(batches[0]) == 3
+
+
+def test_batch_of_invalid_transactions_skips_the_repository():
+    status, content, batches = post(
+        1,
+        [
+            {"valor": 0, "tipo": "c", "descricao": "zero"},
+            {"valor": 1, "tipo": "x", "descricao": "tipo"},
+        ],
+    )
+
+    assert status == 200
+    assert content == {
+        "limite": 1000,
+        "saldo": 0,
+        "resultados": ["invalida", "invalida"],
+    }
+    assert batches == []
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        b"not json",
+        {"valor": 1, "tipo": "c", "descricao": "objeto"},
+        [],
+        [{"valor": 1, "tipo": "c", "descricao": "grande"}] * (MAX_BATCH_SIZE + 1),
+    ],
+)
+def test_malformed_batches_are_unprocessable(payload):
+    status, _, batches = post(1, payload)
+
+    assert status == 422
+    assert batches == []
+
+
+def test_unknown_client_is_not_found():
+    status, _, batches = post(2, [{"valor": 1, "tipo": "c", "descricao": "pix"}])
+
+    assert status == 404
+    assert batches == []
@@ -0,0 +1,52 @@
+from rinha2024.app.metrics import Metrics
+
+
+def test_histograms_render_cumulative_buckets_per_label_set():
+    metrics = Metrics()
+    read = metrics.histogram("rinha_seconds", "Time.", (0.1, 1.0), endpoint="extrato")
+    write = metrics.histogram("rinha_seconds", "Time.", (0.1, 1.0), endpoint="lote")
+    read.observe(0.05)
+    read.observe(0.5)
+    read.observe(2.0)
+    with write.time():
+        pass
+
+    lines = metrics.render().decode().splitlines()
+
+    assert lines[:7] == [
+        "# HELP rinha_seconds Time.",
+        "# TYPE rinha_seconds histogram",
+        'rinha_seconds_bucket{endpoint="extrato",le="0.1"} 1',
+        'rinha_seconds_bucket{endpoint="extrato",le="1.0"} 2',
+        'rinha_seconds_bucket{endpoint="extrato",le="+Inf"} 3',
+        'rinha_seconds_sum{endpoint="extrato"} 2.55',
+        'rinha_seconds_count{endpoint="extrato"} 3',
+    ]
+    assert 'rinha_seconds_bucket{endpoint="lote",le="0.1"} 1' in lines
+    assert 'rinha_seconds_count{endpoint="lote"} 1' in lines
+
+
+def test_the_same_labels_share_one_histogram():
+    metrics = Metrics()
+
+    first = metrics.histogram("rinha_seconds", "Time.", pool="read")
+    second = metrics.histogram("rinha_seconds", "Time.", pool="read")
+
+    assert first is second
+
+
+def test_gauges_and_counters_are_read_at_render_time():
+    metrics = Metrics()
+    state = {"size": 1, "hits": 0}
+    metrics.gauge("rinha_size", "Size.", lambda: state["size"])
+    metrics.counter("rinha_hits_total", "Hits.", lambda: state["hits"], budget="x")
+    state.update(size=3, hits=7)
+
+    assert metrics.render().decode() == (
+        "# HELP rinha_size Size.\n"
+        "# TYPE rinha_size gauge\n"
+        "rinha_size 3\n"
+        "# HELP rinha_hits_total Hits.\n"
+        "# TYPE rinha_hits_total counter\n"
+        'rinha_hits_total{budget="x"} 7\n'
+    )
@@ -0,0 +1,195 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+
+import asyncpg
+import orjson
+import pytest
+
+from rinha2024.app.adapters.postgres_statements import (
+    TABLE_STATEMENTS,
+    Statement,
+    StatementConnection,
+    prepare_statements,
+)
+
+pytestmark = pytest.mark.skipif(
+    "POSTGRES_HOST" not in os.environ, reason="POSTGRES_HOST is not set"
+)
+
+PREPARED = """SELECT statement FROM pg_prepared_statements\n"""
+HAS_RING = (
+    """SELECT EXISTS(\n"""
+    """    SELECT 1 FROM information_schema.columns\n"""
+    """    WHERE table_name = 'client' AND column_name = 'recent_transactions'\n"""
+    """)\n"""
+)
+INSERT_TRANSACTION = (
+    """INSERT INTO Transaction (client_id, value, kind, description, created_at)\n"""
+    """VALUES (1, $1, 'c', $2, $3)\n"""
+)
+
+
+def with_pool(test, min_size=2):
+    async def run():
+        async with asyncpg.create_pool(
+            min_size=min_size,
+            max_size=min_size,
+            max_cached_statement_lifetime=0,
+            host=os.environ["POSTGRES_HOST"],
+            port=os.environ.get("POSTGRES_PORT"),
+            database=os.environ.get("POSTGRES_DB"),
+            user=os.environ.get("POSTGRES_USER"),
+            password=os.environ.get("POSTGRES_PASSWORD"),
+            connection_class=StatementConnection,
+            init=prepare_statements,
+        ) as pool:
+            return await test(pool)
+
+    return asyncio.run(run())
+
+
+def test_every_pooled_connection_prepares_the_statements_at_init():
+    async def test(pool):
+        connections = [await pool.acquire() for _ in range(2)]
+        try:
+            return [
+                {record["statement"] for record in await connection.fetch(PREPARED)}
+                for connection in connections
+            ]
+        finally:
+            for connection in connections:
+                await pool.release(connection)
+
+    for prepared in with_pool(test):
+        assert {statement.value for statement in TABLE_STATEMENTS} <= prepared
+
+
+def test_hot_path_reuses_the_prepared_statements():
+    async def test(pool):
+        async with pool.acquire() as connection:
+            before = len(await connection.fetch(PREPARED))
+        async with pool.acquire() as connection:
+            await connection.statement(Statement.CLIENT_EXISTS).fetchval(1)
+            await connection.statement(Statement.GET_CLIENT).fetchrow(1)
+            return before, len(await connection.fetch(PREPARED))
+
+    before, after = with_pool(test, min_size=1)
+
+    assert before == after
+
+
+def test_statements_outside_the_registry_are_refused():
+    async def test(pool):
+        async with pool.acquire() as connection:
+            connection.statement(Statement.GET_RING_STATEMENT)
+
+    with pytest.raises(KeyError):
+        with_pool(test, min_size=1)
+
+
+def test_transactions_at_the_same_instant_come_newest_id_first():
+    created_at = datetime.now(timezone.utc) + timedelta(days=1)
+
+    async def test(pool):
+        async with pool.acquire() as connection:
+            transaction = connection.transaction()
+            await transaction.start()
+            try:
+                for value in (1, 2, 3):
+                    await connection.execute(
+                        INSERT_TRANSACTION, value, f"empate {value}", created_at
+                    )
+                statement = await connection.statement(
+                    Statement.GET_STATEMENT
+                ).fetchrow(1, created_at, 3)
+                transactions = await connection.statement(
+                    Statement.GET_TRANSACTIONS
+                ).fetch(1, created_at, 3)
+            finally:
+                await transaction.rollback()
+        return statement, transactions
+
+    statement, transactions = with_pool(test, min_size=1)
+
+    assert [entry["valor"] for entry in orjson.loads(statement["transactions"])] == [
+        3,
+        2,
+        1,
+    ]
+    assert [record["value"] for record in transactions] == [3, 2, 1]
+
+
+def test_the_ring_reports_when_an_older_statement_needs_the_table():
+    created_at = datetime.now(timezone.utc) + timedelta(days=1)
+
+    async def test(pool):
+        async with pool.acquire() as connection:
+            if not await connection.fetchval(HAS_RING):
+                pytest.skip("migrations/0001_client_recent_transactions.sql is missing")
+            transaction = connection.transaction()
+            await transaction.start()
+            try:
+                for seconds in range(4):
+                    await connection.execute(
+                        INSERT_TRANSACTION,
+                        seconds + 1,
+                        "anel",
+                        created_at + timedelta(seconds=seconds),
+                    )
+                await connection.execute(Statement.REBUILD_RECENT_TRANSACTIONS.value, 3)
+                ring = Statement.GET_RING_STATEMENT.value
+                return [
+                    await connection.fetchrow(
+                        ring, 1, created_at + timedelta(seconds=offset), 2, 3
+                    )
+                    for offset in (3, 1, 0)
+                ]
+            finally:
+                await transaction.rollback()
+
+    latest, oldest, older = with_pool(test, min_size=1)
+
+    assert latest["complete"]
+    assert [entry["valor"] for entry in orjson.loads(latest["transactions"])] == [
+        4,
+        3,
+    ]
+    assert oldest["complete"] is False
+    assert older["complete"] is False
+
+
+def test_create_transaction_applies_or_refuses_in_one_statement():
+    created_at = datetime.now(timezone.utc)
+
+    async def test(pool):
+        async with pool.acquire() as connection:
+            transaction = connection.transaction()
+            await transaction.start()
+            try:
+                limit, balance = await connection.fetchrow(
+                    """SELECT limit_value, balance FROM Client WHERE id = 1\n"""
+                )
+                create = connection.statement(Statement.CREATE_TRANSACTION)
+                arguments = ("c", "um", created_at)
+                applied = await create.fetchrow(1, 5, 5, *arguments)
+                refused = await create.fetchrow(
+                    1, -(limit + balance + 6), limit + balance + 6, *arguments
+                )
+                missing = await create.fetchrow(0, 5, 5, *arguments)
+                rows = await connection.fetchval(
+                    """SELECT count(*) FROM Transaction\n"""
+                    """WHERE client_id = 1 AND created_at = $1\n""",
+                    created_at,
+                )
+                return balance, applied, refused, missing, rows
+            finally:
+                await transaction.rollback()
+
+    balance, applied, refused, missing, rows = with_pool(test, min_size=1)
+
+    assert applied["found"] and applied["id"] == 1
+    assert applied["balance"] == balance + 5
+    assert refused["found"] and refused["id"] is None
+    assert not missing["found"]
+    assert rows == 1
@@ -0,0 +1,196 @@
+import asyncio
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from returns import Err, Ok
+
+from rinha2024.adapters.errors import ClientDoesNotExistError, NoLimitError
+from rinha2024.app.adapters.postgres_statements import Statement
+from rinha2024.app.adapters.postgres_transaction_repository import (
+    HISTORY_PAGE_SIZE,
+    PostgresTransactionRepository,
+)
+from rinha2024.app.controllers.get_history_controller import stream_history
+from rinha2024.core.entities.transaction import Transaction, TransactionKind
+
+from .fakes import FakePool, rows
+
+STARTED = datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+
+def history(client_id, created_at, id, amount):
+    first = id + 1 if created_at > STARTED else 1
+    return [
+        {
+            "id": index,
+            "client_id": client_id,
+            "kind": "c",
+            "description": "descricao",
+            "value": index,
+            "created_at": STARTED + timedelta(seconds=index),
+        }
+        for index in range(first, first + amount)
+    ]
+
+
+def test_history_is_read_in_pages():
+    pool = FakePool(
+        {
+            Statement.CLIENT_EXISTS: lambda id: True,
+            Statement.GET_HISTORY: lambda id, created_at, after, amount: history(
+                id, created_at, after, min(amount, 2 * HISTORY_PAGE_SIZE + 1 - after)
+            ),
+        }
+    )
+    repository = PostgresTransactionRepository(pool)
+
+    async def read():
+        async with repository.get_history(id=1) as result:
+            match result:
+                case Ok(transactions):
+                    return [transaction.id async for transaction in transactions]
+
+    assert asyncio.run(read()) == list(range(1, 2 * HISTORY_PAGE_SIZE + 2))
+    assert [call[0] for call in pool.calls].count(Statement.GET_HISTORY) == 3
+    assert pool.outstanding == 0
+
+
+def test_aborted_history_stream_releases_its_connection():
+    pool = FakePool(
+        {
+            Statement.CLIENT_EXISTS: lambda id: True,
+            Statement.GET_HISTORY: history,
+        }
+    )
+    repository = PostgresTransactionRepository(pool)
+
+    async def abort():
+        history = AsyncExitStack()
+        match await history.enter_async_context(repository.get_history(id=1)):
+            case Ok(transactions):
+                stream = stream_history(history, transactions)
+            case result:
+                pytest.fail(f"unexpected {result}")
+        chunk = await anext(stream)
+        await stream.aclose()
+        return chunk
+
+    assert asyncio.run(abort())
+    assert [call[0] for call in pool.calls].count(Statement.GET_HISTORY) == 1
+    assert pool.outstanding == 0
+
+
+def test_history_of_missing_client():
+    pool = FakePool({Statement.CLIENT_EXISTS: lambda id: False})
+    repository = PostgresTransactionRepository(pool)
+
+    async def read():
+        async with repository.get_history(id=1) as result:
+            return result
+
+    match asyncio.run(read()):
+        case Err(error):
+            assert isinstance(error, ClientDoesNotExistError)
+        case result:
+            pytest.fail(f"unexpected {result}")
+    assert pool.outstanding == 0
+
+
+def test_failed_read_rolls_back_and_releases_its_connection():
+    pool = FakePool(
+        {
+            Statement.CLIENT_EXISTS: lambda id: True,
+            Statement.GET_TRANSACTIONS: lambda *args: rows(),
+        }
+    )
+    repository = PostgresTransactionRepository(pool)
+
+    async def fail():
+        async with repository.get_by_client_id(id=1):
+            raise RuntimeError("client went away")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(fail())
+    assert pool.outstanding == 0
+    assert pool.connections[0].transactions[0].state == "rolled back"
+
+
+def statement(complete=None):
+    record = {"limit": 1000, "balance": -5, "transactions": "[]"}
+    if complete is not None:
+        record["complete"] = complete
+    return lambda *arguments: record
+
+
+@pytest.mark.parametrize(
+    "amount, complete, statements",
+    [
+        (10, True, [Statement.GET_RING_STATEMENT]),
+        (10, False, [Statement.GET_RING_STATEMENT, Statement.GET_STATEMENT]),
+        (11, True, [Statement.GET_STATEMENT]),
+    ],
+)
+def test_statement_reads_the_ring_only_when_it_holds_the_answer(
+    amount, complete, statements
+):
+    pool = FakePool(
+        {
+            Statement.GET_RING_STATEMENT: statement(complete),
+            Statement.GET_STATEMENT: statement(),
+        }
+    )
+    repository = PostgresTransactionRepository(pool, ring_size=10)
+
+    result = asyncio.run(
+        repository.get_statement(id=1, starting_from=STARTED, amount=amount)
+    )
+
+    assert result.unwrap().balance == -5
+    assert [called for called, _ in pool.calls] == statements
+    assert pool.calls[0][1] == (
+        (1, STARTED, amount, 10) if amount <= 10 else (1, STARTED, amount)
+    )
+    assert pool.acquired == 1
+
+
+def test_statement_of_an_unknown_client_skips_the_table():
+    pool = FakePool({Statement.GET_RING_STATEMENT: lambda *arguments: None})
+    repository = PostgresTransactionRepository(pool, ring_size=10)
+
+    match asyncio.run(repository.get_statement(id=7)):
+        case Err(ClientDoesNotExistError()):
+            pass
+        case result:
+            pytest.fail(f"unexpected result {result}")
+    assert len(pool.calls) == 1
+
+
+@pytest.mark.parametrize(
+    "record, expected",
+    [
+        ({"found": True, "id": 1, "limit": 1000, "balance": -5}, Ok),
+        ({"found": True, "id": None, "limit": None, "balance": None}, NoLimitError),
+        (
+            {"found": False, "id": None, "limit": None, "balance": None},
+            ClientDoesNotExistError,
+        ),
+    ],
+)
+def test_create_is_one_statement_on_one_connection(record, expected):
+    pool = FakePool({Statement.CREATE_TRANSACTION: lambda *args: record})
+    repository = PostgresTransactionRepository(pool)
+
+    result = asyncio.run(
+        repository.create(Transaction(1, 5, TransactionKind.DEBIT, "debito"))
+    )
+
+    assert [call[0] for call in pool.calls] == [Statement.CREATE_TRANSACTION]
+    assert pool.calls[0][1][:4] == (1, -5, 5, TransactionKind.DEBIT)
+    assert pool.acquired == 1 and pool.outstanding == 0
+    match result:
+        case Ok(client):
+            assert expected is Ok
+            assert (client.id, client.props.balance) == (1, -5)
+        case Err(error):
+            assert isinstance(error, expected)
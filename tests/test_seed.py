@@ -0,0 +1,102 @@
+import io
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from rinha2024.adapters.ledger import seed_ledger
+from rinha2024.app.adapters.in_memory_ledger import InMemoryLedger
+from rinha2024.core.entities.transaction import Transaction, TransactionKind
+from rinha2024.core.transaction_generator import generate_transactions
+from rinha2024.tools.seed import check_transactions, read_transactions
+
+CREATED_AT = datetime(2024, 2, 1, tzinfo=timezone.utc)
+
+
+def credit(id, value):
+    return Transaction(id, value, TransactionKind.CREDIT, "credito", CREATED_AT)
+
+
+def debit(id, value):
+    return Transaction(id, value, TransactionKind.DEBIT, "debito", CREATED_AT)
+
+
+def test_checker_keeps_the_balances():
+    balances = {1: 0, 2: 50}
+    transactions = [credit(1, 100), debit(1, 1100), debit(2, 150)]
+
+    checked = list(check_transactions(transactions, {1: 1000, 2: 100}, balances))
+
+    assert checked == transactions
+    assert balances == {1: -1000, 2: -100}
+
+
+def test_checker_refuses_unknown_clients():
+    with pytest.raises(ValueError, match="transaction 2: client 3 does not exist"):
+        list(check_transactions([credit(1, 1), credit(3, 1)], {1: 0}, {1: 0}))
+
+
+def test_checker_refuses_transactions_over_the_limit():
+    with pytest.raises(ValueError, match="transaction 2: client 1 has no limit left"):
+        list(check_transactions([debit(1, 600), debit(1, 500)], {1: 1000}, {1: 0}))
+
+
+def test_reader_parses_ndjson():
+    stream = io.BytesIO(
+        b'{"cliente": 1, "valor": 10, "tipo": "c", "descricao": "pix", '
+        b'"realizada_em": "2024-02-01T00:00:00+00:00"}\n'
+        b"\n"
+        b'{"cliente": "2", "valor": 5, "tipo": "d", "descricao": "luz", '
+        b'"realizada_em": "2024-02-01T00:00:00+00:00"}\n'
+    )
+
+    assert list(read_transactions(stream)) == [
+        Transaction(1, 10, TransactionKind.CREDIT, "pix", CREATED_AT),
+        Transaction(2, 5, TransactionKind.DEBIT, "luz", CREATED_AT),
+    ]
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        b"not json",
+        b'{"cliente": 1, "valor": 10, "tipo": "c", "descricao": "pix"}',
+        b'{"cliente": 1, "valor": 10, "tipo": "x", "descricao": "pix", '
+        b'"realizada_em": "2024-02-01T00:00:00+00:00"}',
+        b'{"cliente": 1, "valor": 0, "tipo": "c", "descricao": "pix", '
+        b'"realizada_em": "2024-02-01T00:00:00+00:00"}',
+        b'{"cliente": 1, "valor": 10, "tipo": "c", "descricao": "descricao longa", '
+        b'"realizada_em": "2024-02-01T00:00:00+00:00"}',
+    ],
+)
+def test_reader_refuses_invalid_lines(line):
+    with pytest.raises(ValueError, match="line 1"):
+        list(read_transactions(io.BytesIO(line)))
+
+
+def test_generated_transactions_respect_the_limits():
+    ledger = InMemoryLedger()
+    clients = [ledger.add_client(limit) for limit in (1000, 80000, 500000)]
+    limits = {client.id: client.props.limit for client in clients}
+    balances = {client.id: client.props.balance for client in clients}
+
+    transactions = list(
+        generate_transactions(
+            clients, 5000, random.Random(2024), CREATED_AT, timedelta(days=1)
+        )
+    )
+
+    assert len(transactions) == 5000
+    assert transactions == sorted(transactions, key=lambda t: t.created_at)
+    assert list(check_transactions(transactions, limits, balances)) == transactions
+    seed_ledger(ledger, transactions)
+    for id, balance in balances.items():
+        assert ledger.get(id).to_entity(id).props.balance == balance
+
+
+def test_seeding_a_ledger_fails_on_the_first_refused_transaction():
+    ledger = InMemoryLedger()
+    ledger.add_client(100)
+
+    with pytest.raises(ValueError, match="transaction 2: NoLimitError for client 1"):
+        seed_ledger(ledger, [debit(1, 100), debit(1, 1), credit(1, 1)])
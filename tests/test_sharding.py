@@ -0,0 +1,260 @@
+import asyncio
+
+import pytest
+
+from rinha2024.app import app, fast_app
+from rinha2024.app.metrics import Metrics
+from rinha2024.app.sharding import (
+    FORWARDED_HEADER,
+    ClientOwnership,
+    ShardMiddleware,
+    ShardRouter,
+)
+
+SECRET = "segredo"
+OK_RESPONSE = (
+    b"HTTP/1.1 200 OK\r\ncontent-type: application/json\r\n"
+    b'content-length: 11\r\n\r\n{"dono": 1}'
+)
+CHUNKED_RESPONSE = (
+    b"HTTP/1.1 200 OK\r\ncontent-type: application/x-ndjson\r\n"
+    b"transfer-encoding: chunked\r\n\r\n"
+    b"4\r\n{}\r\n\r\n4\r\n{}\r\n\r\n0\r\n\r\n"
+)
+
+
+class PeerServer:
+    def __init__(self, response):
+        self.response = response
+        self.requests = list[bytes]()
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.url = f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+        return self
+
+    async def __aexit__(self, *_):
+        self.server.close()
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    name, _, value = line.partition(b":")
+                    if name.lower() == b"content-length":
+                        length = int(value)
+                self.requests.append(head + await reader.readexactly(length))
+                writer.write(self.response)
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+
+def router(url, **options):
+    return ShardRouter(
+        ClientOwnership(0, 2),
+        ["http://127.0.0.1:1", url],
+        SECRET,
+        metrics=Metrics(),
+        **options,
+    )
+
+
+def scope(path, router, headers=(), query=b""):
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query,
+        "root_path": "",
+        "headers": list(headers),
+        "client": ("127.0.0.1", 0),
+        "server": ("test", 80),
+        "state": {"shard_router": router},
+    }
+
+
+async def call(application, scope, body=b""):
+    sent = list()
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await application(scope, receive, send)
+    return sent[0]["status"], dict(sent[0]["headers"]), sent[1]["body"]
+
+
+class Local:
+    def __init__(self):
+        self.paths = list[str]()
+
+    async def __call__(self, scope, receive, send):
+        self.paths.append(scope["path"])
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+
+def test_ownership_splits_clients_by_id():
+    ownership = ClientOwnership(1, 2)
+
+    assert [ownership.owns(id) for id in (1, 2, 3, 4)] == [True, False, True, False]
+    assert ClientOwnership(0, 1).owns(7)
+
+
+@pytest.mark.parametrize(
+    "peers, secret, redirects",
+    [
+        (["http://api1"], SECRET, ()),
+        (["http://api1", "http://api2"], "", ()),
+        (["http://api1", "http://api2"], SECRET, ["http://localhost:9001"]),
+    ],
+)
+def test_router_refuses_incomplete_configuration(peers, secret, redirects):
+    with pytest.raises(ValueError):
+        ShardRouter(
+            ClientOwnership(0, 2), peers, secret, redirects=redirects, metrics=Metrics()
+        )
+
+
+def test_only_the_shared_secret_marks_a_request_as_forwarded():
+    shards = router("http://127.0.0.1:2")
+
+    assert shards.accepts(2, [])
+    assert not shards.accepts(1, [])
+    assert not shards.accepts(1, [(FORWARDED_HEADER, b"1")])
+    assert shards.accepts(1, [(FORWARDED_HEADER, SECRET.encode())])
+
+
+def test_foreign_clients_are_forwarded_to_their_owner():
+    local = Local()
+
+    async def forward():
+        async with PeerServer(OK_RESPONSE) as peer:
+            shards = router(peer.url)
+            response = await call(
+                ShardMiddleware(local),
+                scope("/clientes/1/extrato", shards, query=b"a=1"),
+            )
+            await shards.close()
+            return response, peer.requests
+
+    (status, headers, body), requests = asyncio.run(forward())
+
+    assert (status, body) == (200, b'{"dono": 1}')
+    assert headers[b"content-type"] == b"application/json"
+    assert requests[0].startswith(b"GET /clientes/1/extrato?a=1 HTTP/1.1\r\n")
+    assert FORWARDED_HEADER + b": " + SECRET.encode() in requests[0]
+    assert local.paths == []
+
+
+def test_owned_and_forwarded_clients_are_served_locally():
+    local = Local()
+    shards = router("http://127.0.0.1:2")
+    forwarded = [(FORWARDED_HEADER, SECRET.encode())]
+
+    async def serve():
+        for request in (
+            scope("/clientes/2/extrato", shards),
+            scope("/clientes/1/extrato", shards, headers=forwarded),
+            scope("/metrics", shards),
+        ):
+            await call(ShardMiddleware(local), request)
+
+    asyncio.run(serve())
+
+    assert local.paths == ["/clientes/2/extrato", "/clientes/1/extrato", "/metrics"]
+
+
+def test_chunked_peer_responses_are_relayed_with_a_length():
+    async def forward():
+        async with PeerServer(CHUNKED_RESPONSE) as peer:
+            shards = router(peer.url)
+            responses = [
+                await call(
+                    ShardMiddleware(Local()), scope("/clientes/1/historico", shards)
+                )
+                for _ in range(2)
+            ]
+            await shards.close()
+            return responses
+
+    for status, headers, body in asyncio.run(forward()):
+        assert (status, body) == (200, b"{}\r\n{}\r\n")
+        assert headers[b"content-length"] == b"8"
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        b"garbage\r\n\r\n",
+        b"HTTP/1.1 200 OK\r\ncontent-length: nope\r\n\r\n",
+        b"HTTP/1.1\r\n\r\n",
+        b"HTTP/1.1 200 OK\r\ntransfer-encoding: chunked\r\n\r\nzz\r\n",
+    ],
+)
+def test_malformed_peer_responses_are_bad_gateways(response):
+    async def forward():
+        async with PeerServer(response) as peer:
+            shards = router(peer.url)
+            result = await call(
+                ShardMiddleware(Local()), scope("/clientes/1/extrato", shards)
+            )
+            await shards.close()
+            return result
+
+    assert asyncio.run(forward())[0] == 502
+
+
+def test_unreachable_peers_are_bad_gateways():
+    shards = router("http://127.0.0.1:1")
+
+    status, _, _ = asyncio.run(
+        call(ShardMiddleware(Local()), scope("/clientes/1/extrato", shards))
+    )
+
+    assert status == 502
+
+
+def test_redirects_point_at_the_public_url_of_the_owner():
+    shards = router(
+        "http://127.0.0.1:2",
+        redirects=["http://localhost:9001", "http://localhost:9002/"],
+    )
+
+    status, headers, _ = asyncio.run(
+        call(
+            ShardMiddleware(Local()),
+            scope("/clientes/1/extrato", shards, query=b"a=1"),
+        )
+    )
+
+    assert status == 307
+    assert headers[b"location"] == b"http://localhost:9002/clientes/1/extrato?a=1"
+
+
+@pytest.mark.parametrize("application", [app, fast_app])
+@pytest.mark.parametrize(
+    "path", ["/clientes/1/extrato", "/clientes/1/transacoes", "/clientes/1/historico"]
+)
+def test_both_entry_points_route_foreign_clients(application, path):
+    shards = router(
+        "http://127.0.0.1:2",
+        redirects=["http://localhost:9001", "http://localhost:9002"],
+    )
+    request = scope(path, shards)
+    if path.endswith("transacoes"):
+        request["method"] = "POST"
+
+    status, headers, _ = asyncio.run(call(application, request, b"{}"))
+
+    assert status == 307
+    assert headers[b"location"] == f"http://localhost:9002{path}".encode()
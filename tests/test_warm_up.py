@@ -0,0 +1,74 @@
+import asyncio
+import os
+
+import pytest
+
+from rinha2024.app import POSTGRES_POOL_MIN_SIZE, POSTGRES_POOL_SIZE, postgres_pool
+from rinha2024.app.adapters.in_memory_client_repository import InMemoryClientRepository
+from rinha2024.app.adapters.in_memory_ledger import InMemoryLedger
+from rinha2024.app.adapters.postgres_statements import TABLE_STATEMENTS, Statement
+from rinha2024.app.warm_up import warm_up
+
+PREPARED = """SELECT statement FROM pg_prepared_statements\n"""
+HOT_STATEMENTS = (
+    Statement.CREATE_TRANSACTION,
+    Statement.GET_STATEMENT,
+    Statement.GET_CLIENT,
+    Statement.CLIENT_EXISTS,
+)
+
+
+@pytest.mark.skipif(
+    "POSTGRES_HOST" not in os.environ, reason="POSTGRES_HOST is not set"
+)
+def test_every_warm_connection_has_the_hot_statements_prepared():
+    async def prepared():
+        async with postgres_pool() as pool:
+            connections = [
+                await pool.acquire()
+                for _ in range(min(POSTGRES_POOL_MIN_SIZE, POSTGRES_POOL_SIZE))
+            ]
+            try:
+                return [
+                    {record["statement"] for record in await connection.fetch(PREPARED)}
+                    for connection in connections
+                ]
+            finally:
+                for connection in connections:
+                    await pool.release(connection)
+
+    statements = asyncio.run(prepared())
+
+    assert statements
+    for prepared_statements in statements:
+        assert {statement.value for statement in HOT_STATEMENTS} <= prepared_statements
+        assert {
+            statement.value for statement in TABLE_STATEMENTS
+        } <= prepared_statements
+
+
+class CountingTransactionRepository:
+    def __init__(self):
+        self.reads = list()
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    async def get_statement(self, id):
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.reads.append(id)
+        self.in_flight -= 1
+
+
+@pytest.mark.parametrize("rounds", [0, 1, 3])
+def test_warm_up_reads_every_statement_each_round(rounds):
+    ledger = InMemoryLedger()
+    for limit in (1000, 2000, 3000, 4000, 5000):
+        ledger.add_client(limit)
+    transactions = CountingTransactionRepository()
+
+    asyncio.run(warm_up(InMemoryClientRepository(ledger), transactions, rounds, 2))
+
+    assert sorted(transactions.reads) == sorted([1, 2, 3, 4, 5] * rounds)
+    assert transactions.most_in_flight <= 2
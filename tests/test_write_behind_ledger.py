@@ -0,0 +1,158 @@
+import asyncio
+import logging
+
+import pytest
+
+from rinha2024.app.adapters.in_memory_ledger import InMemoryLedger
+from rinha2024.app.adapters.postgres_statements import Statement
+from rinha2024.app.adapters.write_behind_ledger import (
+    ClientSuspendedError,
+    PersistenceQueue,
+    TransactionIds,
+    WriteBehindTransactionRepository,
+)
+from rinha2024.app.metrics import Metrics
+from rinha2024.core.entities.transaction import Transaction, TransactionKind
+
+from .fakes import FakePool
+
+
+def credit(client_id, value):
+    return Transaction(client_id, value, TransactionKind.CREDIT, "credito")
+
+
+class Database:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.rows = list[int]()
+        self.balances = dict[int, int]()
+        self.next_id = 0
+
+    def pool(self):
+        return FakePool(
+            {
+                Statement.RESERVE_TRANSACTION_IDS: self.reserve,
+                Statement.CREATE_IDENTIFIED_TRANSACTIONS: self.insert,
+                Statement.UPDATE_BALANCES: self.update,
+            }
+        )
+
+    def reserve(self, amount):
+        ids = [{"id": self.next_id + index} for index in range(1, amount + 1)]
+        self.next_id += amount
+        return ids
+
+    async def insert(self, ids, client_ids, values, kinds, descriptions, created_at):
+        await self.gate.wait()
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("lost")
+        self.rows.extend(ids)
+        return []
+
+    def update(self, ids, balances):
+        self.balances.update(zip(ids, balances))
+        return []
+
+
+def repository(database, max_size=10, **options):
+    ledger = InMemoryLedger()
+    for limit in (1000, 1000):
+        ledger.add_client(limit)
+    pool = database.pool()
+    queue = PersistenceQueue(
+        pool, max_size, retry_delay=0, metrics=Metrics(), **options
+    )
+    return queue, WriteBehindTransactionRepository(
+        ledger, TransactionIds(pool, 4), queue, None
+    )
+
+
+def test_accepted_transactions_are_persisted_with_their_balances():
+    database = Database()
+    queue, transactions = repository(database)
+
+    async def write():
+        queue.start()
+        results = [
+            await transactions.create(credit(id, value))
+            for id, value in ((1, 10), (2, 5), (1, 20))
+        ]
+        await queue.close(1)
+        return results
+
+    results = asyncio.run(write())
+
+    assert [result.unwrap().props.balance for result in results] == [10, 5, 30]
+    assert database.rows == [1, 2, 3]
+    assert database.balances == {1: 30, 2: 5}
+
+
+def test_failed_batches_are_retried():
+    database = Database(failures=2)
+    queue, transactions = repository(database, max_attempts=3)
+
+    async def write():
+        queue.start()
+        await transactions.create(credit(1, 10))
+        await queue.close(1)
+
+    asyncio.run(write())
+
+    assert database.rows == [1]
+    assert database.balances == {1: 10}
+
+
+def test_a_dropped_batch_suspends_its_clients(caplog):
+    database = Database(failures=2)
+    queue, transactions = repository(database, max_size=1, max_attempts=2)
+
+    async def write():
+        database.gate.clear()
+        queue.start()
+        await transactions.create(credit(1, 10))
+        await asyncio.sleep(0)
+        await transactions.create(credit(1, 20))
+        await transactions.create(credit(2, 5))
+        database.gate.set()
+        while not queue.suspended(1):
+            await asyncio.sleep(0)
+        with pytest.raises(ClientSuspendedError):
+            await transactions.create(credit(1, 1))
+        accepted = await transactions.create(credit(2, 7))
+        await queue.close(1)
+        return accepted
+
+    with caplog.at_level(logging.ERROR):
+        accepted = asyncio.run(write())
+
+    assert accepted.unwrap().props.balance == 12
+    assert not queue.suspended(2)
+    assert database.balances == {2: 12}
+    assert 1 not in database.balances
+    dropped = "\n".join(
+        record.getMessage()
+        for record in caplog.records
+        if record.getMessage().startswith("dropping")
+    )
+    assert '"cliente":1,"valor":10' in dropped
+    assert '"cliente":1,"valor":20' in dropped
+
+
+def test_transactions_still_pending_at_close_are_dropped(caplog):
+    database = Database(failures=100)
+    queue, transactions = repository(database, max_attempts=100)
+
+    async def write():
+        queue.start()
+        await transactions.create(credit(1, 10))
+        await queue.close(0.05)
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(write())
+
+    assert database.rows == []
+    assert queue.suspended(1)
+    assert any("after closing" in record.getMessage() for record in caplog.records)